@@ -0,0 +1 @@
+"""Benchmarks for the core managers (see python -m benchmarks --help)"""
@@ -0,0 +1,72 @@
+"""Run the benchmarks: python -m benchmarks [options]
+
+Examples:
+    python -m benchmarks                              # sizes 100 and 1000
+    python -m benchmarks --sizes 100,1000,10000 -o results.json
+    python -m benchmarks --sizes 100 --check          # CI: fail on threshold breaches
+    python -m benchmarks --baseline old.json          # compare with an earlier run
+
+Exit codes: 0 ok, 1 regressions found, 2 invalid usage.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from benchmarks.suite import BENCHMARKS, check_thresholds, run_suite
+
+DEFAULT_THRESHOLDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "thresholds.json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Library Manager benchmarks")
+    parser.add_argument("--sizes", default="100,1000", help="comma-separated distribution counts")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark")
+    parser.add_argument("--only", default=None,
+                        help="comma-separated benchmarks: " + ", ".join(list(BENCHMARKS) + ["cache_speedup"]))
+    parser.add_argument("-o", "--output", default=None, help="write the JSON report here")
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS, help="threshold file")
+    parser.add_argument("--check", action="store_true", help="exit 1 if a threshold is exceeded")
+    parser.add_argument("--baseline", default=None, help="earlier JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs. the baseline")
+    parser.add_argument("--keep", default=None, help="build the synthetic trees here and keep them")
+    args = parser.parse_args(argv)
+
+    try:
+        sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    except ValueError:
+        parser.error("--sizes must be integers")
+    only = [name.strip() for name in args.only.split(",")] if args.only else None
+    unknown = [name for name in only or [] if name not in BENCHMARKS and name != "cache_speedup"]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    report = run_suite(sizes, args.repeat, only, args.keep,
+                       progress=lambda message: print(message, file=sys.stderr))
+
+    with open(args.thresholds, "r", encoding="utf-8") as f:
+        thresholds = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    problems = check_thresholds(report, thresholds, baseline, args.tolerance)
+    report["regressions"] = problems
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    for problem in problems:
+        print(f"REGRESSION: {problem}", file=sys.stderr)
+    if problems and (args.check or baseline is not None):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""Fake interpreter / pip for the benchmarks
+
+Started by the shims from synthetic.make_interpreter as
+
+    fake_pip.py --site SITE [--python-version X.Y.Z] ARGS...
+
+it behaves like an interpreter whose only site-packages is SITE:
+
+    --version                    'Python X.Y.Z'
+    -c CODE                      run CODE with SITE first on sys.path and
+                                 every other site-packages removed
+    -m pip list [--format F]     columns, freeze or json
+    -m pip show NAME...          Name/Version/Summary/Requires/Required-by
+    -m pip install|uninstall     pretend to succeed
+
+Only the standard library is used, so the shim starts fast and the
+benchmarks measure the managers, not pip.
+"""
+
+import json
+import os
+import re
+import sys
+
+_SEPARATORS = re.compile(r"[-_.]+")
+
+
+def _canonical(name):
+    return _SEPARATORS.sub("-", name).lower()
+
+
+def _read_dists(site):
+    """(name, version, requires) for every .dist-info in site"""
+    dists = []
+    for entry in sorted(os.listdir(site)):
+        if not entry.endswith(".dist-info"):
+            continue
+        name = version = None
+        requires = []
+        with open(os.path.join(site, entry, "METADATA"), "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("Name:"):
+                    name = line[5:].strip()
+                elif line.startswith("Version:"):
+                    version = line[8:].strip()
+                elif line.startswith("Requires-Dist:"):
+                    requirement = line[14:].strip()
+                    if ";" in requirement:
+                        continue  # pip show lists unconditional requirements only
+                    requires.append(re.split(r"[\s<>=!~\[(;]", requirement, 1)[0])
+                elif not line.strip():
+                    break
+        if name:
+            dists.append((name, version or "", requires))
+    return dists
+
+
+def _pip_list(site, args):
+    dists = _read_dists(site)
+    fmt = "columns"
+    for i, arg in enumerate(args):
+        if arg.startswith("--format="):
+            fmt = arg.split("=", 1)[1]
+        elif arg == "--format" and i + 1 < len(args):
+            fmt = args[i + 1]
+    if "--outdated" in args:
+        dists = []
+    if fmt == "json":
+        print(json.dumps([{"name": n, "version": v} for n, v, _ in dists]))
+    elif fmt == "freeze":
+        for name, version, _ in dists:
+            print(f"{name}=={version}")
+    else:
+        width = max([len("Package")] + [len(n) for n, _, _ in dists])
+        vwidth = max([len("Version")] + [len(v) for _, v, _ in dists])
+        print(f"{'Package'.ljust(width)} {'Version'.ljust(vwidth)}")
+        print(f"{'-' * width} {'-' * vwidth}")
+        for name, version, _ in dists:
+            print(f"{name.ljust(width)} {version}")
+    return 0
+
+
+def _pip_show(site, names):
+    dists = _read_dists(site)
+    by_key = {_canonical(n): (n, v, r) for n, v, r in dists}
+    wanted = [_canonical(n) for n in names if not n.startswith("-")]
+    found = False
+    blocks = []
+    for key in wanted:
+        if key not in by_key:
+            continue
+        found = True
+        name, version, requires = by_key[key]
+        required_by = sorted(n for n, _, r in dists if key in {_canonical(d) for d in r})
+        blocks.append("\n".join([
+            f"Name: {name}",
+            f"Version: {version}",
+            "Summary: Synthetic distribution",
+            f"Location: {site}",
+            f"Requires: {', '.join(requires)}",
+            f"Required-by: {', '.join(required_by)}",
+        ]))
+    if not found:
+        sys.stderr.write(f"WARNING: Package(s) not found: {', '.join(names)}\n")
+        return 1
+    print("\n---\n".join(blocks))
+    return 0
+
+
+def _pip(site, args):
+    command = args[0] if args else ""
+    if command == "list":
+        return _pip_list(site, args[1:])
+    if command == "show":
+        return _pip_show(site, args[1:])
+    if command in ("install", "uninstall", "download", "wheel"):
+        print(f"Successfully ran fake 'pip {command}'")
+        return 0
+    if command in ("--version", "-V"):
+        print(f"pip 0.0 from {site} (fake)")
+        return 0
+    sys.stderr.write(f"fake pip: unsupported command {command!r}\n")
+    return 1
+
+
+def main(argv):
+    site = None
+    python_version = "{0}.{1}.{2}".format(*sys.version_info)
+    while argv and argv[0] in ("--site", "--python-version"):
+        if argv[0] == "--site":
+            site = argv[1]
+        else:
+            python_version = argv[1]
+        argv = argv[2:]
+
+    if not argv:
+        sys.stderr.write("fake interpreter: interactive mode not supported\n")
+        return 2
+    if argv[0] in ("--version", "-V"):
+        print(f"Python {python_version}")
+        return 0
+    if argv[0] == "-c" and len(argv) > 1:
+        sys.path[:] = [site] + [p for p in sys.path
+                                if p and "site-packages" not in p and "dist-packages" not in p
+                                and os.path.abspath(p) != os.path.dirname(os.path.abspath(__file__))]
+        sys.argv = ["-c"] + argv[2:]
+        exec(compile(argv[1], "<string>", "exec"), {"__name__": "__main__"})
+        return 0
+    if argv[:2] == ["-m", "pip"]:
+        return _pip(site, argv[2:])
+    sys.stderr.write(f"fake interpreter: unsupported arguments {argv!r}\n")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,404 @@
+"""Benchmark definitions and runner
+
+Each benchmark gets a Workspace (synthetic trees of one size) and returns
+the callable to time; setup is not timed. 'cold' benchmarks reset the
+in-process caches before every run, 'warm' ones measure the cached path.
+"""
+
+import contextlib
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+from benchmarks import synthetic
+
+VENV_COUNT = 4
+SHIM_VERSIONS = ("3.9.18", "3.11.7", "3.12.1")
+
+
+class Workspace:
+    """Synthetic trees of one size"""
+
+    def __init__(self, root: str, size: int, seed: int = 0):
+        self.root = root
+        self.size = size
+        self.site = synthetic.make_site_packages(os.path.join(root, "env"), size, seed)
+        self.bin_dir = os.path.join(root, "env", "bin")
+        self.python = synthetic.make_interpreter(self.bin_dir, self.site, names=("python", "python3"))
+        self.requirements = synthetic.make_requirements(os.path.join(root, "requirements.txt"), size, seed)
+        self.venvs = synthetic.make_venvs(os.path.join(root, "venvs"), VENV_COUNT,
+                                          max(1, size // VENV_COUNT), seed)
+        # A home directory with pyenv-style installations for the detector
+        self.home = os.path.join(root, "home")
+        for version in SHIM_VERSIONS:
+            synthetic.make_interpreter(os.path.join(self.home, ".pyenv", "versions", version, "bin"),
+                                       self.site, version=version)
+        self.catalog = synthetic.make_catalog(size, seed=seed)
+        self.deepest = synthetic.dist_name(size - 1)
+
+    @contextlib.contextmanager
+    def environ(self):
+        """Point PATH (bare 'pip'/'python' calls) and HOME at the shims"""
+        saved = {key: os.environ.get(key) for key in ("PATH", "HOME", "LIBRARY_MANAGER_HOME")}
+        os.environ["PATH"] = self.bin_dir + os.pathsep + "/usr/bin:/bin"
+        os.environ["HOME"] = self.home
+        os.environ["LIBRARY_MANAGER_HOME"] = os.path.join(self.root, "app")
+        try:
+            yield
+        finally:
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+
+def reset_caches():
+    """Forget every in-process cache the managers keep"""
+    from core import conflict_checker, dependency_graph, installed_index, pip_worker, requirements_parser
+    from core.command_runner import get_command_runner
+
+    installed_index._indexes.clear()
+    dependency_graph._graphs.clear()
+    conflict_checker._checkers.clear()
+    installed_index._sys_path_cache.clear()
+    installed_index._marker_env_cache.clear()
+    requirements_parser.clear_cache()
+    get_command_runner().invalidate()
+    pip_worker.shutdown_all()
+
+
+def installed_name_set(output: str) -> set:
+    """The set MainWindow._build_installed_cache derives from 'pip list' output"""
+    names = set()
+    for line in output.strip().split('\n')[2:]:
+        parts = line.split()
+        if parts:
+            package_name = parts[0].lower()
+            names.add(package_name)
+            names.add(package_name.replace("_", "-"))
+            names.add(package_name.replace("-", "_"))
+    return names
+
+
+# ------------------------------------------------------------------ benchmarks
+# Each takes a Workspace and returns the callable to time.
+
+def bench_build_installed_cache(ws: Workspace):
+    """'pip list' + parsing, as MainWindow._build_installed_cache does (the UI
+    module itself needs Qt)"""
+    from core.installer import PackageInstaller
+
+    installer = PackageInstaller()
+    installer.set_python_executable(ws.python)
+
+    def run():
+        success, output = installer.list_installed()
+        assert success, output
+        assert len(installed_name_set(output)) >= ws.size
+    return run
+
+
+def bench_installed_index_cold(ws: Workspace):
+    """Scan site-packages from scratch (interpreter query included)"""
+    from core.installed_index import get_installed_index
+
+    def run():
+        reset_caches()
+        assert len(get_installed_index(ws.python)) == ws.size
+    return run
+
+
+def bench_build_dependency_tree(ws: Workspace):
+    """DependencyManager.build_dependency_tree (one 'pip show' per node)"""
+    from core.dependency_manager import DependencyManager
+
+    manager = DependencyManager()
+
+    def run():
+        tree = manager.build_dependency_tree(ws.deepest)
+        assert tree and tree["name"] == ws.deepest
+    return run
+
+
+def bench_removal_impact(ws: Workspace):
+    """Impact analysis of removing 10 packages on the cached environment graph"""
+    from core.dependency_graph import get_dependency_graph
+
+    get_dependency_graph(ws.python)
+    names = [synthetic.dist_name(i) for i in range(0, ws.size, max(1, ws.size // 10))]
+
+    def run():
+        impact = get_dependency_graph(ws.python).removal_impact(names)
+        assert len(impact.removed) == len(names)
+    return run
+
+
+def bench_detect_all(ws: Workspace):
+    """PythonDetector.detect_all with shims on PATH and in ~/.pyenv"""
+    from core.python_detector import PythonDetector
+
+    def run():
+        assert PythonDetector().detect_all()
+    return run
+
+
+def bench_list_venvs(ws: Workspace):
+    """VirtualEnvManager.list_venvs over synthetic environments"""
+    from core.venv_manager import VirtualEnvManager
+
+    manager = VirtualEnvManager()
+
+    def run():
+        venvs = manager.list_venvs(ws.venvs, jobs=4)
+        assert len(venvs) == VENV_COUNT
+    return run
+
+
+def bench_parse_requirements_cold(ws: Workspace):
+    """RequirementsManager.parse_requirements_file without the parse cache"""
+    from core.requirements_manager import RequirementsManager
+
+    def run():
+        reset_caches()
+        success, packages = RequirementsManager(ws.python).parse_requirements_file(ws.requirements)
+        assert success and len(packages) == ws.size
+    return run
+
+
+def bench_parse_requirements_warm(ws: Workspace):
+    """RequirementsManager.parse_requirements_file with the file unchanged"""
+    from core.requirements_manager import RequirementsManager
+
+    manager = RequirementsManager(ws.python)
+    manager.parse_requirements_file(ws.requirements)
+
+    def run():
+        success, packages = manager.parse_requirements_file(ws.requirements)
+        assert success and len(packages) == ws.size
+    return run
+
+
+def bench_requirements_diff_cold(ws: Workspace):
+    """RequirementsManager.get_requirements_diff from scratch"""
+    from core.requirements_manager import RequirementsManager
+
+    def run():
+        reset_caches()
+        success, diff = RequirementsManager(ws.python).get_requirements_diff(ws.requirements)
+        assert success and diff
+    return run
+
+
+def bench_requirements_diff_warm(ws: Workspace):
+    """RequirementsManager.get_requirements_diff with file and environment unchanged"""
+    from core.requirements_manager import RequirementsManager
+
+    manager = RequirementsManager(ws.python)
+    manager.get_requirements_diff(ws.requirements)
+
+    def run():
+        success, diff = manager.get_requirements_diff(ws.requirements)
+        assert success and diff
+    return run
+
+
+def bench_catalog_scan(ws: Workspace):
+    """Compile a catalog and read every category, marking installed packages"""
+    from core.catalog_store import CatalogStore
+    from core.installer import PackageInstaller
+
+    installer = PackageInstaller()
+    installer.set_python_executable(ws.python)
+    installed = installed_name_set(installer.list_installed()[1])
+
+    def run():
+        store = CatalogStore.from_categories(ws.catalog)
+        try:
+            seen = 0
+            for category in store.get_category_names():
+                for package in store.get_packages(category):
+                    name = package["name"].lower()
+                    seen += name.replace("-", "_") in installed or name in installed
+            assert seen == ws.size
+        finally:
+            store.close()
+    return run
+
+
+def bench_catalog_search(ws: Workspace):
+    """Build the search index and run a handful of queries"""
+    from core.search_index import SearchIndex
+
+    def run():
+        index = SearchIndex.build(ws.catalog)
+        for query in ("data", "http cli", "crypt", "bench-pkg-0004", "imgae plot"):
+            index.search(query)
+    return run
+
+
+BENCHMARKS: Dict[str, Callable] = {
+    "build_installed_cache": bench_build_installed_cache,
+    "installed_index_cold": bench_installed_index_cold,
+    "build_dependency_tree": bench_build_dependency_tree,
+    "removal_impact": bench_removal_impact,
+    "detect_all": bench_detect_all,
+    "list_venvs": bench_list_venvs,
+    "parse_requirements_cold": bench_parse_requirements_cold,
+    "parse_requirements_warm": bench_parse_requirements_warm,
+    "requirements_diff_cold": bench_requirements_diff_cold,
+    "requirements_diff_warm": bench_requirements_diff_warm,
+    "catalog_scan": bench_catalog_scan,
+    "catalog_search": bench_catalog_search,
+}
+
+
+def cache_speedup(ws: Workspace, lookups: int = 16, repeat: int = 3) -> float:
+    """
+    Speedup of the installed-packages cache for one category page
+
+    Without the cache every lookup would run 'pip list' again; with it the
+    list runs once and each lookup is a set membership test.
+    """
+    from core.installer import PackageInstaller
+
+    installer = PackageInstaller()
+    installer.set_python_executable(ws.python)
+    names = [synthetic.dist_name(i) for i in range(min(lookups, ws.size))]
+
+    def uncached():
+        for name in names:
+            assert name in installed_name_set(installer.list_installed()[1])
+
+    def cached():
+        installed = installed_name_set(installer.list_installed()[1])
+        for name in names:
+            assert name in installed
+
+    return _median(uncached, repeat) / _median(cached, repeat)
+
+
+def _median(func: Callable, repeat: int) -> float:
+    return statistics.median(_time_runs(func, repeat))
+
+
+def _time_runs(func: Callable, repeat: int) -> List[float]:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+def run_suite(sizes: List[int], repeat: int = 3, only: Optional[List[str]] = None,
+              keep: Optional[str] = None, progress: Optional[Callable[[str], None]] = None) -> Dict:
+    """
+    Run the benchmarks for every size
+
+    Args:
+        sizes: Distribution counts of the synthetic trees
+        repeat: Timed runs per benchmark (the median is reported)
+        only: Benchmark names to run (default: all)
+        keep: Directory to build the trees in and keep (default: a temp dir)
+        progress: Optional callable receiving status messages
+
+    Returns:
+        dict: 'meta' and 'results' (one entry per benchmark and size)
+    """
+    names = [name for name in only if name in BENCHMARKS] if only else list(BENCHMARKS)
+    results = []
+    for size in sizes:
+        root = os.path.join(keep, f"size-{size}") if keep else tempfile.mkdtemp(prefix=f"lm-bench-{size}-")
+        os.makedirs(root, exist_ok=True)
+        try:
+            if progress:
+                progress(f"Generating synthetic trees ({size} distributions)")
+            start = time.perf_counter()
+            ws = Workspace(root, size)
+            if progress:
+                progress(f"  done in {time.perf_counter() - start:.1f} s")
+            with ws.environ():
+                for name in names:
+                    reset_caches()
+                    func = BENCHMARKS[name](ws)
+                    runs = _time_runs(func, repeat)
+                    result = {
+                        "name": name,
+                        "size": size,
+                        "unit": "s",
+                        "median": statistics.median(runs),
+                        "min": min(runs),
+                        "max": max(runs),
+                        "runs": runs,
+                    }
+                    results.append(result)
+                    if progress:
+                        progress(f"  {name:<26} {result['median'] * 1000:10.1f} ms")
+                if only is None or "cache_speedup" in only:
+                    speedup = cache_speedup(ws, repeat=repeat)
+                    results.append({"name": "cache_speedup", "size": size, "unit": "x",
+                                    "median": speedup, "min": speedup, "max": speedup, "runs": [speedup]})
+                    if progress:
+                        progress(f"  {'cache_speedup':<26} {speedup:10.1f} x")
+        finally:
+            if not keep:
+                shutil.rmtree(root, ignore_errors=True)
+            reset_caches()
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "executable": sys.executable,
+            "sizes": sizes,
+            "repeat": repeat,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def check_thresholds(report: Dict, thresholds: Dict, baseline: Optional[Dict] = None,
+                     tolerance: float = 0.25) -> List[str]:
+    """
+    Find regressions
+
+    Args:
+        report: run_suite result
+        thresholds: {benchmark: {size: limit}}; seconds for timings (maximum),
+                    a factor for 'x' results (minimum)
+        baseline: An earlier report to compare against
+        tolerance: Allowed relative slowdown against the baseline
+
+    Returns:
+        list: Human-readable regression messages (empty if none)
+    """
+    problems = []
+    previous = {}
+    if baseline:
+        previous = {(r["name"], r["size"]): r for r in baseline.get("results", [])}
+
+    for result in report["results"]:
+        name, size, value = result["name"], result["size"], result["median"]
+        limit = thresholds.get(name, {}).get(str(size))
+        if limit is not None:
+            if result["unit"] == "x" and value < limit:
+                problems.append(f"{name}[{size}]: {value:.1f}x is below the {limit}x minimum")
+            elif result["unit"] == "s" and value > limit:
+                problems.append(f"{name}[{size}]: {value * 1000:.1f} ms exceeds the {limit * 1000:.0f} ms limit")
+
+        old = previous.get((name, size))
+        if old is not None and result["unit"] == "s" and old["median"] > 0:
+            change = value / old["median"] - 1
+            if change > tolerance:
+                problems.append(f"{name}[{size}]: {change:+.0%} slower than the baseline "
+                                f"({old['median'] * 1000:.1f} -> {value * 1000:.1f} ms)")
+    return problems
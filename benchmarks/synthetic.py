@@ -0,0 +1,162 @@
+"""Synthetic environments for the benchmarks
+
+Everything is generated deterministically from a seed, so two runs (or two
+machines) benchmark the same trees:
+
+- site-packages with N .dist-info distributions whose Requires-Dist form a
+  random DAG (each distribution depends on up to 3 earlier ones, some with
+  markers or extras)
+- interpreter shims that answer '-c', '--version' and '-m pip ...' from
+  such a site-packages (see fake_pip.py)
+- requirements files pinning most distributions, with drift
+- virtual environment directories
+- catalogs in the library_data format
+"""
+
+import os
+import random
+import stat
+import sys
+from typing import Dict, List, Optional
+
+FAKE_PIP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_pip.py")
+NAME_FORMAT = "bench-pkg-{:05d}"
+
+
+def dist_name(i: int) -> str:
+    return NAME_FORMAT.format(i)
+
+
+def dist_version(i: int) -> str:
+    return f"{1 + i % 7}.{i % 13}.{i % 5}"
+
+
+def make_site_packages(root: str, count: int, seed: int = 0) -> str:
+    """
+    Create a site-packages directory with count distributions
+
+    Returns:
+        str: The site-packages path
+    """
+    rng = random.Random(seed)
+    site = os.path.join(root, "site-packages")
+    os.makedirs(site, exist_ok=True)
+    for i in range(count):
+        name = dist_name(i)
+        version = dist_version(i)
+        module = name.replace("-", "_")
+        info_dir = os.path.join(site, f"{module}-{version}.dist-info")
+        os.makedirs(info_dir, exist_ok=True)
+
+        requires = []
+        for dep in sorted(rng.sample(range(i), min(i, rng.randint(0, 3)))):
+            roll = rng.random()
+            if roll < 0.1:
+                requires.append(f'{dist_name(dep)}>=1.0; python_version < "3"')
+            elif roll < 0.2:
+                requires.append(f'{dist_name(dep)}; extra == "all"')
+            else:
+                requires.append(f"{dist_name(dep)}>=1.0")
+
+        lines = ["Metadata-Version: 2.1", f"Name: {name}", f"Version: {version}",
+                 f"Summary: Synthetic distribution {i}"]
+        if any('extra == "all"' in r for r in requires):
+            lines.append("Provides-Extra: all")
+        lines += [f"Requires-Dist: {r}" for r in requires]
+        with open(os.path.join(info_dir, "METADATA"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        with open(os.path.join(info_dir, "INSTALLER"), "w", encoding="utf-8") as f:
+            f.write("pip\n")
+
+        module_path = os.path.join(site, module + ".py")
+        with open(module_path, "w", encoding="utf-8") as f:
+            f.write(f"__version__ = {version!r}\n")
+        with open(os.path.join(info_dir, "RECORD"), "w", encoding="utf-8") as f:
+            f.write(f"{module}.py,,\n{module}-{version}.dist-info/METADATA,,\n"
+                    f"{module}-{version}.dist-info/RECORD,,\n")
+    return site
+
+
+def _write_executable(path: str, text: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+def make_interpreter(bin_dir: str, site: str, names=("python",), version: Optional[str] = None) -> str:
+    """
+    Create interpreter (and pip) shims bound to a site-packages
+
+    Returns:
+        str: Path of the first interpreter shim
+    """
+    os.makedirs(bin_dir, exist_ok=True)
+    version_arg = f' --python-version "{version}"' if version else ""
+    command = f'exec "{sys.executable}" "{FAKE_PIP}" --site "{site}"{version_arg}'
+    for name in names:
+        _write_executable(os.path.join(bin_dir, name), f'#!/bin/sh\n{command} "$@"\n')
+    _write_executable(os.path.join(bin_dir, "pip"), f'#!/bin/sh\n{command} -m pip "$@"\n')
+    return os.path.join(bin_dir, names[0])
+
+
+def make_requirements(path: str, count: int, seed: int = 0) -> str:
+    """
+    Write a requirements file over the synthetic distributions
+
+    About 80 % of the lines match, 10 % pin another version, 5 % name
+    missing projects and 5 % carry markers; comments are sprinkled in.
+    """
+    rng = random.Random(seed + 1)
+    lines = ["# Synthetic requirements", ""]
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.05:
+            lines.append(f"missing-pkg-{i:05d}>=2.0")
+        elif roll < 0.15:
+            lines.append(f"{dist_name(i)}==9.9.9")
+        elif roll < 0.20:
+            lines.append(f'{dist_name(i)}=={dist_version(i)} ; python_version >= "3.6"')
+        else:
+            lines.append(f"{dist_name(i)}=={dist_version(i)}")
+        if i % 50 == 0:
+            lines.append(f"# section {i // 50}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+def make_venvs(root: str, count: int, dists_per_venv: int, seed: int = 0) -> str:
+    """
+    Create count virtual environment directories with shims
+
+    Returns:
+        str: Directory containing the environments
+    """
+    for v in range(count):
+        venv = os.path.join(root, f"venv-{v:02d}")
+        site = make_site_packages(os.path.join(venv, "lib"), dists_per_venv, seed + v)
+        bin_dir = os.path.join(venv, "bin")
+        make_interpreter(bin_dir, site)
+        with open(os.path.join(bin_dir, "activate"), "w", encoding="utf-8") as f:
+            f.write("# synthetic\n")
+        with open(os.path.join(venv, "pyvenv.cfg"), "w", encoding="utf-8") as f:
+            f.write(f"home = {os.path.dirname(sys.executable)}\n")
+    return root
+
+
+def make_catalog(count: int, categories: int = 27, seed: int = 0) -> Dict[str, List[Dict]]:
+    """Build a catalog mapping (library_data format) with count packages"""
+    rng = random.Random(seed + 2)
+    words = ["data", "web", "async", "http", "image", "plot", "test", "parse", "cloud", "ml",
+             "crypto", "cli", "json", "sql", "stream", "graph", "text", "audio", "geo", "cache"]
+    catalog: Dict[str, List[Dict]] = {f"Category {c:02d}": [] for c in range(categories)}
+    names = list(catalog)
+    for i in range(count):
+        name = dist_name(i)
+        description = " ".join(rng.choice(words) for _ in range(6))
+        catalog[names[i % categories]].append({
+            "name": name,
+            "description": f"Synthetic {description} library",
+            "install_cmd": f"pip install {name}",
+        })
+    return catalog
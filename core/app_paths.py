@@ -0,0 +1,61 @@
+"""Application paths - per-user cache and config locations"""
+
+import os
+import platform
+
+APP_DIR_NAME = "LibraryManager"
+
+
+def _base_dir(kind):
+    """Get the platform base directory for 'cache' or 'config' data"""
+    override = os.environ.get("LIBRARY_MANAGER_HOME")
+    if override:
+        return os.path.join(override, kind)
+
+    system = platform.system()
+    if system == "Windows":
+        if kind == "cache":
+            root = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+        else:
+            root = os.environ.get("APPDATA") or os.path.expanduser("~\\AppData\\Roaming")
+        return os.path.join(root, APP_DIR_NAME)
+    elif system == "Darwin":
+        if kind == "cache":
+            return os.path.expanduser(f"~/Library/Caches/{APP_DIR_NAME}")
+        return os.path.expanduser(f"~/Library/Application Support/{APP_DIR_NAME}")
+    else:
+        if kind == "cache":
+            root = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        else:
+            root = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+        return os.path.join(root, "library-manager")
+
+
+def get_cache_dir(*parts):
+    """
+    Get (and create) a directory under the per-user cache location
+
+    Args:
+        parts: Optional sub-directory components
+
+    Returns:
+        str: Absolute directory path
+    """
+    path = os.path.join(_base_dir("cache"), *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def get_config_dir(*parts):
+    """
+    Get (and create) a directory under the per-user config location
+
+    Args:
+        parts: Optional sub-directory components
+
+    Returns:
+        str: Absolute directory path
+    """
+    path = os.path.join(_base_dir("config"), *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
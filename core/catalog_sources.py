@@ -0,0 +1,213 @@
+"""Catalog Sources - layered built-in, organization and user catalogs
+
+Sources are merged in this order, later layers overriding earlier ones:
+
+    1. built-in   core/library_data.py
+    2. org        $LIBRARY_MANAGER_ORG_CATALOG (e.g. a file on a shared drive)
+    3. user       <config dir>/catalog.json
+
+Organization and user files are JSON overlays:
+
+    {
+        "remove_categories": ["WhatsApp API"],
+        "remove_packages": ["yowsup"],
+        "categories": {
+            "Internal Tools": [
+                {"name": "acme-utils", "description": "...", "install_cmd": "pip install acme-utils"}
+            ]
+        }
+    }
+
+Packages are matched by name (case-insensitive). A package in an overlay
+replaces the same-named package of that category, or is appended to it.
+"""
+
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from core.app_paths import get_config_dir
+
+ORG_CATALOG_ENV = "LIBRARY_MANAGER_ORG_CATALOG"
+USER_CATALOG_NAME = "catalog.json"
+BUILTIN_SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "library_data.py")
+
+
+class CatalogSource:
+    """One layer of the catalog"""
+
+    def __init__(self, name: str, path: Optional[str], kind: str = "json"):
+        self.name = name
+        self.path = path
+        self.kind = kind  # 'python' for the built-in module, 'json' for overlays
+
+    def stat(self) -> Optional[Tuple[int, int]]:
+        """Get (mtime_ns, size) of the source file, or None if it does not exist"""
+        if not self.path:
+            return None
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def load(self) -> Dict:
+        """
+        Load the layer as an overlay dict
+
+        Returns:
+            dict: Overlay with 'categories', 'remove_categories', 'remove_packages'
+        """
+        if self.kind == "python":
+            from core.library_data import LIBRARY_CATEGORIES
+            return {"categories": LIBRARY_CATEGORIES}
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError("catalog file must contain a JSON object")
+        return data
+
+    def __repr__(self):
+        return f"CatalogSource(name='{self.name}', path='{self.path}')"
+
+
+def builtin_source() -> CatalogSource:
+    """The built-in catalog layer (always readable)"""
+    return CatalogSource("builtin", BUILTIN_SOURCE_PATH, kind="python")
+
+
+def get_catalog_sources() -> List[CatalogSource]:
+    """Get the configured catalog layers in precedence order (lowest first)"""
+    sources = [builtin_source()]
+
+    org_path = os.environ.get(ORG_CATALOG_ENV)
+    if org_path:
+        sources.append(CatalogSource("org", os.path.expanduser(org_path)))
+
+    sources.append(CatalogSource("user", os.path.join(get_config_dir(), USER_CATALOG_NAME)))
+    return sources
+
+
+def fingerprint_source(source: CatalogSource) -> Dict:
+    """Record the identity of a source file (stat plus content hash)"""
+    from core.catalog_store import file_hash
+
+    stat = source.stat()
+    if stat is None:
+        return {"name": source.name, "path": source.path, "exists": False}
+    try:
+        digest = file_hash(source.path)
+    except OSError:
+        digest = None  # unreadable; never matches, so it is retried next time
+    return {
+        "name": source.name,
+        "path": source.path,
+        "exists": True,
+        "mtime_ns": stat[0],
+        "size": stat[1],
+        "sha256": digest,
+    }
+
+
+def sources_unchanged(sources: List[CatalogSource], recorded: List[Dict]) -> bool:
+    """
+    Check whether sources still match the fingerprints recorded at compile time
+
+    Only a stat() per source is needed when nothing was touched; the content
+    hash is computed only for files whose mtime or size moved. When such a
+    file turns out to have the same content, its fingerprint in recorded is
+    updated to the new stat, so the caller can store it and skip the hash
+    on later checks.
+
+    Args:
+        sources: Current catalog layers
+        recorded: Fingerprints stored with the compiled catalog (updated in place)
+
+    Returns:
+        bool: True if the compiled catalog is still valid
+    """
+    from core.catalog_store import file_hash
+
+    if len(sources) != len(recorded):
+        return False
+
+    for source, fingerprint in zip(sources, recorded):
+        if source.name != fingerprint.get("name") or source.path != fingerprint.get("path"):
+            return False
+
+        stat = source.stat()
+        if stat is None or not fingerprint.get("exists"):
+            # Unchanged only if the file is still absent
+            if stat is None and not fingerprint.get("exists"):
+                continue
+            return False
+
+        if stat == (fingerprint.get("mtime_ns"), fingerprint.get("size")):
+            continue
+        try:
+            if file_hash(source.path) != fingerprint.get("sha256"):
+                return False
+        except OSError:
+            return False
+        fingerprint["mtime_ns"], fingerprint["size"] = stat
+
+    return True
+
+
+def merge_overlay(categories: Dict[str, List[Dict]], overlay: Dict) -> Dict[str, List[Dict]]:
+    """Apply one overlay layer on top of a category mapping"""
+    removed_categories = set(overlay.get("remove_categories", []))
+    removed_packages = {name.lower() for name in overlay.get("remove_packages", [])}
+
+    merged = {}
+    for category, packages in categories.items():
+        if category in removed_categories:
+            continue
+        merged[category] = [pkg for pkg in packages if pkg["name"].lower() not in removed_packages]
+
+    for category, packages in overlay.get("categories", {}).items():
+        existing = merged.setdefault(category, [])
+        positions = {pkg["name"].lower(): i for i, pkg in enumerate(existing)}
+        for pkg in packages:
+            if not isinstance(pkg, dict) or not pkg.get("name"):
+                continue
+            entry = dict(pkg)
+            entry.setdefault("description", "")
+            entry.setdefault("install_cmd", f"pip install {entry['name']}")
+            key = entry["name"].lower()
+            if key in positions:
+                existing[positions[key]] = entry
+            else:
+                positions[key] = len(existing)
+                existing.append(entry)
+
+    # Drop categories left empty by removals
+    return {category: packages for category, packages in merged.items() if packages}
+
+
+def compile_sources(sources: List[CatalogSource]) -> Tuple[Dict[str, List[Dict]], List[Dict], List[str]]:
+    """
+    Merge all catalog layers
+
+    Args:
+        sources: Catalog layers in precedence order
+
+    Returns:
+        tuple: (categories, fingerprints, errors) - unreadable layers are
+               skipped and reported in errors
+    """
+    categories: Dict[str, List[Dict]] = {}
+    fingerprints = []
+    errors = []
+
+    for source in sources:
+        fingerprints.append(fingerprint_source(source))
+        if source.stat() is None:
+            continue
+        try:
+            categories = merge_overlay(categories, source.load())
+        except Exception as e:
+            errors.append(f"{source.name} catalog ({source.path}): {e}")
+
+    return categories, fingerprints, errors
@@ -0,0 +1,329 @@
+"""Catalog Store - compiled SQLite catalog with lazy category loading
+
+The catalog sources (library_data.py plus the optional organization and
+user overlays, see catalog_sources.py) are merged and compiled into a
+SQLite file in the cache directory. It is opened read-only and
+memory-mapped so that startup only reads the category headers; package
+rows are fetched when a category is shown.
+
+Build step:
+    python -m core.catalog_store [--output PATH]
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from core import tracing
+from core.app_paths import get_cache_dir
+
+SCHEMA_VERSION = "2"
+DEFAULT_DB_NAME = "catalog.sqlite3"
+
+# Map up to 64 MB of the database file instead of reading it through the page cache
+MMAP_SIZE = 64 * 1024 * 1024
+
+# Entry keys stored in dedicated columns; anything else goes into 'extra'
+_PACKAGE_COLUMNS = ("name", "description", "install_cmd")
+
+
+def file_hash(path: str) -> str:
+    """Get the sha256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_catalog(categories: Dict[str, List[Dict]], db_path: str,
+                  meta: Optional[Dict[str, str]] = None) -> str:
+    """
+    Compile a catalog mapping into a SQLite file
+
+    The file is written next to its final location and moved into place,
+    so readers never see a half-written catalog.
+
+    Args:
+        categories: Mapping of category name to package entries
+        db_path: Destination file
+        meta: Extra key/value pairs to record (e.g. source fingerprints)
+
+    Returns:
+        str: The catalog content hash
+    """
+    from core.search_index import catalog_hash
+
+    content_hash = catalog_hash(categories)
+    tmp_path = f"{db_path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    connection = sqlite3.connect(tmp_path)
+    try:
+        _write_catalog(connection, categories, content_hash, meta)
+        connection.commit()
+    finally:
+        connection.close()
+
+    os.replace(tmp_path, db_path)
+    return content_hash
+
+
+def _write_catalog(connection, categories, content_hash, meta):
+    """Create the schema and insert all rows"""
+    connection.executescript("""
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE categories (
+            id INTEGER PRIMARY KEY,
+            name TEXT UNIQUE NOT NULL,
+            package_count INTEGER NOT NULL
+        );
+        CREATE TABLE packages (
+            id INTEGER PRIMARY KEY,
+            category_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            description TEXT NOT NULL,
+            install_cmd TEXT NOT NULL,
+            extra TEXT
+        );
+        CREATE INDEX packages_by_category ON packages (category_id, position);
+    """)
+
+    for category_id, (category, packages) in enumerate(categories.items()):
+        connection.execute(
+            "INSERT INTO categories (id, name, package_count) VALUES (?, ?, ?)",
+            (category_id, category, len(packages))
+        )
+        rows = []
+        for position, pkg in enumerate(packages):
+            extra = {k: v for k, v in pkg.items() if k not in _PACKAGE_COLUMNS}
+            rows.append((
+                category_id, position, pkg["name"], pkg.get("description", ""),
+                pkg.get("install_cmd", f"pip install {pkg['name']}"),
+                json.dumps(extra) if extra else None
+            ))
+        connection.executemany(
+            "INSERT INTO packages (category_id, position, name, description, install_cmd, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+    all_meta = {"schema_version": SCHEMA_VERSION, "catalog_hash": content_hash}
+    all_meta.update(meta or {})
+    connection.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", all_meta.items())
+
+
+def update_catalog_meta(db_path: str, meta: Dict[str, str]):
+    """Replace metadata values of a compiled catalog file"""
+    connection = sqlite3.connect(db_path)
+    try:
+        with connection:
+            connection.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", meta.items())
+    finally:
+        connection.close()
+
+
+class CatalogStore:
+    """Read-only view over a compiled catalog"""
+
+    def __init__(self, connection: sqlite3.Connection, path: Optional[str] = None):
+        self.connection = connection
+        self.path = path
+        self._meta = dict(connection.execute("SELECT key, value FROM meta"))
+        # Category headers are the only thing read up front
+        self._categories: List[Tuple[int, str, int]] = list(
+            connection.execute("SELECT id, name, package_count FROM categories ORDER BY id")
+        )
+        self._category_ids = {name: category_id for category_id, name, _ in self._categories}
+        self._packages: Dict[str, List[Dict]] = {}
+
+    @classmethod
+    def open(cls, db_path: str):
+        """Open a compiled catalog file read-only with memory mapping"""
+        connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+        try:
+            connection.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            return cls(connection, db_path)
+        except Exception:
+            connection.close()
+            raise
+
+    @classmethod
+    def from_categories(cls, categories: Dict[str, List[Dict]]):
+        """Compile a catalog into an in-memory database (no disk cache)"""
+        from core.search_index import catalog_hash
+
+        connection = sqlite3.connect(":memory:", check_same_thread=False)
+        _write_catalog(connection, categories, catalog_hash(categories), None)
+        connection.commit()
+        return cls(connection)
+
+    def get_meta(self, key: str, default=None):
+        """Get a metadata value recorded at build time"""
+        return self._meta.get(key, default)
+
+    @property
+    def source_errors(self) -> List[str]:
+        """Catalog layers that could not be read when compiling"""
+        return json.loads(self._meta.get("source_errors", "[]"))
+
+    @property
+    def catalog_hash(self) -> str:
+        """Content hash of the compiled catalog"""
+        return self._meta.get("catalog_hash", "")
+
+    def get_category_names(self) -> List[str]:
+        """Get category names in catalog order"""
+        return [name for _, name, _ in self._categories]
+
+    def get_category_counts(self) -> List[Tuple[str, int]]:
+        """Get (category, package count) pairs in catalog order"""
+        return [(name, count) for _, name, count in self._categories]
+
+    def get_packages(self, category: str) -> List[Dict]:
+        """
+        Get the package entries of a category, loading them on first use
+
+        Args:
+            category: Category name
+
+        Returns:
+            list: Package entries (empty for unknown categories)
+        """
+        packages = self._packages.get(category)
+        if packages is None:
+            category_id = self._category_ids.get(category)
+            if category_id is None:
+                return []
+            rows = self.connection.execute(
+                "SELECT name, description, install_cmd, extra FROM packages "
+                "WHERE category_id = ? ORDER BY position",
+                (category_id,)
+            )
+            packages = [self._row_to_entry(row) for row in rows]
+            self._packages[category] = packages
+        return packages
+
+    def iter_packages(self) -> Iterator[Tuple[str, Dict]]:
+        """Iterate over (category, package entry) for the whole catalog"""
+        for category in self.get_category_names():
+            for pkg in self.get_packages(category):
+                yield category, pkg
+
+    def to_dict(self) -> Dict[str, List[Dict]]:
+        """Get the whole catalog as a category -> entries mapping"""
+        return {category: self.get_packages(category) for category in self.get_category_names()}
+
+    @staticmethod
+    def _row_to_entry(row) -> Dict:
+        """Convert a packages row into the library_data entry shape"""
+        name, description, install_cmd, extra = row
+        entry = {"name": name, "description": description, "install_cmd": install_cmd}
+        if extra:
+            entry.update(json.loads(extra))
+        return entry
+
+    def close(self):
+        """Close the underlying database"""
+        self.connection.close()
+
+
+def compile_catalog(db_path: str, sources=None) -> Tuple[Dict[str, List[Dict]], List[str]]:
+    """
+    Merge the catalog sources and compile them to db_path
+
+    Args:
+        db_path: Destination file
+        sources: Catalog layers (defaults to the configured ones)
+
+    Returns:
+        tuple: (merged categories, source errors)
+    """
+    from core.catalog_sources import compile_sources, get_catalog_sources
+
+    if sources is None:
+        sources = get_catalog_sources()
+    categories, fingerprints, errors = compile_sources(sources)
+    build_catalog(categories, db_path, {
+        "sources": json.dumps(fingerprints),
+        "source_errors": json.dumps(errors),
+    })
+    return categories, errors
+
+
+def open_catalog(db_path: Optional[str] = None) -> CatalogStore:
+    """
+    Open the compiled catalog, recompiling it when a catalog source changed
+
+    Args:
+        db_path: Compiled catalog location (defaults to the app cache dir)
+
+    Returns:
+        CatalogStore: The opened catalog
+    """
+    from core.catalog_sources import builtin_source, compile_sources, get_catalog_sources, sources_unchanged
+
+    sources = None
+    try:
+        sources = get_catalog_sources()
+        if db_path is None:
+            db_path = os.path.join(get_cache_dir(), DEFAULT_DB_NAME)
+
+        if os.path.exists(db_path):
+            try:
+                store = CatalogStore.open(db_path)
+                recorded_text = store.get_meta("sources", "[]")
+                recorded = json.loads(recorded_text)
+                if (store.get_meta("schema_version") == SCHEMA_VERSION and
+                        sources_unchanged(sources, recorded)):
+                    tracing.record_cache("catalog", True)
+                    if json.dumps(recorded) != recorded_text:
+                        # Touched but identical sources: remember their new stat
+                        try:
+                            update_catalog_meta(db_path, {"sources": json.dumps(recorded)})
+                        except sqlite3.Error:
+                            pass
+                    return store
+                store.close()
+            except (sqlite3.Error, ValueError):
+                pass
+
+        tracing.record_cache("catalog", False)
+        with tracing.span("catalog.compile", tracing.PARSE, path=db_path):
+            compile_catalog(db_path, sources)
+        return CatalogStore.open(db_path)
+    except Exception:
+        # Config or cache dir not writable or similar - fall back to an
+        # in-memory catalog (the built-in one if the sources are unavailable)
+        try:
+            categories, _, _ = compile_sources(sources or [builtin_source()])
+        except Exception:
+            categories, _, _ = compile_sources([builtin_source()])
+        return CatalogStore.from_categories(categories)
+
+
+def main(argv=None):
+    """Merge the catalog sources and compile them into a catalog file"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile the library catalog")
+    parser.add_argument("--output", help="Output file (default: app cache dir)")
+    args = parser.parse_args(argv)
+
+    db_path = args.output or os.path.join(get_cache_dir(), DEFAULT_DB_NAME)
+    categories, errors = compile_catalog(db_path)
+
+    for error in errors:
+        print(f"warning: skipped {error}", file=sys.stderr)
+    total = sum(len(packages) for packages in categories.values())
+    print(f"Wrote {len(categories)} categories, {total} packages to {db_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,363 @@
+"""Cleanup Manager - find and remove distributions nothing needs
+
+Uninstalling a package leaves its dependencies behind. To tell leftovers
+from packages the user wants, the manager keeps a root set per interpreter:
+
+- packages explicitly requested through the app (Install Selected, the
+  CLI 'install' command, requirements installs), stored in
+  <config dir>/requested.json together with their extras
+- distributions pip marked with a REQUESTED file (installed by name on the
+  pip command line)
+- pip, setuptools, wheel
+- when the target is the interpreter the app runs on, the app's own
+  requirements (requirements.txt: PyQt6, packaging, ...), so cleanup never
+  breaks the running app
+
+Everything installed that the roots do not need, directly or transitively,
+is a cleanup candidate. The check runs on the cached dependency graph (one
+bitset closure), so it is cheap enough to run after every uninstall.
+Candidate sizes come from the RECORD files. Removal runs 'pip uninstall'
+in batches.
+"""
+
+import csv
+import json
+import os
+import sys
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from core import tracing
+from core.app_paths import get_config_dir
+
+MARKS_NAME = "requested.json"
+REMOVE_BATCH_SIZE = 50
+APP_REQUIREMENTS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                     "requirements.txt")
+# Used when requirements.txt is not shipped (e.g. frozen builds)
+_FALLBACK_APP_REQUIREMENTS = {"pyqt6", "pyqt6-qt6", "pyqt6-sip", "packaging"}
+
+# (metadata directory, RECORD mtime) -> bytes
+_size_cache: Dict[Tuple[str, Optional[int]], Optional[int]] = {}
+_size_lock = threading.Lock()
+
+
+def _format_size(size: int) -> str:
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MB"
+    return f"{size / 1024:.0f} KB"
+
+
+def installed_size(dist) -> Optional[int]:
+    """
+    Get the bytes a distribution occupies according to its RECORD file
+
+    Files without a size column are stat'ed. Results are cached until
+    the RECORD file changes.
+
+    Args:
+        dist: InstalledDistribution
+
+    Returns:
+        int: Total size, or None if the distribution has no RECORD file
+    """
+    record_path = os.path.join(dist.path, "RECORD")
+    try:
+        mtime = os.stat(record_path).st_mtime_ns
+    except OSError:
+        return None
+    cache_key = (dist.path, mtime)
+    with _size_lock:
+        if cache_key in _size_cache:
+            tracing.record_cache("installed_size", True)
+            return _size_cache[cache_key]
+    tracing.record_cache("installed_size", False)
+
+    total = 0
+    try:
+        with open(record_path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.reader(f):
+                if not row:
+                    continue
+                if len(row) >= 3 and row[2].isdigit():
+                    total += int(row[2])
+                    continue
+                try:
+                    total += os.path.getsize(os.path.join(dist.location, row[0]))
+                except OSError:
+                    pass
+    except (OSError, csv.Error):
+        return None
+
+    with _size_lock:
+        _size_cache[cache_key] = total
+    return total
+
+
+def app_requirement_keys(python_executable: Optional[str] = None) -> Set[str]:
+    """
+    Get the distributions the app itself needs on an interpreter
+
+    Args:
+        python_executable: Target interpreter (defaults to the running one)
+
+    Returns:
+        set: Canonical names from the app's requirements.txt if the target
+             is the interpreter running the app, else an empty set
+    """
+    from core.installed_index import canonical_name
+
+    python_executable = python_executable or sys.executable
+    try:
+        if not os.path.samefile(python_executable, sys.executable):
+            return set()
+    except OSError:
+        if os.path.abspath(python_executable) != os.path.abspath(sys.executable):
+            return set()
+
+    try:
+        from core.requirements_parser import parse_requirements
+        keys = {req.key for req in parse_requirements(APP_REQUIREMENTS_PATH) if req.key}
+    except Exception:
+        keys = set()
+    return {canonical_name(key) for key in keys} or set(_FALLBACK_APP_REQUIREMENTS)
+
+
+class RequestedMarks:
+    """Persistent per-interpreter set of explicitly requested packages"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(get_config_dir(), MARKS_NAME)
+        self._lock = threading.Lock()
+        self._data: Optional[Dict] = None
+
+    def _load(self) -> Dict:
+        if self._data is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError):
+                self._data = {}
+        return self._data
+
+    def _save(self):
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    def get(self, python_executable: str) -> Dict[str, List[str]]:
+        """
+        Get the marks of an interpreter
+
+        Returns:
+            dict: Canonical name -> requested extras
+        """
+        with self._lock:
+            return {key: list(extras) for key, extras in self._load().get(python_executable, {}).items()}
+
+    def add(self, python_executable: str, requirements: Iterable[str]):
+        """Mark requirement specifiers (e.g. 'requests[socks]>=2') as requested"""
+        from packaging.requirements import InvalidRequirement, Requirement
+
+        from core.installed_index import canonical_name
+
+        with self._lock:
+            marks = self._load().setdefault(python_executable, {})
+            for text in requirements:
+                try:
+                    req = Requirement(text)
+                except InvalidRequirement:
+                    continue
+                key = canonical_name(req.name)
+                marks[key] = sorted(set(marks.get(key, [])) | set(req.extras))
+            self._save()
+
+    def remove(self, python_executable: str, names: Iterable[str]):
+        """Forget marks (e.g. after the packages were uninstalled)"""
+        from core.installed_index import canonical_name
+
+        with self._lock:
+            marks = self._load().get(python_executable)
+            if not marks:
+                return
+            for name in names:
+                marks.pop(canonical_name(name), None)
+            self._save()
+
+
+class CleanupCandidate:
+    """An installed distribution no root needs"""
+
+    def __init__(self, name: str, key: str, version: str, size: Optional[int]):
+        self.name = name
+        self.key = key
+        self.version = version
+        self.size = size  # bytes, None if unknown
+
+    def to_dict(self) -> Dict:
+        """Plain-dict form"""
+        return {"name": self.name, "version": self.version, "size": self.size}
+
+    def __repr__(self):
+        return f"CleanupCandidate('{self.name}' {self.version})"
+
+
+class CleanupPlan:
+    """Distributions that can be removed, with the space it would free"""
+
+    def __init__(self, candidates: List[CleanupCandidate], root_count: int, note: str = ""):
+        self.candidates = candidates
+        self.root_count = root_count
+        self.note = note  # why nothing is suggested, if so
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.candidates
+
+    @property
+    def total_size(self) -> int:
+        """Estimated bytes reclaimed (candidates of unknown size count as 0)"""
+        return sum(c.size or 0 for c in self.candidates)
+
+    def names(self) -> List[str]:
+        return [c.name for c in self.candidates]
+
+    def summary(self) -> str:
+        """Short summary such as '3 unused packages (12.4 MB)'"""
+        if self.is_empty:
+            return self.note or "No unused packages"
+        return f"{len(self.candidates)} unused package(s) ({_format_size(self.total_size)})"
+
+    def to_dict(self) -> Dict:
+        """Plain-dict form"""
+        return {
+            "summary": self.summary(),
+            "roots": self.root_count,
+            "total_size": self.total_size,
+            "candidates": [c.to_dict() for c in self.candidates],
+        }
+
+
+class CleanupManager:
+    """Finds and removes distributions unreachable from the requested roots"""
+
+    def __init__(self, python_executable: Optional[str] = None, marks: Optional[RequestedMarks] = None):
+        self.python_executable = python_executable or sys.executable
+        self.marks = marks or RequestedMarks()
+
+    def mark_requested(self, requirements: Iterable[str]):
+        """Record requirement specifiers the user asked for"""
+        self.marks.add(self.python_executable, requirements)
+
+    def root_keys(self, index=None) -> Dict[str, List[str]]:
+        """
+        Get the root set
+
+        Returns:
+            dict: Canonical name -> extras, for marked, REQUESTED and
+                  protected distributions and the app's own requirements
+        """
+        from core.installed_index import get_installed_index
+        from core.requirements_sync import PROTECTED_DISTRIBUTIONS
+
+        index = index or get_installed_index(self.python_executable)
+        roots = self.marks.get(self.python_executable)
+        for dist in index:
+            if dist.key not in roots and os.path.exists(os.path.join(dist.path, "REQUESTED")):
+                roots[dist.key] = []
+        for key in PROTECTED_DISTRIBUTIONS | app_requirement_keys(self.python_executable):
+            roots.setdefault(key, [])
+        return roots
+
+    def plan(self, keep: Iterable[str] = ()) -> CleanupPlan:
+        """
+        Find the installed distributions nothing requested needs
+
+        Args:
+            keep: Extra packages to treat as roots
+
+        Returns:
+            CleanupPlan: The candidates, largest first
+        """
+        from core.dependency_graph import get_dependency_graph
+        from core.installed_index import get_installed_index, get_marker_environment
+        from core.requirements_sync import PROTECTED_DISTRIBUTIONS
+
+        index = get_installed_index(self.python_executable)
+        graph = get_dependency_graph(self.python_executable)
+        roots = self.root_keys(index)
+        for name in keep:
+            roots.setdefault(name, [])
+
+        with tracing.span("cleanup.plan", tracing.PARSE, python=self.python_executable) as span:
+            implicit = PROTECTED_DISTRIBUTIONS | app_requirement_keys(self.python_executable)
+            if not any(graph.is_installed(key) and key not in implicit for key in roots):
+                # Without any record of what was asked for, every top-level
+                # package would look unused
+                return CleanupPlan([], 0, "No requested packages are recorded for this interpreter")
+
+            # Extras of a root pull in more than the graph's plain edges
+            root_names = list(roots)
+            environment = get_marker_environment(self.python_executable)
+            for key, extras in roots.items():
+                dist = index.get(key) if extras else None
+                if dist is not None:
+                    root_names.extend(dist.dependency_keys(environment, extras))
+
+            unused = graph.unreachable(graph.mask(root_names))
+            candidates = []
+            for name in graph.names_of(unused):
+                dist = index.get(name)
+                if dist is None:
+                    continue
+                candidates.append(CleanupCandidate(name, dist.key, dist.version, installed_size(dist)))
+            candidates.sort(key=lambda c: (-(c.size or 0), c.key))
+            span.set(roots=len(roots), candidates=len(candidates))
+        return CleanupPlan(candidates, len(roots))
+
+    def remove(self, names: List[str], batch_size: int = REMOVE_BATCH_SIZE,
+               progress: Optional[Callable[[str], None]] = None) -> Tuple[bool, str]:
+        """
+        Uninstall distributions with one 'pip uninstall' per batch
+
+        Args:
+            names: Distributions to remove
+            batch_size: Distributions per pip process
+            progress: Optional callable receiving status messages
+
+        Returns:
+            tuple: (success: bool, combined pip output)
+        """
+        import subprocess
+
+        success = True
+        output = ""
+        for start in range(0, len(names), batch_size):
+            batch = names[start:start + batch_size]
+            if progress:
+                progress(f"Removing {', '.join(batch)}")
+            try:
+                result = tracing.run(
+                    [self.python_executable, '-m', 'pip', 'uninstall', '-y'] + batch,
+                    capture_output=True,
+                    text=True,
+                    timeout=600
+                )
+                output += result.stdout + result.stderr
+                if result.returncode != 0:
+                    success = False
+                    continue
+            except subprocess.TimeoutExpired:
+                output += "Error: Uninstallation timed out after 10 minutes\n"
+                success = False
+                continue
+            except Exception as e:
+                output += f"Error: {str(e)}\n"
+                success = False
+                continue
+            self.marks.remove(self.python_executable, batch)
+        return success, output
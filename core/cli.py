@@ -0,0 +1,493 @@
+"""Command-line interface - headless access to the core engines
+
+Usage:
+    python -m core scan [--all]
+    python -m core outdated [--cached]
+    python -m core update [PACKAGE ...] [--all]
+    python -m core install PACKAGE [PACKAGE ...]
+    python -m core req-diff REQUIREMENTS_FILE
+    python -m core sync REQUIREMENTS_FILE [--remove-extra] [--dry-run]
+    python -m core cleanup [--keep PACKAGE ...] [--dry-run]
+    python -m core check
+    python -m core graph -o FILE [--format dot|json|graphml] [--root PACKAGE ...] [--depth N]
+                         [--reverse] [--only installed|missing]
+    python -m core lock LOCKFILE [--wheelhouse DIR]
+    python -m core install-lock LOCKFILE [--wheelhouse DIR] [--force]
+    python -m core wheelhouse list
+    python -m core wheelhouse prefetch [REQUIREMENT ...] [-r FILE] [--jobs N] [--no-deps]
+    python -m core wheelhouse evict [--max-mb N]
+    python -m core snapshot list
+    python -m core snapshot create [PACKAGE ...] [--label TEXT]
+    python -m core snapshot rollback [SNAPSHOT_ID]
+    python -m core venvs [--path DIR] [--jobs N]
+
+Global options (before the command):
+    --python PATH   Interpreter to operate on (default: the running one)
+    --json          Machine-readable output
+    --trace FILE    Write a Chrome trace-event file of the run's operations
+
+Exit codes:
+    0  success, nothing to report
+    1  the operation failed
+    2  invalid usage
+    3  success, but there are findings (outdated packages, requirements drift,
+       unused distributions, broken requirements)
+
+This module must not import PyQt6; command handlers import the engines
+they need lazily so read-only queries start fast.
+"""
+
+import argparse
+import json
+import sys
+
+EXIT_OK = 0
+EXIT_FAILURE = 1
+EXIT_USAGE = 2
+EXIT_FINDINGS = 3
+
+
+def _emit(args, data, text_lines):
+    """Print a result as JSON or as plain text lines"""
+    if args.json:
+        print(json.dumps(data, indent=2, sort_keys=True))
+    else:
+        for line in text_lines:
+            print(line)
+
+
+def cmd_scan(args):
+    """List installed packages and match them against the catalog"""
+    from core.catalog_store import open_catalog
+    from core.installed_index import InstalledIndex, canonical_name
+
+    index = InstalledIndex(args.python)
+    index.refresh()
+    catalog = open_catalog()
+
+    # A package listed in several categories is one match
+    by_key = {}
+    for category, pkg in catalog.iter_packages():
+        dist = index.get(pkg["name"])
+        if dist is None:
+            continue
+        match = by_key.get(canonical_name(pkg["name"]))
+        if match is None:
+            by_key[canonical_name(pkg["name"])] = {"name": pkg["name"], "category": category,
+                                                   "categories": [category], "version": dist.version}
+        elif category not in match["categories"]:
+            match["categories"].append(category)
+    matches = list(by_key.values())
+
+    data = {
+        "python": index.python_executable,
+        "installed_count": len(index),
+        "catalog_matches": matches,
+    }
+    lines = [f"Installed packages: {len(index)}", f"Packages in catalog: {len(matches)}", ""]
+    lines += [f"  {m['name']} {m['version']}  [{', '.join(m['categories'])}]" for m in matches]
+
+    if args.all:
+        installed = [{"name": dist.name, "version": dist.version} for dist in
+                     sorted(index, key=lambda d: d.name.lower())]
+        data["installed"] = installed
+        lines += ["", "All installed packages:"]
+        lines += [f"  {d['name']} {d['version']}" for d in installed]
+
+    _emit(args, data, lines)
+    return EXIT_OK
+
+
+def cmd_outdated(args):
+    """List outdated packages"""
+    from core.update_manager import UpdateManager
+    from core.update_scheduler import OutdatedCache
+
+    python = args.python or sys.executable
+    cache = OutdatedCache()
+    if args.cached:
+        entry = cache.get(python)
+        if entry is None:
+            _emit(args, {"error": "no cached result"}, ["No cached result; run without --cached"])
+            return EXIT_FAILURE
+        packages = entry["packages"]
+    else:
+        success, packages = UpdateManager(python).check_outdated_packages()
+        if not success:
+            _emit(args, {"error": "failed to check for outdated packages"},
+                  ["Failed to check for outdated packages"])
+            return EXIT_FAILURE
+        cache.put(python, packages)
+
+    lines = [f"{p['name']}: {p['version']} -> {p['latest_version']}" for p in packages]
+    _emit(args, {"outdated": packages}, lines or ["All packages are up to date"])
+    return EXIT_FINDINGS if packages else EXIT_OK
+
+
+def cmd_update(args):
+    """Upgrade packages in dependency-aware batches"""
+    from core.update_manager import UpdateManager
+
+    manager = UpdateManager(args.python)
+    if args.all:
+        success, outdated = manager.check_outdated_packages()
+        if not success:
+            _emit(args, {"error": "failed to check for outdated packages"},
+                  ["Failed to check for outdated packages"])
+            return EXIT_FAILURE
+        results = manager.update_packages(outdated)
+    elif args.packages:
+        results = manager.update_multiple_packages(args.packages)
+    else:
+        _emit(args, {"error": "no packages given"}, ["Give package names or --all"])
+        return EXIT_USAGE
+
+    lines = []
+    for result in results:
+        if result["success"]:
+            lines.append(f"  {result['package']}: {result.get('from')} -> {result.get('to')}")
+        else:
+            reason = (result["message"] or "").strip().splitlines()
+            lines.append(f"  {result['package']}: FAILED ({reason[-1] if reason else 'unknown error'})")
+    _emit(args, {"results": results}, lines or ["Nothing to update"])
+    return EXIT_OK if all(r["success"] for r in results) else EXIT_FAILURE
+
+
+def cmd_install(args):
+    """Install packages with one pip invocation"""
+    from core.installer import PackageInstaller
+
+    installer = PackageInstaller()
+    if args.python:
+        installer.set_python_executable(args.python)
+
+    success, output = installer.install_packages(args.packages)
+    if success:
+        from core.cleanup_manager import CleanupManager
+        CleanupManager(installer.python_executable).mark_requested(args.packages)
+    _emit(args, {"success": success, "packages": args.packages, "output": output}, [output])
+    return EXIT_OK if success else EXIT_FAILURE
+
+
+def cmd_req_diff(args):
+    """Compare a requirements file with the installed packages"""
+    from core.requirements_manager import RequirementsManager
+
+    success, diff = RequirementsManager(args.python).get_requirements_diff(args.file)
+    if not success:
+        _emit(args, {"error": f"could not diff {args.file}"}, [f"Could not diff {args.file}"])
+        return EXIT_FAILURE
+
+    lines = []
+    for key in ("missing", "marker_excluded", "extra"):
+        names = sorted(diff.get(key, []))
+        label = key.replace("_", " ").capitalize()
+        lines.append(f"{label} ({len(names)}): {', '.join(names) or '-'}")
+    lines.append(f"Version mismatches ({len(diff['mismatched'])}):")
+    lines += [f"  {m['name']}: {m['reason']}" for m in diff["mismatched"]]
+    if diff["install"]:
+        lines += ["", "To fix: pip install " + " ".join(f'"{spec}"' for spec in diff["install"])]
+    _emit(args, diff, lines)
+    return EXIT_FINDINGS if diff["install"] else EXIT_OK
+
+
+def cmd_sync(args):
+    """Make the environment match a requirements file"""
+    from core.requirements_manager import RequirementsManager
+
+    manager = RequirementsManager(args.python)
+    success, plan = manager.plan_sync(args.file, remove_extra=args.remove_extra)
+    if not success:
+        _emit(args, {"error": plan}, [f"Cannot sync: {plan}"])
+        return EXIT_FAILURE
+
+    lines = [plan.summary()] + [f"  {action.describe()}" for action in plan.actions]
+    if args.dry_run:
+        _emit(args, plan.to_dict(), lines)
+        return EXIT_OK if plan.is_empty else EXIT_FINDINGS
+
+    from core.requirements_sync import execute_sync
+
+    result = execute_sync(plan, manager.python_executable)
+    if plan.is_empty:
+        # Nothing ran; only the requested marks were recorded
+        _emit(args, plan.to_dict(), lines)
+        return EXIT_OK
+    result["plan"] = plan.to_dict()
+    if plan.removals_deferred:
+        lines += [f"  remove {name}" for name in result["removed"]]
+    _emit(args, result, lines + ["", result["output"]])
+    return EXIT_OK if result["success"] else EXIT_FAILURE
+
+
+def cmd_cleanup(args):
+    """Remove installed distributions nothing requested needs"""
+    from core.cleanup_manager import CleanupManager
+
+    manager = CleanupManager(args.python)
+    plan = manager.plan(keep=args.keep)
+    lines = [plan.summary()] + [f"  {c.name} {c.version}" for c in plan.candidates]
+    if args.dry_run or plan.is_empty:
+        _emit(args, plan.to_dict(), lines)
+        return EXIT_FINDINGS if args.dry_run and not plan.is_empty else EXIT_OK
+
+    success, output = manager.remove(plan.names())
+    result = {"success": success, "removed": plan.names(), "output": output, "plan": plan.to_dict()}
+    _emit(args, result, lines + ["", output])
+    return EXIT_OK if success else EXIT_FAILURE
+
+
+def cmd_graph(args):
+    """Export the dependency graph as DOT, JSON node-link or GraphML"""
+    from core.dependency_graph import get_dependency_graph
+    from core.graph_export import export_graph
+
+    installed = {"installed": True, "missing": False}.get(args.only)
+    success, message = export_graph(get_dependency_graph(args.python), args.output, args.format,
+                                    roots=args.root or None, depth=args.depth,
+                                    installed=installed, reverse=args.reverse)
+    _emit(args, {"success": success, "message": message, "output": args.output}, [message])
+    return EXIT_OK if success else EXIT_FAILURE
+
+
+def cmd_check(args):
+    """Report installed requirements that are missing or not satisfied"""
+    from core.conflict_checker import check_environment
+
+    conflicts = check_environment(args.python)
+    lines = [c.describe() for c in conflicts] or ["No broken requirements found."]
+    _emit(args, {"conflicts": [c.to_dict() for c in conflicts]}, lines)
+    return EXIT_FINDINGS if conflicts else EXIT_OK
+
+
+def cmd_lock(args):
+    """Lock the environment with artifact hashes"""
+    from core.requirements_manager import RequirementsManager
+
+    success, message = RequirementsManager(args.python).export_lockfile(args.file, args.wheelhouse)
+    _emit(args, {"success": success, "message": message}, [message])
+    return EXIT_OK if success else EXIT_FAILURE
+
+
+def cmd_install_lock(args):
+    """Install a lockfile offline from a wheelhouse"""
+    from core.requirements_manager import RequirementsManager
+
+    success, output = RequirementsManager(args.python).install_lockfile(
+        args.file, args.wheelhouse, force=args.force)
+    _emit(args, {"success": success, "output": output}, [output])
+    return EXIT_OK if success else EXIT_FAILURE
+
+
+def cmd_wheelhouse(args):
+    """Inspect, fill or trim the local wheelhouse"""
+    from core.wheelhouse import get_wheelhouse
+
+    wheelhouse = get_wheelhouse()
+    if wheelhouse is None:
+        _emit(args, {"error": "wheelhouse is disabled"}, ["The wheelhouse is disabled"])
+        return EXIT_FAILURE
+
+    if args.action == "list":
+        artifacts = wheelhouse.artifacts()
+        total = sum(a["size"] for a in artifacts)
+        lines = [f"{wheelhouse.path}: {len(artifacts)} files, {total / 1024 / 1024:.1f} MB"]
+        lines += [f"  {a['filename']}  ({a['size'] / 1024:.0f} KB)" for a in artifacts]
+        _emit(args, {"path": wheelhouse.path, "artifacts": artifacts, "total_bytes": total}, lines)
+        return EXIT_OK
+
+    if args.action == "evict":
+        if args.max_mb is not None:
+            wheelhouse.max_bytes = int(args.max_mb * 1024 * 1024)
+        removed = wheelhouse.evict()
+        _emit(args, {"removed": removed}, [f"Removed {len(removed)} files"] + [f"  {f}" for f in removed])
+        return EXIT_OK
+
+    requirements = list(args.requirements)
+    if args.requirement_file:
+        from core.requirements_diff import requirement_spec
+        from core.requirements_parser import parse_requirements
+        requirements += [requirement_spec(req) for req in parse_requirements(args.requirement_file)
+                         if req.name and not req.editable]
+    if not requirements:
+        _emit(args, {"error": "nothing to prefetch"}, ["Nothing to prefetch"])
+        return EXIT_USAGE
+
+    results = wheelhouse.prefetch(requirements, args.python, jobs=args.jobs, with_deps=not args.no_deps)
+    lines = []
+    for result in results:
+        status = f"{len(result['added'])} new" if result["success"] else f"FAILED: {result['error'].strip()[-200:]}"
+        lines.append(f"  {result['requirement']}: {status}")
+    _emit(args, {"results": results}, lines)
+    return EXIT_OK if all(r["success"] for r in results) else EXIT_FAILURE
+
+
+def cmd_snapshot(args):
+    """List, take or restore snapshots of the installed set"""
+    from core.snapshot_manager import SnapshotManager
+
+    manager = SnapshotManager()
+    python = args.python or sys.executable
+
+    if args.action == "list":
+        snapshots = manager.list_snapshots(python)
+        lines = [f"{s.id}  {s.label or '-'}  ({len(s.installed)} installed, {len(s.wheels)} archived)"
+                 for s in snapshots]
+        _emit(args, {"snapshots": [s.to_dict() for s in snapshots]}, lines or ["No snapshots"])
+        return EXIT_OK
+
+    if args.action == "create":
+        snapshot = manager.take(python, args.label or "Manual snapshot", args.target or None)
+        _emit(args, snapshot.to_dict(),
+              [f"Created snapshot {snapshot.id} ({len(snapshot.wheels)} wheels archived)"])
+        return EXIT_OK
+
+    if args.target:
+        snapshot = manager.get(args.target[0])
+    else:
+        snapshots = manager.list_snapshots(python)
+        snapshot = snapshots[0] if snapshots else None
+    if snapshot is None:
+        _emit(args, {"error": "snapshot not found"}, ["Snapshot not found"])
+        return EXIT_FAILURE
+
+    success, message = manager.rollback(snapshot)
+    _emit(args, {"success": success, "snapshot": snapshot.id, "message": message}, [message])
+    return EXIT_OK if success else EXIT_FAILURE
+
+
+def cmd_venvs(args):
+    """List virtual environments"""
+    from core.venv_manager import VirtualEnvManager
+
+    venvs = VirtualEnvManager().list_venvs(args.path, jobs=args.jobs)
+    lines = [f"{v['name']}: Python {v['python_version']}, {v['package_count']} packages, {v['size']}"
+             for v in venvs]
+    _emit(args, {"venvs": venvs}, lines or ["No virtual environments found"])
+    return EXIT_OK
+
+
+def build_parser():
+    """Create the argument parser"""
+    parser = argparse.ArgumentParser(prog="python -m core", description="Library Manager (headless)")
+    parser.add_argument("--python", default=None, help="interpreter to operate on")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    parser.add_argument("--trace", default=None, metavar="FILE",
+                        help="write a Chrome trace-event file of subprocesses, scans and cache lookups")
+    subparsers = parser.add_subparsers(dest="command")
+
+    scan = subparsers.add_parser("scan", help="list installed packages found in the catalog")
+    scan.add_argument("--all", action="store_true", help="also list every installed package")
+    scan.set_defaults(handler=cmd_scan)
+
+    outdated = subparsers.add_parser("outdated", help="list outdated packages")
+    outdated.add_argument("--cached", action="store_true",
+                          help="show the last (background) check result without running pip")
+    outdated.set_defaults(handler=cmd_outdated)
+
+    update = subparsers.add_parser("update", help="upgrade packages (failures are isolated)")
+    update.add_argument("packages", nargs="*", help="packages to upgrade")
+    update.add_argument("--all", action="store_true", help="upgrade every outdated package")
+    update.set_defaults(handler=cmd_update)
+
+    install = subparsers.add_parser("install", help="install packages")
+    install.add_argument("packages", nargs="+", help="requirement specifiers")
+    install.set_defaults(handler=cmd_install)
+
+    req_diff = subparsers.add_parser("req-diff", help="compare a requirements file with the environment")
+    req_diff.add_argument("file", help="requirements file")
+    req_diff.set_defaults(handler=cmd_req_diff)
+
+    sync = subparsers.add_parser("sync", help="install/upgrade/downgrade/remove exactly what differs")
+    sync.add_argument("file", help="requirements file")
+    sync.add_argument("--remove-extra", action="store_true",
+                      help="uninstall distributions nothing in the file requires")
+    sync.add_argument("--dry-run", action="store_true", help="only print the plan")
+    sync.set_defaults(handler=cmd_sync)
+
+    cleanup = subparsers.add_parser("cleanup", help="remove distributions nothing requested needs")
+    cleanup.add_argument("--keep", nargs="*", default=[], metavar="PACKAGE",
+                         help="also keep these (and what they need)")
+    cleanup.add_argument("--dry-run", action="store_true", help="only list the unused distributions")
+    cleanup.set_defaults(handler=cmd_cleanup)
+
+    check = subparsers.add_parser("check", help="find missing or unsatisfied installed requirements")
+    check.set_defaults(handler=cmd_check)
+
+    graph = subparsers.add_parser("graph", help="export the dependency graph (DOT, JSON, GraphML)")
+    graph.add_argument("-o", "--output", required=True, help="file to write")
+    graph.add_argument("--format", choices=["dot", "json", "graphml"], default=None,
+                       help="output format (default: from the file extension)")
+    graph.add_argument("--root", nargs="*", default=[], metavar="PACKAGE",
+                       help="only these packages and what they depend on")
+    graph.add_argument("--depth", type=int, default=None, help="edges to follow from the roots")
+    graph.add_argument("--reverse", action="store_true", help="follow dependents instead of dependencies")
+    graph.add_argument("--only", choices=["installed", "missing"], default=None,
+                       help="keep only installed packages or only missing requirements")
+    graph.set_defaults(handler=cmd_graph)
+
+    lock = subparsers.add_parser("lock", help="write a hash-pinned lockfile and fill the wheelhouse")
+    lock.add_argument("file", help="lockfile to write")
+    lock.add_argument("--wheelhouse", default=None, help="artifact directory (default: cache wheelhouse)")
+    lock.set_defaults(handler=cmd_lock)
+
+    install_lock = subparsers.add_parser("install-lock", help="install a lockfile offline")
+    install_lock.add_argument("file", help="lockfile to install")
+    install_lock.add_argument("--wheelhouse", default=None, help="artifact directory (default: cache wheelhouse)")
+    install_lock.add_argument("--force", action="store_true",
+                              help="ignore interpreter mismatches and skip editable/VCS entries")
+    install_lock.set_defaults(handler=cmd_install_lock)
+
+    wheels = subparsers.add_parser("wheelhouse", help="manage the local wheel cache")
+    wheels.add_argument("action", choices=["list", "prefetch", "evict"])
+    wheels.add_argument("requirements", nargs="*", help="requirements to prefetch")
+    wheels.add_argument("-r", dest="requirement_file", default=None, help="prefetch a requirements file")
+    wheels.add_argument("--jobs", type=int, default=4, help="parallel pip processes")
+    wheels.add_argument("--no-deps", action="store_true", help="do not fetch dependencies")
+    wheels.add_argument("--max-mb", type=float, default=None, help="size limit for evict")
+    wheels.set_defaults(handler=cmd_wheelhouse)
+
+    snapshot = subparsers.add_parser("snapshot", help="snapshot or roll back the installed set")
+    snapshot.add_argument("action", choices=["list", "create", "rollback"])
+    snapshot.add_argument("target", nargs="*",
+                          help="create: packages whose wheels to archive (default: all); rollback: snapshot id")
+    snapshot.add_argument("--label", default=None, help="description for create")
+    snapshot.set_defaults(handler=cmd_snapshot)
+
+    venvs = subparsers.add_parser("venvs", help="list virtual environments")
+    venvs.add_argument("--path", default=None, help="directory to search (default: ~/venvs)")
+    venvs.add_argument("--jobs", type=int, default=4, help="environments to inspect in parallel")
+    venvs.set_defaults(handler=cmd_venvs)
+
+    return parser
+
+
+def main(argv=None):
+    """Run the CLI and return the exit code"""
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return EXIT_USAGE if e.code else EXIT_OK
+
+    if not getattr(args, "handler", None):
+        parser.print_help()
+        return EXIT_USAGE
+
+    try:
+        return args.handler(args)
+    except BrokenPipeError:
+        # Output piped into e.g. 'head' - not an error
+        import os
+        sys.stdout = open(os.devnull, "w")
+        return EXIT_OK
+    except KeyboardInterrupt:
+        return EXIT_FAILURE
+    except Exception as e:
+        _emit(args, {"error": str(e)}, [f"Error: {e}"])
+        return EXIT_FAILURE
+    finally:
+        if args.trace:
+            from core import tracing
+            success, message = tracing.export_chrome_trace(args.trace)
+            sys.stderr.write(message + "\n")
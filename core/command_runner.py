@@ -0,0 +1,209 @@
+"""Command Runner - shared execution of read-only pip queries
+
+Read-only commands ('pip show', 'pip list', 'pip freeze', 'python
+--version') go through one CommandRunner, which
+
+- coalesces identical commands that are already running: a second caller
+  waits for the first one's result instead of spawning another process
+- memoizes results while the target environment is unchanged: the memo
+  key includes a fingerprint of the interpreter's sys.path directories
+  (installing, upgrading or removing anything changes their mtimes), and
+  entries also expire after a short TTL
+- counts every process it spawns (see also tracing.spawn_counts())
+
+So a query about one package spawns pip at most once per environment
+change, however many dialogs ask.
+"""
+
+import os
+import shutil
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core import tracing
+
+DEFAULT_TTL = 120.0
+MAX_ENTRIES = 1024
+
+
+def interpreter_for_command(args: Sequence[str]) -> str:
+    """Guess which interpreter's environment a command reads"""
+    program = str(args[0]) if args else ""
+    if len(args) > 2 and str(args[1]) == "-m":
+        return program
+    name = os.path.basename(program).lower()
+    if name.startswith("python"):
+        return program
+    if name.startswith("pip"):
+        # 'pip' on PATH belongs to the interpreter next to it
+        resolved = shutil.which(program)
+        if resolved:
+            directory = os.path.dirname(os.path.realpath(resolved))
+            for candidate in ("python", "python3", "python.exe"):
+                path = os.path.join(directory, candidate)
+                if os.path.isfile(path):
+                    return path
+    return sys.executable
+
+
+def environment_fingerprint(python_executable: Optional[str] = None, include_paths: bool = True) -> Tuple:
+    """
+    Cheap token that changes whenever an interpreter's environment changes
+
+    Args:
+        python_executable: Interpreter path (defaults to the running one)
+        include_paths: Also watch sys.path (False for questions about the
+                       interpreter itself, like --version)
+
+    Returns:
+        tuple: (path, mtime) for the interpreter and its sys.path directories
+    """
+    from core.installed_index import get_interpreter_paths
+
+    python_executable = python_executable or sys.executable
+    paths = [python_executable]
+    if include_paths:
+        paths += get_interpreter_paths(python_executable)
+    state = []
+    for path in paths:
+        try:
+            state.append((path, os.stat(path).st_mtime_ns))
+        except OSError:
+            state.append((path, None))
+    return tuple(state)
+
+
+class _Pending:
+    """A command some thread is running right now"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class CommandRunner:
+    """Runs read-only commands at most once per environment state"""
+
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        self.ttl = ttl
+        self._memo: Dict[Tuple, Tuple[float, object]] = {}
+        self._in_flight: Dict[Tuple, _Pending] = {}
+        self._lock = threading.Lock()
+        self.stats = {"spawned": 0, "memo_hits": 0, "coalesced": 0}
+
+    def run(self, args: Sequence[str], python_executable: Optional[str] = None,
+            ttl: Optional[float] = None, **kwargs):
+        """
+        Run a read-only command, reusing a recent or in-flight result
+
+        Args:
+            args: Command line
+            python_executable: Interpreter whose environment the command
+                               reads (guessed from args by default)
+            ttl: Seconds a result may be reused (default: the runner's)
+            **kwargs: Passed to subprocess.run; 'timeout' is not part of
+                      the memo key
+
+        Returns:
+            subprocess.CompletedProcess: Shared between callers - treat as
+            read-only
+
+        Raises:
+            Whatever subprocess.run raises (also in coalesced callers)
+        """
+        argv = tuple(str(arg) for arg in args)
+        options = tuple(sorted((k, repr(v)) for k, v in kwargs.items() if k != "timeout"))
+        fingerprint = environment_fingerprint(python_executable or interpreter_for_command(argv),
+                                              include_paths=argv[1:] not in (("--version",), ("-V",)))
+        key = (argv, options, fingerprint)
+        ttl = self.ttl if ttl is None else ttl
+
+        with self._lock:
+            memo = self._memo.get(key)
+            if memo is not None and time.monotonic() - memo[0] < ttl:
+                self.stats["memo_hits"] += 1
+                tracing.record_cache("commands", True)
+                return memo[1]
+            pending = self._in_flight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._in_flight[key] = _Pending()
+            else:
+                self.stats["coalesced"] += 1
+
+        if not owner:
+            tracing.record_cache("commands", True)
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.result
+
+        tracing.record_cache("commands", False)
+        try:
+            pending.result = tracing.run(list(argv), **kwargs)
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                self.stats["spawned"] += 1
+                del self._in_flight[key]
+                if pending.error is None:
+                    self._memo[key] = (time.monotonic(), pending.result)
+                    while len(self._memo) > MAX_ENTRIES:
+                        del self._memo[next(iter(self._memo))]
+            pending.done.set()
+        return pending.result
+
+    def invalidate(self):
+        """Forget all memoized results (e.g. after changing pip configuration)"""
+        with self._lock:
+            self._memo.clear()
+
+
+_runner: Optional[CommandRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_command_runner() -> CommandRunner:
+    """Get the shared runner"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = CommandRunner()
+        return _runner
+
+
+def run_read_only(args: Sequence[str], **kwargs):
+    """Run a read-only command through the shared runner (see CommandRunner.run)"""
+    return get_command_runner().run(args, **kwargs)
+
+
+def parse_pip_show(output: str) -> List[Dict[str, str]]:
+    """
+    Split 'pip show' output into one field mapping per package
+
+    Continuation lines (e.g. a multi-line License) are appended to the
+    preceding field.
+    """
+    packages = []
+    info: Dict[str, str] = {}
+    last_key = None
+    for line in output.splitlines():
+        if line.strip() == "---":
+            if info:
+                packages.append(info)
+            info, last_key = {}, None
+            continue
+        if ":" in line and not line.startswith((" ", "\t")):
+            key, value = line.split(":", 1)
+            last_key = key.strip()
+            info[last_key] = value.strip()
+        elif last_key and line.strip():
+            info[last_key] += "\n" + line.strip()
+    if info:
+        packages.append(info)
+    return packages
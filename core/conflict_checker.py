@@ -0,0 +1,208 @@
+"""Conflict Checker - broken requirements in the installed environment
+
+Like 'pip check', but in-process and incremental. Every Requires-Dist
+edge of every installed distribution (markers evaluated for the target
+interpreter, no extras) is checked against the installed index:
+
+    missing    the required distribution is not installed
+    version    the installed version does not satisfy the specifier
+
+The checker remembers each distribution's applicable edges and the
+version it last saw. A later check() compares the index with that state
+and re-evaluates only the edges leaving changed distributions and the
+edges pointing at them, so running it after every install or uninstall
+costs a few specifier tests rather than a full pass. Specifier objects
+are parsed once per distinct specifier text and shared.
+"""
+
+import sys
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from core import tracing
+
+MISSING = "missing"
+VERSION = "version"
+
+_specifiers: Dict[str, object] = {}
+_specifiers_lock = threading.Lock()
+
+
+def _specifier(text: str):
+    """Shared SpecifierSet for a specifier string"""
+    specifier = _specifiers.get(text)
+    if specifier is not None:
+        tracing.record_cache("specifiers", True)
+        return specifier
+    tracing.record_cache("specifiers", False)
+    from packaging.specifiers import SpecifierSet
+
+    specifier = SpecifierSet(text)
+    with _specifiers_lock:
+        _specifiers[text] = specifier
+    return specifier
+
+
+class Conflict:
+    """One unsatisfied requirement"""
+
+    def __init__(self, kind: str, package: str, package_version: str, requirement: str,
+                 dependency: str, installed_version: Optional[str] = None):
+        self.kind = kind  # MISSING or VERSION
+        self.package = package
+        self.package_version = package_version
+        self.requirement = requirement  # e.g. 'urllib3<3,>=1.21.1'
+        self.dependency = dependency
+        self.installed_version = installed_version
+
+    def describe(self) -> str:
+        """pip check style message"""
+        if self.kind == MISSING:
+            return f"{self.package} {self.package_version} requires {self.dependency}, which is not installed."
+        return (f"{self.package} {self.package_version} has requirement {self.requirement}, "
+                f"but you have {self.dependency} {self.installed_version}.")
+
+    def to_dict(self) -> Dict:
+        """Plain-dict form"""
+        return {
+            "kind": self.kind,
+            "package": self.package,
+            "version": self.package_version,
+            "requirement": self.requirement,
+            "dependency": self.dependency,
+            "installed": self.installed_version,
+        }
+
+    def __repr__(self):
+        return f"Conflict('{self.describe()}')"
+
+
+class ConflictChecker:
+    """Incrementally checks one interpreter's installed requirements"""
+
+    def __init__(self, python_executable: Optional[str] = None):
+        self.python_executable = python_executable or sys.executable
+        self._lock = threading.Lock()
+        # key -> (version, metadata path) as of the last check
+        self._state: Dict[str, Tuple[str, str]] = {}
+        # source key -> [(dependency key, specifier text, requirement text, dependency name)]
+        self._edges: Dict[str, List[Tuple[str, str, str, str]]] = {}
+        # dependency key -> source keys requiring it
+        self._dependents: Dict[str, Set[str]] = {}
+        self._conflicts: Dict[str, List[Conflict]] = {}
+        self.last_checked_edges = 0
+
+    def _load_edges(self, dist, environment: Dict[str, str]) -> List[Tuple[str, str, str, str]]:
+        from core.installed_index import canonical_name
+
+        edges = []
+        seen = set()
+        for req in dist.requirements:
+            if req.marker is not None:
+                try:
+                    if not req.marker.evaluate(environment):
+                        continue
+                except Exception:
+                    continue
+            key = canonical_name(req.name)
+            if key == dist.key or (key, str(req.specifier)) in seen:
+                continue
+            seen.add((key, str(req.specifier)))
+            edges.append((key, str(req.specifier), f"{req.name}{req.specifier}", req.name))
+        return edges
+
+    def _check_source(self, dist, index) -> List[Conflict]:
+        conflicts = []
+        for key, specifier_text, requirement, name in self._edges.get(dist.key, ()):
+            self.last_checked_edges += 1
+            installed = index.get(key)
+            if installed is None:
+                conflicts.append(Conflict(MISSING, dist.display_name, dist.version, requirement, name))
+                continue
+            if not specifier_text:
+                continue
+            version = installed.parsed_version
+            if version is None:
+                continue  # unparsable version; pip check skips these too
+            if not _specifier(specifier_text).contains(version, prereleases=True):
+                conflicts.append(Conflict(VERSION, dist.display_name, dist.version, requirement,
+                                          installed.display_name, installed.version))
+        return conflicts
+
+    def check(self, full: bool = False) -> List[Conflict]:
+        """
+        Get the broken requirements of the environment
+
+        Args:
+            full: Re-evaluate every edge instead of only the changed ones
+
+        Returns:
+            list: Conflicts, sorted by package
+        """
+        from core.installed_index import get_installed_index, get_marker_environment
+
+        with self._lock, tracing.span("conflicts.check", tracing.PARSE, python=self.python_executable) as span:
+            index = get_installed_index(self.python_executable)
+            state = {dist.key: (dist.version, dist.path) for dist in index}
+            if full or not self._state:
+                self._edges.clear()
+                self._dependents.clear()
+                self._conflicts.clear()
+                changed = set(state)
+            else:
+                changed = {key for key in set(state) | set(self._state) if state.get(key) != self._state.get(key)}
+
+            environment = dict(get_marker_environment(self.python_executable) or {})
+            environment["extra"] = ""
+
+            # Edges leaving changed distributions are reloaded
+            for key in changed:
+                for dep_key, *_ in self._edges.pop(key, ()):
+                    self._dependents.get(dep_key, set()).discard(key)
+                self._conflicts.pop(key, None)
+                dist = index.get(key) if key in state else None
+                if dist is not None:
+                    self._edges[key] = self._load_edges(dist, environment)
+                    for dep_key, *_ in self._edges[key]:
+                        self._dependents.setdefault(dep_key, set()).add(key)
+
+            # ...and re-checked, together with the edges pointing at them
+            recheck = {key for key in changed if key in state}
+            for key in changed:
+                recheck |= self._dependents.get(key, set())
+
+            self.last_checked_edges = 0
+            for key in recheck:
+                dist = index.get(key)
+                if dist is None:
+                    continue
+                conflicts = self._check_source(dist, index)
+                if conflicts:
+                    self._conflicts[key] = conflicts
+                else:
+                    self._conflicts.pop(key, None)
+
+            self._state = state
+            result = [c for key in sorted(self._conflicts) for c in self._conflicts[key]]
+            span.set(changed=len(changed), rechecked=len(recheck), edges=self.last_checked_edges,
+                     conflicts=len(result))
+            return result
+
+
+_checkers: Dict[str, ConflictChecker] = {}
+_checkers_lock = threading.Lock()
+
+
+def get_conflict_checker(python_executable: Optional[str] = None) -> ConflictChecker:
+    """Get the shared checker of an interpreter"""
+    python_executable = python_executable or sys.executable
+    with _checkers_lock:
+        checker = _checkers.get(python_executable)
+        if checker is None:
+            checker = _checkers[python_executable] = ConflictChecker(python_executable)
+        return checker
+
+
+def check_environment(python_executable: Optional[str] = None, full: bool = False) -> List[Conflict]:
+    """Check an interpreter's installed requirements (see ConflictChecker.check)"""
+    return get_conflict_checker(python_executable).check(full)
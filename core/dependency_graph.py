@@ -0,0 +1,296 @@
+"""Dependency Graph - whole-environment graph with removal impact analysis
+
+The graph of one interpreter's installed distributions is built once from
+the InstalledIndex (requirements evaluated against the interpreter's marker
+environment) and cached until the environment changes. Requirements that
+are not installed become nodes too, marked as missing.
+
+Nodes are numbered, and each node's dependencies and dependents are kept
+as bitsets (Python ints, bit i = node i), so closures are a handful of
+big-integer ORs per visited node rather than set and dict churn:
+
+    graph = get_dependency_graph(python)
+    impact = graph.removal_impact(["requests"])
+    impact.affected       # everything that (transitively) needs requests
+    impact.orphans        # dependencies nothing else needs afterwards
+"""
+
+import sys
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core import tracing
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Indexes of the set bits, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class RemovalImpact:
+    """What removing a set of packages does to the rest of the environment"""
+
+    def __init__(self, removed: List[str], direct_dependents: List[str], affected: List[str],
+                 orphans: List[str], blocked: List[str]):
+        self.removed = removed                        # the requested packages that are installed
+        self.direct_dependents = direct_dependents    # remaining packages requiring one of them
+        self.affected = affected                      # remaining packages needing one, transitively
+        self.orphans = orphans                        # dependencies nothing remaining needs
+        self.blocked = blocked                        # requested packages something remaining needs
+
+    @property
+    def safe_to_remove(self) -> List[str]:
+        """Requested packages nothing else needs, plus the orphans they leave behind"""
+        blocked = set(self.blocked)
+        return [name for name in self.removed if name not in blocked] + self.orphans
+
+    @property
+    def is_safe(self) -> bool:
+        return not self.affected
+
+    def __repr__(self):
+        return (f"RemovalImpact(removed={len(self.removed)}, affected={len(self.affected)}, "
+                f"orphans={len(self.orphans)})")
+
+
+class DependencyGraph:
+    """Installed distributions of one interpreter as a bitset-backed graph"""
+
+    def __init__(self, python_executable: Optional[str] = None):
+        self.python_executable = python_executable or sys.executable
+        self.keys: List[str] = []
+        self.names: List[str] = []
+        self.versions: List[Optional[str]] = []  # None: required but not installed
+        self.requirements: List[Dict[int, str]] = []  # dependency index -> requirement text
+        self.forward: List[int] = []  # dependency bitsets
+        self.reverse: List[int] = []  # dependent bitsets
+        self.installed_mask = 0
+        self._positions: Dict[str, int] = {}
+        self.fingerprint: Tuple = ()
+
+    def _add_node(self, key: str, name: str, version: Optional[str]) -> int:
+        position = len(self.keys)
+        self._positions[key] = position
+        self.keys.append(key)
+        self.names.append(name)
+        self.versions.append(version)
+        self.requirements.append({})
+        self.forward.append(0)
+        self.reverse.append(0)
+        return position
+
+    @classmethod
+    def from_index(cls, index, environment: Optional[Dict[str, str]] = None) -> "DependencyGraph":
+        """
+        Build the graph from an InstalledIndex
+
+        Args:
+            index: InstalledIndex of the interpreter
+            environment: Its marker environment (see get_marker_environment)
+
+        Returns:
+            DependencyGraph: The graph
+        """
+        from core.installed_index import canonical_name
+
+        graph = cls(index.python_executable)
+        graph.fingerprint = index.fingerprint()
+        with tracing.span("dependency_graph.build", tracing.PARSE, python=graph.python_executable) as span:
+            distributions = sorted(index, key=lambda dist: dist.key)
+            for dist in distributions:
+                graph._add_node(dist.key, dist.display_name, dist.version)
+            graph.installed_mask = (1 << len(graph.keys)) - 1
+
+            marker_environment = dict(environment or {})
+            marker_environment["extra"] = ""
+            edges = 0
+            for dist in distributions:
+                source = graph._positions[dist.key]
+                for req in dist.requirements:
+                    if req.marker is not None:
+                        try:
+                            if not req.marker.evaluate(marker_environment):
+                                continue
+                        except Exception:
+                            continue
+                    key = canonical_name(req.name)
+                    if key == dist.key:
+                        continue
+                    target = graph._positions.get(key)
+                    if target is None:
+                        target = graph._add_node(key, req.name, None)
+                    if target in graph.requirements[source]:
+                        continue  # the same name under two markers
+                    graph.requirements[source][target] = str(req.specifier)
+                    graph.forward[source] |= 1 << target
+                    graph.reverse[target] |= 1 << source
+                    edges += 1
+            span.set(nodes=len(graph.keys), edges=edges)
+        return graph
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, name):
+        return self.position(name) is not None
+
+    def position(self, name: str) -> Optional[int]:
+        """Node number of a package (any spelling), or None"""
+        from core.installed_index import canonical_name
+
+        return self._positions.get(canonical_name(name))
+
+    def mask(self, names: Iterable[str]) -> int:
+        """Bitset of the given packages (unknown names are ignored)"""
+        mask = 0
+        for name in names:
+            position = self.position(name)
+            if position is not None:
+                mask |= 1 << position
+        return mask
+
+    def names_of(self, mask: int) -> List[str]:
+        """Display names of a bitset, sorted case-insensitively"""
+        return sorted((self.names[i] for i in iter_bits(mask)), key=str.lower)
+
+    def is_installed(self, name: str) -> bool:
+        position = self.position(name)
+        return position is not None and self.versions[position] is not None
+
+    def closure(self, start: int, adjacency: List[int], allowed: int = -1) -> int:
+        """
+        Bitset of everything reachable from start (start included)
+
+        Args:
+            start: Bitset of the starting nodes
+            adjacency: self.forward (dependencies) or self.reverse (dependents)
+            allowed: Bitset of the nodes the walk may pass through
+        """
+        seen = start
+        frontier = start
+        while frontier:
+            reached = 0
+            for i in iter_bits(frontier):
+                reached |= adjacency[i]
+            frontier = reached & allowed & ~seen
+            seen |= frontier
+        return seen
+
+    def dependencies(self, name: str, transitive: bool = False) -> List[str]:
+        """Packages a package requires (directly, or its whole closure)"""
+        start = self.mask([name])
+        if not start:
+            return []
+        reached = self.closure(start, self.forward) if transitive else self.forward[self.position(name)]
+        return self.names_of(reached & ~start)
+
+    def dependents(self, name: str, transitive: bool = False) -> List[str]:
+        """Installed packages requiring a package (directly, or transitively)"""
+        start = self.mask([name])
+        if not start:
+            return []
+        reached = self.closure(start, self.reverse) if transitive else self.reverse[self.position(name)]
+        return self.names_of(reached & ~start)
+
+    def reverse_closure(self, names: Iterable[str]) -> List[str]:
+        """Installed packages that transitively need any of the given ones"""
+        start = self.mask(names)
+        return self.names_of(self.closure(start, self.reverse) & ~start)
+
+    def unreachable(self, roots: int, removed: int = 0) -> int:
+        """
+        Installed packages no root needs once removed packages are gone
+
+        Args:
+            roots: Bitset of the packages to keep
+            removed: Bitset of the packages being removed
+
+        Returns:
+            int: Bitset of the installed packages outside the roots'
+                 dependency closure (removed packages excluded)
+        """
+        remaining = self.installed_mask & ~removed
+        needed = self.closure(roots & remaining, self.forward, allowed=remaining)
+        return remaining & ~needed
+
+    def removal_impact(self, names: Iterable[str], keep: Iterable[str] = ()) -> RemovalImpact:
+        """
+        Analyse removing packages before doing it
+
+        A dependency of the removed packages becomes an orphan when no
+        remaining package needs it anymore (directly or through other
+        remaining packages). Packages in keep, and pip/setuptools/wheel, are
+        never reported as orphans.
+
+        Args:
+            names: Packages to remove
+            keep: Packages that must stay installed (e.g. explicitly requested ones)
+
+        Returns:
+            RemovalImpact: The analysis
+        """
+        from core.requirements_sync import PROTECTED_DISTRIBUTIONS
+
+        with tracing.span("dependency_graph.removal_impact", tracing.PARSE) as span:
+            removed = self.mask(names) & self.installed_mask
+            remaining = self.installed_mask & ~removed
+
+            direct = 0
+            for i in iter_bits(removed):
+                direct |= self.reverse[i]
+            affected = self.closure(removed, self.reverse, allowed=remaining) & remaining
+
+            blocked = 0
+            for i in iter_bits(removed):
+                if self.reverse[i] & remaining:
+                    blocked |= 1 << i
+
+            # Candidates: what only the removed packages pulled in. Everything
+            # else that stays is a root; candidates it still reaches survive.
+            candidates = self.closure(removed, self.forward) & remaining
+            candidates &= ~self.mask(list(keep) + sorted(PROTECTED_DISTRIBUTIONS))
+            roots = remaining & ~candidates
+            orphans = candidates & ~self.closure(roots, self.forward, allowed=remaining)
+
+            span.set(removed=bin(removed).count("1"), affected=bin(affected).count("1"),
+                     orphans=bin(orphans).count("1"))
+            return RemovalImpact(self.names_of(removed), self.names_of(direct & remaining),
+                                 self.names_of(affected), self.names_of(orphans), self.names_of(blocked))
+
+
+# Shared graphs, one per interpreter
+_graphs: Dict[str, DependencyGraph] = {}
+_graphs_lock = threading.Lock()
+
+
+def get_dependency_graph(python_executable: Optional[str] = None) -> DependencyGraph:
+    """
+    Get the up-to-date graph of an interpreter's environment
+
+    The graph is rebuilt only when the environment fingerprint changes.
+
+    Args:
+        python_executable: Interpreter path (defaults to the running one)
+
+    Returns:
+        DependencyGraph: The graph (treat as read-only)
+    """
+    from core.installed_index import get_installed_index, get_marker_environment
+
+    python_executable = python_executable or sys.executable
+    index = get_installed_index(python_executable)
+    fingerprint = index.fingerprint()
+    with _graphs_lock:
+        graph = _graphs.get(python_executable)
+        if graph is not None and graph.fingerprint == fingerprint:
+            tracing.record_cache("dependency_graph", True)
+            return graph
+    tracing.record_cache("dependency_graph", False)
+
+    graph = DependencyGraph.from_index(index, get_marker_environment(python_executable))
+    with _graphs_lock:
+        _graphs[python_executable] = graph
+    return graph
@@ -1,67 +1,140 @@
 """Dependency Manager"""
 
-import subprocess
 import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
 
+from core import tracing
 
-class DependencyManager:
-    """Manages package dependencies"""
+# Resolved dependency nodes shared by all managers (and dialogs):
+# python -> (environment fingerprint, canonical name -> node)
+_node_cache: Dict[str, Tuple[Tuple, Dict[str, Dict]]] = {}
+_node_cache_lock = threading.Lock()
+_prefetch_pool: Optional[ThreadPoolExecutor] = None
 
-    def __init__(self):
-        pass
 
-    def get_package_dependencies(self, package_name):
-        """Get dependencies of a package"""
-        try:
-            result = subprocess.run(
-                ["pip", "show", package_name],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+def _get_prefetch_pool() -> ThreadPoolExecutor:
+    global _prefetch_pool
+    with _node_cache_lock:
+        if _prefetch_pool is None:
+            _prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="dependency-prefetch")
+        return _prefetch_pool
 
-            if result.returncode != 0:
-                return None, "Package not installed"
 
-            dependencies = []
-            for line in result.stdout.split('\n'):
-                if line.startswith("Requires:"):
-                    deps_str = line.split(":", 1)[1].strip()
-                    if deps_str and deps_str != "":
-                        # Split by comma and clean up
-                        dependencies = [d.strip() for d in deps_str.split(',')]
-                    break
+class DependencyManager:
+    """Manages package dependencies"""
 
-            return dependencies, None
+    def __init__(self, python_executable=None):
+        self.python_executable = python_executable or sys.executable
+
+    def _node_table(self, index) -> Dict[str, Dict]:
+        """The shared node table for the current environment state"""
+        fingerprint = index.fingerprint()
+        with _node_cache_lock:
+            cached = _node_cache.get(self.python_executable)
+            if cached is None or cached[0] != fingerprint:
+                cached = (fingerprint, {})
+                _node_cache[self.python_executable] = cached
+            return cached[1]
+
+    def get_dependency_node(self, package_name, cached_only=False):
+        """
+        Get one level of the dependency tree from the installed metadata
+
+        Nodes are cached across managers until the environment changes.
+
+        Args:
+            package_name: Package name (any spelling)
+            cached_only: Return None instead of resolving an uncached node
+
+        Returns:
+            dict: 'name', 'key', 'version' (None if not installed) and
+                  'children' (names of the applicable requirements)
+        """
+        from core.installed_index import canonical_name, get_installed_index, get_marker_environment
+
+        index = get_installed_index(self.python_executable)
+        nodes = self._node_table(index)
+        key = canonical_name(package_name)
+        node = nodes.get(key)
+        if node is not None or cached_only:
+            if node is not None:
+                tracing.record_cache("dependency_nodes", True)
+            return node
+        tracing.record_cache("dependency_nodes", False)
+
+        dist = index.get(key)
+        if dist is None:
+            node = {"name": package_name, "key": key, "version": None, "children": []}
+        else:
+            environment = get_marker_environment(self.python_executable)
+            children = []
+            for child_key in dist.dependency_keys(environment):
+                child = index.get(child_key)
+                children.append(child.display_name if child is not None else child_key)
+            node = {"name": dist.display_name, "key": key, "version": dist.version, "children": children}
+        nodes[key] = node
+        return node
+
+    def get_dependency_level(self, package_name):
+        """
+        Get a node together with the nodes of its children
+
+        Returns:
+            tuple: (node, list of child nodes)
+        """
+        node = self.get_dependency_node(package_name)
+        return node, [self.get_dependency_node(child) for child in node["children"]]
+
+    def prefetch_dependency_nodes(self, package_names):
+        """Resolve nodes in the background so expanding them later is instant"""
+        missing = [name for name in package_names if self.get_dependency_node(name, cached_only=True) is None]
+        if not missing:
+            return
+        pool = _get_prefetch_pool()
+        for name in missing:
+            pool.submit(self._prefetch_one, name)
+
+    def _prefetch_one(self, package_name):
+        try:
+            self.get_dependency_node(package_name)
+        except Exception:
+            pass  # resolved again (and reported) when actually needed
 
-        except Exception as e:
-            return None, str(e)
+    def _pip_show(self, package_name):
+        """
+        Get the 'pip show' fields of an installed package
 
-    def get_reverse_dependencies(self, package_name):
-        """Get packages that depend on this package"""
-        try:
-            result = subprocess.run(
-                ["pip", "show", package_name],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+        Answered by the persistent helper of the interpreter owning 'pip'
+        (falling back to a shared, memoized 'pip show'), so walking a tree
+        costs milliseconds per node.
 
-            if result.returncode != 0:
-                return None, "Package not installed"
+        Returns:
+            tuple: (fields dict or None, error message or None)
+        """
+        from core.pip_worker import pip_show
+        return pip_show(package_name)
 
-            reverse_deps = []
-            for line in result.stdout.split('\n'):
-                if line.startswith("Required-by:"):
-                    deps_str = line.split(":", 1)[1].strip()
-                    if deps_str and deps_str != "":
-                        reverse_deps = [d.strip() for d in deps_str.split(',')]
-                    break
+    @staticmethod
+    def _split_list(value):
+        """Split a comma-separated 'Requires'/'Required-by' value"""
+        return [d.strip() for d in (value or "").split(',') if d.strip()]
 
-            return reverse_deps, None
+    def get_package_dependencies(self, package_name):
+        """Get dependencies of a package"""
+        info, error = self._pip_show(package_name)
+        if info is None:
+            return None, error
+        return self._split_list(info.get("Requires")), None
 
-        except Exception as e:
-            return None, str(e)
+    def get_reverse_dependencies(self, package_name):
+        """Get packages that depend on this package"""
+        info, error = self._pip_show(package_name)
+        if info is None:
+            return None, error
+        return self._split_list(info.get("Required-by")), None
 
     def build_dependency_tree(self, package_name, max_depth=3, _current_depth=0, _visited=None):
         """Build a dependency tree for a package"""
@@ -102,8 +175,17 @@ class DependencyManager:
 
     def get_all_installed_packages(self):
         """Get list of all installed packages"""
+        from core.command_runner import interpreter_for_command, run_read_only
+        from core.pip_worker import PipWorkerError, get_pip_worker
+
+        try:
+            worker = get_pip_worker(interpreter_for_command(["pip"]))
+            return sorted(entry["name"] for entry in worker.list_distributions())
+        except PipWorkerError:
+            pass
+
         try:
-            result = subprocess.run(
+            result = run_read_only(
                 ["pip", "list", "--format=freeze"],
                 capture_output=True,
                 text=True,
@@ -158,24 +240,5 @@ class DependencyManager:
 
     def get_package_info_summary(self, package_name):
         """Get summary information about a package"""
-        try:
-            result = subprocess.run(
-                ["pip", "show", package_name],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-
-            if result.returncode != 0:
-                return None
-
-            info = {}
-            for line in result.stdout.split('\n'):
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    info[key.strip()] = value.strip()
-
-            return info
-
-        except Exception:
-            return None
+        info, _ = self._pip_show(package_name)
+        return info
@@ -0,0 +1,203 @@
+"""Graph Export - write the dependency graph as DOT, JSON node-link or GraphML
+
+The exporters stream: nodes and edges are written to the file one at a
+time as they are visited, so exporting a whole environment never builds
+the document in memory. A subgraph can be selected by root packages,
+depth and installed status:
+
+    graph = get_dependency_graph(python)
+    export_graph(graph, "deps.dot", "dot", roots=["requests"], depth=2)
+
+Formats:
+    dot      Graphviz ('dot -Tsvg deps.dot > deps.svg')
+    json     node-link JSON (networkx.node_link_graph, d3-force)
+    graphml  GraphML (Gephi, yEd, networkx.read_graphml)
+"""
+
+import json
+import os
+from typing import Iterable, List, Optional, TextIO, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+from core import tracing
+from core.dependency_graph import iter_bits
+
+FORMATS = {"dot": ".dot", "json": ".json", "graphml": ".graphml"}
+
+
+def select_nodes(graph, roots: Optional[Iterable[str]] = None, depth: Optional[int] = None,
+                 installed: Optional[bool] = None, reverse: bool = False) -> int:
+    """
+    Choose the nodes to export
+
+    Args:
+        graph: DependencyGraph
+        roots: Start from these packages (default: the whole graph)
+        depth: Follow at most this many edges from the roots (None: no limit)
+        installed: True for installed packages only, False for missing
+                   requirements only, None for both
+        reverse: Follow dependents instead of dependencies
+
+    Returns:
+        int: Bitset of the selected nodes
+    """
+    everything = (1 << len(graph)) - 1
+    if roots is None:
+        selected = everything
+    else:
+        adjacency = graph.reverse if reverse else graph.forward
+        selected = frontier = graph.mask(roots)
+        level = 0
+        while frontier and (depth is None or level < depth):
+            reached = 0
+            for i in iter_bits(frontier):
+                reached |= adjacency[i]
+            frontier = reached & ~selected
+            selected |= frontier
+            level += 1
+
+    if installed is True:
+        selected &= graph.installed_mask
+    elif installed is False:
+        selected &= everything & ~graph.installed_mask
+    return selected
+
+
+def _edges(graph, selected: int):
+    """(source, target, requirement text) between selected nodes"""
+    for source in iter_bits(selected):
+        targets = graph.forward[source] & selected
+        for target in iter_bits(targets):
+            yield source, target, graph.requirements[source].get(target, "")
+
+
+def _dot_id(text: str) -> str:
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _dot_label(*lines: str) -> str:
+    """Quoted DOT label with one line per argument (joined by the \\n escape)"""
+    return '"' + "\\n".join(_dot_id(line)[1:-1] for line in lines) + '"'
+
+
+def write_dot(graph, f: TextIO, selected: int) -> Tuple[int, int]:
+    """Write a Graphviz digraph; returns (nodes, edges) written"""
+    f.write("digraph dependencies {\n")
+    f.write("  rankdir=LR;\n")
+    f.write('  node [shape=box, style="rounded,filled", fillcolor="#eaf2f8", fontname="Helvetica"];\n')
+    nodes = edges = 0
+    for i in iter_bits(selected):
+        version = graph.versions[i]
+        if version is None:
+            f.write(f'  {_dot_id(graph.keys[i])} [label={_dot_label(graph.names[i], "not installed")}, '
+                    f'fillcolor="#fadbd8", style="rounded,filled,dashed"];\n')
+        else:
+            f.write(f"  {_dot_id(graph.keys[i])} [label={_dot_label(graph.names[i], version)}];\n")
+        nodes += 1
+    for source, target, specifier in _edges(graph, selected):
+        label = f" [label={_dot_id(specifier)}]" if specifier else ""
+        f.write(f"  {_dot_id(graph.keys[source])} -> {_dot_id(graph.keys[target])}{label};\n")
+        edges += 1
+    f.write("}\n")
+    return nodes, edges
+
+
+def write_json(graph, f: TextIO, selected: int) -> Tuple[int, int]:
+    """Write node-link JSON; returns (nodes, edges) written"""
+    f.write('{"directed": true, "multigraph": false, ')
+    f.write(f'"graph": {{"python": {json.dumps(graph.python_executable)}}},\n"nodes": [')
+    nodes = edges = 0
+    for i in iter_bits(selected):
+        node = {"id": graph.keys[i], "name": graph.names[i], "version": graph.versions[i],
+                "installed": graph.versions[i] is not None}
+        f.write(("," if nodes else "") + "\n  " + json.dumps(node))
+        nodes += 1
+    f.write('\n],\n"links": [')
+    for source, target, specifier in _edges(graph, selected):
+        link = {"source": graph.keys[source], "target": graph.keys[target], "specifier": specifier}
+        f.write(("," if edges else "") + "\n  " + json.dumps(link))
+        edges += 1
+    f.write("\n]}\n")
+    return nodes, edges
+
+
+def write_graphml(graph, f: TextIO, selected: int) -> Tuple[int, int]:
+    """Write GraphML; returns (nodes, edges) written"""
+    f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    f.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+    f.write('  <key id="name" for="node" attr.name="name" attr.type="string"/>\n')
+    f.write('  <key id="version" for="node" attr.name="version" attr.type="string"/>\n')
+    f.write('  <key id="installed" for="node" attr.name="installed" attr.type="boolean"/>\n')
+    f.write('  <key id="specifier" for="edge" attr.name="specifier" attr.type="string"/>\n')
+    f.write('  <graph id="dependencies" edgedefault="directed">\n')
+    nodes = edges = 0
+    for i in iter_bits(selected):
+        version = graph.versions[i]
+        f.write(f"    <node id={quoteattr(graph.keys[i])}>"
+                f'<data key="name">{escape(graph.names[i])}</data>'
+                + (f'<data key="version">{escape(version)}</data>' if version is not None else "")
+                + f'<data key="installed">{"true" if version is not None else "false"}</data>'
+                "</node>\n")
+        nodes += 1
+    for source, target, specifier in _edges(graph, selected):
+        f.write(f"    <edge source={quoteattr(graph.keys[source])} target={quoteattr(graph.keys[target])}>"
+                f'<data key="specifier">{escape(specifier)}</data></edge>\n')
+        edges += 1
+    f.write("  </graph>\n</graphml>\n")
+    return nodes, edges
+
+
+WRITERS = {"dot": write_dot, "json": write_json, "graphml": write_graphml}
+
+
+def format_for_path(path: str) -> Optional[str]:
+    """Guess the format from a file extension ('.gv' counts as DOT)"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".gv":
+        return "dot"
+    for name, suffix in FORMATS.items():
+        if extension == suffix:
+            return name
+    return None
+
+
+def export_graph(graph, path: str, fmt: Optional[str] = None, roots: Optional[List[str]] = None,
+                 depth: Optional[int] = None, installed: Optional[bool] = None, reverse: bool = False):
+    """
+    Write (a subgraph of) the dependency graph to a file
+
+    The file is written next to its target and moved into place, so a
+    failed export never leaves a truncated file behind.
+
+    Args:
+        graph: DependencyGraph
+        path: Output file
+        fmt: 'dot', 'json' or 'graphml' (default: from the extension)
+        roots, depth, installed, reverse: Subgraph filters (see select_nodes)
+
+    Returns:
+        tuple: (success: bool, message: str)
+    """
+    fmt = fmt or format_for_path(path)
+    if fmt not in WRITERS:
+        return False, f"Unknown export format: {fmt or os.path.splitext(path)[1] or '(none)'}"
+
+    missing = [name for name in roots or [] if name not in graph]
+    if missing:
+        return False, f"Not in the dependency graph: {', '.join(missing)}"
+
+    tmp_path = path + ".tmp"
+    try:
+        with tracing.span("graph_export.write", tracing.FS, format=fmt, path=path) as span:
+            selected = select_nodes(graph, roots, depth, installed, reverse)
+            with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+                nodes, edges = WRITERS[fmt](graph, f, selected)
+            os.replace(tmp_path, path)
+            span.set(nodes=nodes, edges=edges)
+        return True, f"Wrote {nodes} packages and {edges} dependencies to {path}"
+    except Exception as e:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False, f"Could not export graph: {str(e)}"
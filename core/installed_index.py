@@ -0,0 +1,401 @@
+"""Installed Package Index - in-memory view of an interpreter's distributions
+
+The index is built by listing the *.dist-info / *.egg-info directories on
+the target interpreter's sys.path, so no pip process is needed. Name and
+version come from the directory name; full metadata and requirements are
+read lazily per distribution.
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from core import tracing
+
+_NAME_SEPARATORS_RE = re.compile(r"[-_.]+")
+
+
+def canonical_name(name: str) -> str:
+    """Normalize a distribution name (PEP 503)"""
+    # Same rule as packaging.utils.canonicalize_name, without importing packaging.tags
+    return _NAME_SEPARATORS_RE.sub("-", name).lower()
+
+
+def _same_interpreter(python_executable: Optional[str]) -> bool:
+    """Check whether python_executable is the running interpreter"""
+    if not python_executable:
+        return True
+    return os.path.normcase(os.path.abspath(python_executable)) == \
+        os.path.normcase(os.path.abspath(sys.executable))
+
+
+# python executable -> (executable mtime, sys.path)
+_sys_path_cache: Dict[str, Tuple[float, List[str]]] = {}
+
+
+def get_interpreter_paths(python_executable: Optional[str] = None) -> List[str]:
+    """
+    Get the sys.path of an interpreter
+
+    The running interpreter is answered directly; other interpreters are
+    asked once and cached until their executable changes.
+
+    Args:
+        python_executable: Interpreter path (defaults to the running one)
+
+    Returns:
+        list: Absolute sys.path entries
+    """
+    if _same_interpreter(python_executable):
+        return [os.path.abspath(p) for p in sys.path if p]
+
+    try:
+        mtime = os.stat(python_executable).st_mtime
+    except OSError:
+        return []
+
+    cached = _sys_path_cache.get(python_executable)
+    tracing.record_cache("sys_path", bool(cached and cached[0] == mtime))
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        result = tracing.run(
+            [python_executable, '-c', 'import sys, json; print(json.dumps(sys.path))'],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        if result.returncode != 0:
+            return []
+        paths = [p for p in json.loads(result.stdout) if p]
+    except Exception:
+        return []
+
+    _sys_path_cache[python_executable] = (mtime, paths)
+    return paths
+
+
+# Evaluated in the target interpreter; mirrors packaging.markers.default_environment()
+_MARKER_ENV_SCRIPT = """
+import json, os, platform, sys
+impl = sys.implementation
+v = impl.version
+iver = "{0.major}.{0.minor}.{0.micro}".format(v)
+if v.releaselevel != "final":
+    iver += v.releaselevel[0] + str(v.serial)
+print(json.dumps({
+    "implementation_name": impl.name,
+    "implementation_version": iver,
+    "os_name": os.name,
+    "platform_machine": platform.machine(),
+    "platform_release": platform.release(),
+    "platform_system": platform.system(),
+    "platform_version": platform.version(),
+    "python_full_version": platform.python_version(),
+    "platform_python_implementation": platform.python_implementation(),
+    "python_version": ".".join(platform.python_version_tuple()[:2]),
+    "sys_platform": sys.platform,
+}))
+"""
+
+# python executable -> (executable mtime, marker environment)
+_marker_env_cache: Dict[str, Tuple[float, Dict[str, str]]] = {}
+
+
+def get_marker_environment(python_executable: Optional[str] = None) -> Optional[Dict[str, str]]:
+    """
+    Get the PEP 508 marker variables of an interpreter
+
+    Args:
+        python_executable: Interpreter path (defaults to the running one)
+
+    Returns:
+        dict: Marker environment, or None if the interpreter cannot be queried
+    """
+    if _same_interpreter(python_executable):
+        from packaging.markers import default_environment
+        return default_environment()
+
+    try:
+        mtime = os.stat(python_executable).st_mtime
+    except OSError:
+        return None
+
+    cached = _marker_env_cache.get(python_executable)
+    tracing.record_cache("marker_environment", bool(cached and cached[0] == mtime))
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        result = tracing.run(
+            [python_executable, '-c', _MARKER_ENV_SCRIPT],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        if result.returncode != 0:
+            return None
+        environment = json.loads(result.stdout)
+    except Exception:
+        return None
+
+    _marker_env_cache[python_executable] = (mtime, environment)
+    return environment
+
+
+class InstalledDistribution:
+    """An installed distribution, with metadata loaded on demand"""
+
+    def __init__(self, name: str, version: str, path: str, location: str):
+        self.name = name
+        self.key = canonical_name(name)
+        self.version = version
+        self.path = path  # the .dist-info / .egg-info directory
+        self.location = location  # the sys.path entry it was found in
+        self._distribution = None
+        self._requires = None
+        self._requirements = None
+        self._parsed_version = None
+
+    @property
+    def distribution(self):
+        """importlib.metadata Distribution object"""
+        if self._distribution is None:
+            from importlib.metadata import PathDistribution
+            from pathlib import Path
+            self._distribution = PathDistribution(Path(self.path))
+        return self._distribution
+
+    @property
+    def metadata(self):
+        """Core metadata (email.message.Message-like)"""
+        return self.distribution.metadata
+
+    @property
+    def display_name(self) -> str:
+        """Project name as declared in the metadata"""
+        try:
+            return self.metadata["Name"] or self.name
+        except Exception:
+            return self.name
+
+    @property
+    def requires(self) -> List[str]:
+        """Raw Requires-Dist strings"""
+        if self._requires is None:
+            try:
+                self._requires = list(self.distribution.requires or [])
+            except Exception:
+                self._requires = []
+        return self._requires
+
+    @property
+    def requirements(self):
+        """Requires-Dist parsed into packaging Requirement objects (invalid entries skipped)"""
+        if self._requirements is None:
+            from packaging.requirements import InvalidRequirement, Requirement
+            requirements = []
+            for text in self.requires:
+                try:
+                    requirements.append(Requirement(text))
+                except InvalidRequirement:
+                    continue
+            self._requirements = requirements
+        return self._requirements
+
+    def dependency_keys(self, environment: Optional[Dict[str, str]] = None,
+                        extras=()) -> List[str]:
+        """
+        Get the canonical names this distribution depends on
+
+        Args:
+            environment: Marker environment (defaults to the running interpreter)
+            extras: Extras of this distribution to include
+
+        Returns:
+            list: Canonical names of the applicable requirements
+        """
+        keys = []
+        for req in self.requirements:
+            if req.marker is not None:
+                matched = False
+                for extra in tuple(extras) or ("",):
+                    env = dict(environment or {})
+                    env["extra"] = extra
+                    try:
+                        if req.marker.evaluate(env):
+                            matched = True
+                            break
+                    except Exception:
+                        break
+                if not matched:
+                    continue
+            key = canonical_name(req.name)
+            if key not in keys:
+                keys.append(key)
+        return keys
+
+    @property
+    def parsed_version(self):
+        """packaging Version of the installed version (None if unparsable)"""
+        if self._parsed_version is None:
+            from packaging.version import InvalidVersion, Version
+            try:
+                self._parsed_version = Version(self.version)
+            except InvalidVersion:
+                self._parsed_version = False
+        return self._parsed_version or None
+
+    def __repr__(self):
+        return f"InstalledDistribution(name='{self.name}', version='{self.version}')"
+
+
+def _parse_metadata_dir(entry_name: str) -> Optional[Tuple[str, str]]:
+    """Get (name, version) from a .dist-info / .egg-info directory name"""
+    if entry_name.endswith(".dist-info"):
+        stem = entry_name[:-len(".dist-info")]
+        # Wheel dist-info names escape '-' in both parts, so the last '-' splits them
+        name, sep, version = stem.rpartition("-")
+        if not sep:
+            return None
+        return name, version
+    if entry_name.endswith(".egg-info"):
+        stem = entry_name[:-len(".egg-info")]
+        parts = stem.split("-")
+        return parts[0], parts[1] if len(parts) > 1 else ""
+    return None
+
+
+class InstalledIndex:
+    """Index of the distributions installed for one interpreter"""
+
+    def __init__(self, python_executable: Optional[str] = None):
+        self.python_executable = python_executable or sys.executable
+        self.distributions: Dict[str, InstalledDistribution] = {}
+        self.search_paths: List[str] = []
+        self._fingerprint: Tuple = ()
+        self._loaded = False
+
+    def refresh(self):
+        """Rebuild the index from disk"""
+        self.search_paths = get_interpreter_paths(self.python_executable)
+        distributions = {}
+        with tracing.span("installed_index.scan", tracing.FS, python=self.python_executable) as span:
+            for location in self.search_paths:
+                try:
+                    entries = list(os.scandir(location))
+                except OSError:
+                    continue
+                for entry in entries:
+                    parsed = _parse_metadata_dir(entry.name)
+                    if parsed is None:
+                        continue
+                    name, version = parsed
+                    dist = InstalledDistribution(name, version, entry.path, location)
+                    if not version:
+                        try:
+                            dist.version = dist.metadata["Version"] or ""
+                        except Exception:
+                            pass
+                    # First match on sys.path wins, as with imports
+                    if dist.key not in distributions:
+                        distributions[dist.key] = dist
+            span.set(locations=len(self.search_paths), distributions=len(distributions))
+
+        self.distributions = distributions
+        self._fingerprint = self.fingerprint()
+        self._loaded = True
+
+    def fingerprint(self) -> Tuple:
+        """
+        Get a cheap token identifying the current environment state
+
+        Installing, upgrading or removing a distribution adds or removes a
+        metadata directory, which changes its parent directory's mtime.
+        """
+        state = []
+        for location in self.search_paths:
+            try:
+                state.append((location, os.stat(location).st_mtime_ns))
+            except OSError:
+                state.append((location, None))
+        return tuple(state)
+
+    def is_stale(self) -> bool:
+        """Check whether the environment changed since the last refresh"""
+        return not self._loaded or self.fingerprint() != self._fingerprint
+
+    def ensure_fresh(self):
+        """Refresh the index if the environment changed"""
+        if self.is_stale():
+            self.refresh()
+        return self
+
+    def get(self, name: str) -> Optional[InstalledDistribution]:
+        """Look up a distribution by (any spelling of) its name"""
+        if not self._loaded:
+            self.refresh()
+        return self.distributions.get(canonical_name(name))
+
+    def is_installed(self, name: str) -> bool:
+        """Check whether a distribution is installed"""
+        return self.get(name) is not None
+
+    def names(self) -> List[str]:
+        """Get installed distribution names, sorted case-insensitively"""
+        if not self._loaded:
+            self.refresh()
+        return sorted((dist.name for dist in self.distributions.values()), key=str.lower)
+
+    def versions(self) -> Dict[str, str]:
+        """Get a canonical name -> version mapping"""
+        if not self._loaded:
+            self.refresh()
+        return {key: dist.version for key, dist in self.distributions.items()}
+
+    def __iter__(self) -> Iterator[InstalledDistribution]:
+        if not self._loaded:
+            self.refresh()
+        return iter(list(self.distributions.values()))
+
+    def __len__(self):
+        if not self._loaded:
+            self.refresh()
+        return len(self.distributions)
+
+    def __contains__(self, name):
+        return self.is_installed(name)
+
+
+# Shared indexes, one per interpreter
+_indexes: Dict[str, InstalledIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_installed_index(python_executable: Optional[str] = None, refresh: bool = False) -> InstalledIndex:
+    """
+    Get the shared, up-to-date index for an interpreter
+
+    Args:
+        python_executable: Interpreter path (defaults to the running one)
+        refresh: Force a rebuild even if the environment looks unchanged
+
+    Returns:
+        InstalledIndex: The index
+    """
+    python_executable = python_executable or sys.executable
+    with _indexes_lock:
+        index = _indexes.get(python_executable)
+        if index is None:
+            index = InstalledIndex(python_executable)
+            _indexes[python_executable] = index
+        if refresh or index.is_stale():
+            tracing.record_cache("installed_index", False)
+            index.refresh()
+        else:
+            tracing.record_cache("installed_index", True)
+        return index
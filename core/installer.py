@@ -5,6 +5,8 @@ import platform
 import sys
 import re
 
+from core import tracing
+
 
 class PackageInstaller:
     """Handles package installation and uninstallation across platforms"""
@@ -19,8 +21,15 @@ class PackageInstaller:
 
     def get_python_info(self):
         """Get current Python executable and version"""
+        if self.python_executable == sys.executable:
+            # Running interpreter - no need to spawn a process
+            return {
+                'path': self.python_executable,
+                'version': platform.python_version()
+            }
+
         try:
-            result = subprocess.run(
+            result = tracing.run(
                 [self.python_executable, '--version'],
                 capture_output=True, text=True, timeout=5
             )
@@ -58,6 +67,52 @@ class PackageInstaller:
         else:
             return f"{os_name} {os_release}"
 
+    @staticmethod
+    def command_install_args(install_cmd):
+        """
+        Get the arguments following 'install' in a 'pip install' command
+
+        Args:
+            install_cmd: Installation command (e.g., "pip install --pre numpy")
+
+        Returns:
+            list: Options and requirement specifiers ([] if not an install)
+        """
+        import shlex
+
+        try:
+            tokens = shlex.split(install_cmd)
+        except ValueError:
+            tokens = install_cmd.split()
+        if "install" not in tokens:
+            return []
+        return tokens[tokens.index("install") + 1:]
+
+    @staticmethod
+    def command_packages(install_cmd):
+        """
+        Get the package names a 'pip install' command targets
+
+        Args:
+            install_cmd: Installation command (e.g., "pip install numpy scipy>=1.10")
+
+        Returns:
+            list: Package names (options and unparsable arguments are skipped)
+        """
+        from core.requirements_parser import parse_requirement_line
+
+        names = []
+        for token in PackageInstaller.command_install_args(install_cmd):
+            if token.startswith("-"):
+                continue
+            try:
+                req = parse_requirement_line(token)
+            except ValueError:
+                continue
+            if req.name:
+                names.append(req.name)
+        return names
+
     def install_package(self, install_cmd):
         """
         Install a package using the provided command
@@ -73,8 +128,13 @@ class PackageInstaller:
             if install_cmd.startswith("pip "):
                 install_cmd = install_cmd.replace("pip ", f'"{self.python_executable}" -m pip ', 1)
 
+            # Let pip reuse wheels from the local wheelhouse
+            if " -m pip install " in install_cmd:
+                from core import wheelhouse
+                install_cmd += "".join(f' "{arg}"' for arg in wheelhouse.install_args())
+
             # Run the installation command
-            result = subprocess.run(
+            result = tracing.run(
                 install_cmd,
                 shell=True,
                 capture_output=True,
@@ -84,6 +144,9 @@ class PackageInstaller:
 
             output = result.stdout + result.stderr
 
+            from core import wheelhouse
+            wheelhouse.record_pip_output(output)
+
             # Check if installation was successful
             if result.returncode == 0:
                 return True, output
@@ -95,6 +158,35 @@ class PackageInstaller:
         except Exception as e:
             return False, f"Error: {str(e)}"
 
+    def install_packages(self, requirements, extra_args=None):
+        """
+        Install several packages with a single pip invocation
+
+        Args:
+            requirements: Requirement specifiers (e.g. ["numpy", "requests>=2"])
+            extra_args: Additional pip install arguments
+
+        Returns:
+            tuple: (success: bool, output: str)
+        """
+        if not requirements:
+            return True, "Nothing to install"
+
+        from core import wheelhouse
+
+        try:
+            args = list(extra_args or []) + list(requirements)
+            result = wheelhouse.run_pip_install(
+                [self.python_executable, '-m', 'pip', 'install'], args,
+                timeout=600, offline_first=wheelhouse.all_pinned(args)
+            )
+            return result.returncode == 0, result.stdout + result.stderr
+
+        except subprocess.TimeoutExpired:
+            return False, "Error: Installation timed out after 10 minutes"
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+
     def uninstall_package(self, package_name):
         """
         Uninstall a package
@@ -114,7 +206,7 @@ class PackageInstaller:
             # Use pip uninstall
             cmd = f'"{self.python_executable}" -m pip uninstall -y {base_package}'
 
-            result = subprocess.run(
+            result = tracing.run(
                 cmd,
                 shell=True,
                 capture_output=True,
@@ -148,7 +240,7 @@ class PackageInstaller:
             base_package = package_name.split()[0].lower()
             cmd = f'"{self.python_executable}" -m pip show {base_package}'
 
-            result = subprocess.run(
+            result = tracing.run(
                 cmd,
                 shell=True,
                 capture_output=True,
@@ -165,7 +257,7 @@ class PackageInstaller:
         try:
             cmd = f'"{self.python_executable}" -m pip install --upgrade pip'
 
-            result = subprocess.run(
+            result = tracing.run(
                 cmd,
                 shell=True,
                 capture_output=True,
@@ -183,7 +275,7 @@ class PackageInstaller:
         try:
             cmd = f'"{self.python_executable}" -m pip list'
 
-            result = subprocess.run(
+            result = tracing.run(
                 cmd,
                 shell=True,
                 capture_output=True,
@@ -0,0 +1,365 @@
+"""Lockfile - pinned, hash-verified environments and offline installs
+
+A lockfile records every installed distribution of an environment with the
+exact artifact (file name and sha256) it was installed from, where it came
+from, and the interpreter and platform tags it was locked for:
+
+    {
+        "lock_version": 1,
+        "created": "2024-01-01T12:00:00Z",
+        "interpreter": {"python_version": "3.11", "implementation_name": "cpython", ...},
+        "platform_tags": ["cp311-cp311-manylinux_2_36_x86_64", ...],
+        "index_url": "https://pypi.org/simple",
+        "distributions": [
+            {"name": "requests", "version": "2.31.0", "source": "index",
+             "artifacts": [{"filename": "requests-2.31.0-py3-none-any.whl",
+                            "sha256": "58cd..."}]}
+        ]
+    }
+
+Locking downloads the artifacts into a wheelhouse directory, so the same
+directory is everything an air-gapped 'install from lock' needs. Installs
+verify every hash before pip runs, then pip installs with --no-index,
+--require-hashes and --no-deps.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from core import tracing
+from core.wheelhouse import scan_wheelhouse, sha256_file, wheel_tags
+
+LOCK_VERSION = 1
+DEFAULT_LOCK_NAME = "requirements.lock.json"
+
+# Evaluated in the target interpreter; pip's vendored packaging is always there
+_TAGS_SCRIPT = """
+import json
+try:
+    from packaging import tags
+except ImportError:
+    from pip._vendor.packaging import tags
+print(json.dumps([str(t) for t in tags.sys_tags()]))
+"""
+
+
+def get_interpreter_tags(python_executable: Optional[str] = None) -> List[str]:
+    """
+    Get the wheel tags an interpreter accepts, most specific first
+
+    Args:
+        python_executable: Interpreter path (defaults to the running one)
+
+    Returns:
+        list: Tags such as 'cp311-cp311-manylinux_2_36_x86_64' (empty on failure)
+    """
+    from core.installed_index import _same_interpreter
+
+    if _same_interpreter(python_executable):
+        from packaging import tags
+        return [str(t) for t in tags.sys_tags()]
+
+    try:
+        result = tracing.run(
+            [python_executable, '-c', _TAGS_SCRIPT],
+            capture_output=True,
+            text=True,
+            timeout=30
+        )
+        if result.returncode == 0:
+            return json.loads(result.stdout)
+    except Exception:
+        pass
+    return []
+
+
+class LockedDistribution:
+    """One pinned distribution of a lockfile"""
+
+    def __init__(self, name: str, version: str, source: str = "index",
+                 url: Optional[str] = None, artifacts: Optional[List[Dict]] = None):
+        from core.installed_index import canonical_name
+
+        self.name = name
+        self.key = canonical_name(name)
+        self.version = version
+        self.source = source  # 'index', 'url', 'vcs' or 'editable'
+        self.url = url
+        self.artifacts = artifacts or []  # [{'filename': ..., 'sha256': ...}]
+
+    @property
+    def lockable(self) -> bool:
+        """True if the distribution can be installed offline from the wheelhouse"""
+        return self.source in ("index", "url") and bool(self.artifacts)
+
+    def requirement_line(self) -> str:
+        """Hash-pinned line for 'pip install --require-hashes'"""
+        hashes = " ".join(f"--hash=sha256:{a['sha256']}" for a in self.artifacts)
+        return f"{self.name}=={self.version} {hashes}".rstrip()
+
+    def to_dict(self) -> Dict:
+        data = {"name": self.name, "version": self.version, "source": self.source,
+                "artifacts": self.artifacts}
+        if self.url:
+            data["url"] = self.url
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LockedDistribution":
+        return cls(data["name"], data["version"], data.get("source", "index"),
+                   data.get("url"), data.get("artifacts", []))
+
+
+class Lockfile:
+    """A locked environment"""
+
+    def __init__(self, distributions: Optional[List[LockedDistribution]] = None,
+                 interpreter: Optional[Dict] = None, platform_tags: Optional[List[str]] = None,
+                 index_url: Optional[str] = None, created: Optional[str] = None):
+        self.distributions = distributions or []
+        self.interpreter = interpreter or {}
+        self.platform_tags = platform_tags or []
+        self.index_url = index_url
+        self.created = created or time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+    def to_dict(self) -> Dict:
+        return {
+            "lock_version": LOCK_VERSION,
+            "created": self.created,
+            "interpreter": self.interpreter,
+            "platform_tags": self.platform_tags,
+            "index_url": self.index_url,
+            "distributions": [d.to_dict() for d in sorted(self.distributions, key=lambda d: d.key)],
+        }
+
+    def save(self, path: str):
+        """Write the lockfile (atomically)"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, sort_keys=True)
+            f.write("\n")
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "Lockfile":
+        """
+        Read a lockfile
+
+        Raises:
+            ValueError: If the file is not a supported lockfile
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.get("lock_version") != LOCK_VERSION:
+            raise ValueError(f"unsupported lockfile version: {data.get('lock_version') if isinstance(data, dict) else None}")
+        return cls([LockedDistribution.from_dict(d) for d in data.get("distributions", [])],
+                   data.get("interpreter"), data.get("platform_tags"),
+                   data.get("index_url"), data.get("created"))
+
+    def to_requirements_text(self) -> str:
+        """Hash-pinned requirements for every offline-installable distribution"""
+        return "\n".join(d.requirement_line() for d in sorted(self.distributions, key=lambda d: d.key)
+                         if d.lockable) + "\n"
+
+    def check_interpreter(self, python_executable: Optional[str] = None) -> List[str]:
+        """
+        Check whether an interpreter matches the one the lock was made for
+
+        Returns:
+            list: Human-readable mismatches (empty if compatible)
+        """
+        from core.installed_index import get_marker_environment
+
+        problems = []
+        environment = get_marker_environment(python_executable) or {}
+        for key in ("implementation_name", "python_version", "sys_platform", "platform_machine"):
+            locked = self.interpreter.get(key)
+            if locked and environment.get(key) and environment[key] != locked:
+                problems.append(f"{key} is {environment[key]}, lock was made for {locked}")
+        return problems
+
+
+def _direct_url(dist) -> Tuple[str, Optional[str]]:
+    """Get (source kind, url) from a distribution's direct_url.json"""
+    try:
+        with open(os.path.join(dist.path, "direct_url.json"), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return "index", None
+    url = data.get("url")
+    if data.get("dir_info", {}).get("editable"):
+        return "editable", url
+    if "vcs_info" in data:
+        return "vcs", url
+    return "url", url
+
+
+def _choose_artifacts(filenames: List[str], tags: List[str]) -> List[str]:
+    """Keep the artifacts the target interpreter can install (wheels by tag, or sdists)"""
+    if not tags:
+        return sorted(filenames)
+    accepted = set(tags)
+    chosen = []
+    for filename in sorted(filenames):
+        if not filename.endswith(".whl"):
+            chosen.append(filename)
+            continue
+        if accepted.intersection(wheel_tags(filename)):
+            chosen.append(filename)
+    return chosen
+
+
+def generate_lockfile(python_executable: Optional[str] = None, wheelhouse: Optional[str] = None,
+                      index_url: Optional[str] = None, extra_args: Optional[List[str]] = None,
+                      timeout: int = 1800) -> Tuple[bool, object]:
+    """
+    Lock the installed distributions of an interpreter
+
+    Artifacts already present in the wheelhouse are reused; the rest are
+    fetched with a single 'pip download --no-deps' call.
+
+    Args:
+        python_executable: Interpreter to lock (defaults to the running one)
+        wheelhouse: Directory receiving the artifacts
+        index_url: Index to download from (default: pip's configuration)
+        extra_args: Additional 'pip download' arguments
+        timeout: Seconds to allow for downloading
+
+    Returns:
+        tuple: (success, Lockfile or error message)
+    """
+    from core.installed_index import InstalledIndex, get_marker_environment
+
+    python_executable = python_executable or sys.executable
+    if wheelhouse is None:
+        from core.wheelhouse import get_wheelhouse_path
+        from core.app_paths import get_cache_dir
+        wheelhouse = get_wheelhouse_path() or get_cache_dir("wheelhouse")
+    os.makedirs(wheelhouse, exist_ok=True)
+
+    index = InstalledIndex(python_executable)
+    index.refresh()
+    tags = get_interpreter_tags(python_executable)
+
+    distributions = []
+    to_download = []
+    available = scan_wheelhouse(wheelhouse)
+    for dist in sorted(index, key=lambda d: d.key):
+        source, url = _direct_url(dist)
+        locked = LockedDistribution(dist.display_name, dist.version, source, url)
+        distributions.append(locked)
+        if source in ("index", "url") and not _choose_artifacts(available.get((dist.key, dist.version), []), tags):
+            to_download.append(f"{url}" if source == "url" and url else f"{locked.name}=={locked.version}")
+
+    if to_download:
+        cmd = [python_executable, '-m', 'pip', 'download', '--no-deps', '--prefer-binary',
+               '-d', wheelhouse]
+        if index_url:
+            cmd += ['--index-url', index_url]
+        cmd += list(extra_args or []) + to_download
+        try:
+            result = tracing.run(cmd, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return False, "Downloading artifacts timed out"
+        except Exception as e:
+            return False, str(e)
+        if result.returncode != 0:
+            return False, result.stderr or result.stdout
+        available = scan_wheelhouse(wheelhouse)
+
+    missing = []
+    for locked in distributions:
+        if locked.source not in ("index", "url"):
+            continue
+        filenames = _choose_artifacts(available.get((locked.key, locked.version), []), tags)
+        if not filenames:
+            missing.append(f"{locked.name}=={locked.version}")
+            continue
+        locked.artifacts = [{"filename": name, "sha256": sha256_file(os.path.join(wheelhouse, name))}
+                            for name in filenames]
+
+    if missing:
+        return False, "No artifact found for: " + ", ".join(missing)
+
+    environment = get_marker_environment(python_executable) or {}
+    return True, Lockfile(distributions, environment, tags[:50], index_url)
+
+
+def verify_wheelhouse(lock: Lockfile, wheelhouse: str) -> List[str]:
+    """
+    Check that every locked artifact is present in the wheelhouse with the right hash
+
+    Returns:
+        list: Problems found (empty if the wheelhouse is complete)
+    """
+    problems = []
+    for locked in lock.distributions:
+        if not locked.lockable:
+            continue
+        found = False
+        for artifact in locked.artifacts:
+            path = os.path.join(wheelhouse, artifact["filename"])
+            if not os.path.exists(path):
+                continue
+            if sha256_file(path) != artifact["sha256"]:
+                problems.append(f"{artifact['filename']}: hash mismatch")
+            found = True
+        if not found:
+            problems.append(f"{locked.name}=={locked.version}: artifact not in wheelhouse")
+    return problems
+
+
+def install_from_lock(lock_path: str, wheelhouse: str, python_executable: Optional[str] = None,
+                      force: bool = False, timeout: int = 1800) -> Tuple[bool, str]:
+    """
+    Install a locked environment from a wheelhouse without network access
+
+    Args:
+        lock_path: Lockfile to install
+        wheelhouse: Directory holding the locked artifacts
+        python_executable: Target interpreter (defaults to the running one)
+        force: Install even if the interpreter differs from the locked one
+               (editable and VCS distributions are then skipped)
+        timeout: Seconds to allow for pip
+
+    Returns:
+        tuple: (success, output or error message)
+    """
+    python_executable = python_executable or sys.executable
+    try:
+        lock = Lockfile.load(lock_path)
+    except (OSError, ValueError) as e:
+        return False, f"Cannot read lockfile: {e}"
+
+    problems = verify_wheelhouse(lock, wheelhouse)
+    if not force:
+        problems += lock.check_interpreter(python_executable)
+        problems += [f"{d.name}: {d.source} installs cannot be reproduced offline"
+                     for d in lock.distributions if not d.lockable]
+    if problems:
+        return False, "Lockfile cannot be installed:\n" + "\n".join(problems)
+
+    fd, requirements_path = tempfile.mkstemp(suffix=".txt", prefix="lock-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(lock.to_requirements_text())
+        result = tracing.run(
+            [python_executable, '-m', 'pip', 'install', '--no-index', '--find-links', wheelhouse,
+             '--require-hashes', '--no-deps', '-r', requirements_path],
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+        output = result.stdout + result.stderr
+        return result.returncode == 0, output
+    except subprocess.TimeoutExpired:
+        return False, "Installation from lockfile timed out"
+    except Exception as e:
+        return False, str(e)
+    finally:
+        os.remove(requirements_path)
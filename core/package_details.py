@@ -0,0 +1,180 @@
+"""Package Details - local metadata and index release info for one package
+
+The details dialog shows two independent halves:
+
+- local: read from the installed distribution's metadata through the
+  InstalledIndex (no subprocess); multi-line fields such as License or
+  repeated ones such as Classifier come from the metadata parser, not
+  from splitting 'pip show' text
+- remote: the project's releases from the shared version catalog
+
+Both halves are memoized per interpreter and package: local details until
+the environment changes, remote details for the index client's TTL. The
+dialog asks get_cached_details() first, so reopening it is instant.
+"""
+
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from core import tracing
+from core.installed_index import canonical_name, get_installed_index, get_marker_environment
+
+REMOTE_TTL = 10 * 60
+
+# (python, key) -> (environment fingerprint, details or None)
+_local_memo: Dict[Tuple[str, str], Tuple[Tuple, Optional[Dict]]] = {}
+# key -> (time fetched, details)
+_remote_memo: Dict[str, Tuple[float, Dict]] = {}
+_memo_lock = threading.Lock()
+
+
+def _license(metadata) -> str:
+    """Short license text: License-Expression, a one-line License or the classifier"""
+    expression = metadata.get("License-Expression")
+    if expression:
+        return expression.strip()
+    text = (metadata.get("License") or "").strip()
+    if text and "\n" not in text and len(text) <= 100:
+        return text
+    classifiers = [c.split("::")[-1].strip() for c in metadata.get_all("Classifier") or []
+                   if c.startswith("License ::")]
+    if classifiers:
+        return ", ".join(classifiers)
+    return text.splitlines()[0] + " …" if text else ""
+
+
+def _project_urls(metadata) -> Dict[str, str]:
+    urls = {}
+    for entry in metadata.get_all("Project-URL") or []:
+        label, _, url = entry.partition(",")
+        if url.strip():
+            urls[label.strip()] = url.strip()
+    return urls
+
+
+def _build_local(index, dist) -> Dict:
+    metadata = dist.metadata
+    environment = get_marker_environment(index.python_executable)
+
+    requires = []
+    for key in dist.dependency_keys(environment):
+        installed = index.get(key)
+        requires.append(installed.display_name if installed is not None else key)
+    required_by = [other.display_name for other in index
+                   if other.key != dist.key and dist.key in other.dependency_keys(environment)]
+
+    urls = _project_urls(metadata)
+    home_page = metadata.get("Home-page") or ""
+    if not home_page:
+        home_page = next((url for label, url in urls.items()
+                          if label.lower().replace("-", "").replace(" ", "") in ("homepage", "home", "source")), "")
+
+    return {
+        "Name": dist.display_name,
+        "Version": dist.version,
+        "Summary": (metadata.get("Summary") or "").strip(),
+        "Author": (metadata.get("Author") or "").strip(),
+        "Author-email": (metadata.get("Author-email") or "").strip(),
+        "License": _license(metadata),
+        "Home-page": home_page,
+        "Project-URLs": urls,
+        "Requires-Python": metadata.get("Requires-Python") or "",
+        "Classifiers": list(metadata.get_all("Classifier") or []),
+        "Location": dist.location,
+        "Requires": ", ".join(sorted(requires, key=str.lower)),
+        "Required-by": ", ".join(sorted(required_by, key=str.lower)),
+    }
+
+
+def get_local_details(name: str, python_executable: Optional[str] = None) -> Optional[Dict]:
+    """
+    Get the installed metadata of a package
+
+    Args:
+        name: Package name (any spelling)
+        python_executable: Interpreter (defaults to the running one)
+
+    Returns:
+        dict: 'pip show'-style fields plus 'Classifiers', 'Project-URLs'
+              and 'Requires-Python', or None if the package is not installed
+    """
+    python_executable = python_executable or sys.executable
+    index = get_installed_index(python_executable)
+    memo_key = (python_executable, canonical_name(name))
+    fingerprint = index.fingerprint()
+
+    with _memo_lock:
+        cached = _local_memo.get(memo_key)
+    if cached is not None and cached[0] == fingerprint:
+        tracing.record_cache("package_details.local", True)
+        return cached[1]
+    tracing.record_cache("package_details.local", False)
+
+    dist = index.get(name)
+    details = None
+    if dist is not None:
+        with tracing.span("package_details.local", tracing.PARSE, package=name):
+            details = _build_local(index, dist)
+    with _memo_lock:
+        _local_memo[memo_key] = (fingerprint, details)
+    return details
+
+
+def get_remote_details(name: str, refresh: bool = False) -> Dict:
+    """
+    Get release information from the package index
+
+    Returns:
+        dict: 'available_versions' (newest first), 'Latest Version' and,
+              when the index could not be queried, 'remote_error'
+    """
+    key = canonical_name(name)
+    with _memo_lock:
+        cached = _remote_memo.get(key)
+    if cached is not None and not refresh and time.time() - cached[0] < REMOTE_TTL:
+        tracing.record_cache("package_details.remote", True)
+        return cached[1]
+    tracing.record_cache("package_details.remote", False)
+
+    from core.package_version_manager import PackageVersionManager
+
+    catalog, error = PackageVersionManager().get_version_catalog(name)
+    if catalog is None:
+        return {"remote_error": error}  # not memoized; retried on the next open
+
+    versions: List[str] = catalog.versions()
+    details = {"available_versions": versions}
+    latest = catalog.latest()
+    if latest:
+        details["Latest Version"] = latest
+    with _memo_lock:
+        _remote_memo[key] = (time.time(), details)
+    return details
+
+
+def get_cached_details(name: str, python_executable: Optional[str] = None) -> Tuple[Optional[Dict], Optional[Dict]]:
+    """
+    Get memoized details without touching the disk or the network
+
+    Returns:
+        tuple: (local details, remote details); either is None when not
+               memoized (or expired). Local details of a package that is
+               not installed are {} rather than None.
+    """
+    python_executable = python_executable or sys.executable
+    key = canonical_name(name)
+    with _memo_lock:
+        local = _local_memo.get((python_executable, key))
+        remote = _remote_memo.get(key)
+    if remote is not None and time.time() - remote[0] >= REMOTE_TTL:
+        remote = None
+    return (None if local is None else (local[1] or {})), (None if remote is None else remote[1])
+
+
+def clear_cache():
+    """Forget all memoized details"""
+    with _memo_lock:
+        _local_memo.clear()
+        _remote_memo.clear()
@@ -1,9 +1,10 @@
 """Package Version Manager"""
 
-import subprocess
 import re
 from packaging import version
 
+from core import tracing
+
 
 class PackageVersionManager:
     """Manages package versions"""
@@ -11,68 +12,45 @@ class PackageVersionManager:
     def __init__(self):
         pass
 
-    def get_available_versions(self, package_name):
-        """Get all available versions of a package from PyPI"""
-        try:
-            # Use pip index versions command
-            result = subprocess.run(
-                ["pip", "index", "versions", package_name],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-
-            if result.returncode != 0:
-                return [], "Package not found or error connecting to PyPI"
-
-            # Parse output
-            versions = []
-            output = result.stdout
-
-            # Look for "Available versions:" section
-            if "Available versions:" in output:
-                version_line = output.split("Available versions:")[1].split("\n")[0]
-                # Split by comma and clean up
-                version_strings = version_line.split(",")
-                for v in version_strings:
-                    v = v.strip()
-                    if v:
-                        versions.append(v)
+    def get_version_catalog(self, package_name):
+        """
+        Get the release catalog of a package from the package index
 
-            return versions, None
+        Returns:
+            tuple: (VersionCatalog or None, error message or None)
+        """
+        from core.index_client import IndexClientError, ProjectNotFound
+        from core.version_catalog import get_version_catalog
 
-        except subprocess.TimeoutExpired:
-            return [], "Request timed out"
+        try:
+            return get_version_catalog(package_name), None
+        except ProjectNotFound:
+            return None, "Package not found on the package index"
+        except IndexClientError as e:
+            return None, f"Error connecting to the package index: {e}"
         except Exception as e:
-            return [], str(e)
+            return None, str(e)
+
+    def get_available_versions(self, package_name, include_prereleases=False):
+        """Get all available versions of a package from the package index (newest first)"""
+        catalog, error = self.get_version_catalog(package_name)
+        if catalog is None:
+            return [], error
+        return catalog.versions(include_prereleases), None
 
     def get_installed_version(self, package_name):
         """Get currently installed version of a package"""
-        try:
-            result = subprocess.run(
-                ["pip", "show", package_name],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-
-            if result.returncode == 0:
-                # Parse version from output
-                for line in result.stdout.split('\n'):
-                    if line.startswith("Version:"):
-                        return line.split(":", 1)[1].strip()
+        from core.pip_worker import pip_show
 
-            return None
-
-        except Exception:
-            return None
+        info, _ = pip_show(package_name)
+        return info.get("Version") if info else None
 
     def install_specific_version(self, package_name, version_str):
         """Install a specific version of a package"""
         try:
             package_spec = f"{package_name}=={version_str}"
 
-            result = subprocess.run(
+            result = tracing.run(
                 ["pip", "install", package_spec],
                 capture_output=True,
                 text=True,
@@ -85,14 +63,11 @@ class PackageVersionManager:
             return False, str(e)
 
     def get_latest_version(self, package_name):
-        """Get the latest version available"""
-        versions, error = self.get_available_versions(package_name)
-
-        if error or not versions:
+        """Get the latest stable version available"""
+        catalog, error = self.get_version_catalog(package_name)
+        if catalog is None:
             return None
-
-        # Return first version (usually latest)
-        return versions[0] if versions else None
+        return catalog.latest()
 
     def compare_versions(self, ver1, ver2):
         """Compare two version strings"""
@@ -0,0 +1,425 @@
+"""Pip Worker - persistent helper process for read-only interpreter queries
+
+Asking another interpreter a question ('pip show', its sys.path, whether a
+marker applies) normally costs a full interpreter start plus the pip or
+packaging imports, 0.3-1 s per call. A PipWorker starts one helper per
+target interpreter that imports the metadata machinery once and then
+answers JSON-RPC 2.0 requests, one JSON object per line over stdin/stdout:
+
+    -> {"jsonrpc": "2.0", "id": 1, "method": "show", "params": {"names": ["requests"]}}
+    <- {"jsonrpc": "2.0", "id": 1, "result": [{"Name": "requests", ...}]}
+
+Methods: ping, sys_path, marker_environment, list, show, check_marker,
+evaluate_version. The helper only needs the standard library (plus
+packaging, or the copy vendored in pip, for markers and specifiers).
+
+The helper is restarted when the interpreter executable or one of its
+sys.path directories changes, so answers always describe the current
+environment. Callers fall back to one-shot subprocesses on PipWorkerError.
+"""
+
+import atexit
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from core import tracing
+
+REQUEST_TIMEOUT = 30
+START_TIMEOUT = 30
+MAX_WORKERS = 4
+
+# Runs inside the target interpreter; standard library only
+_WORKER_SCRIPT = r'''
+import importlib, json, os, platform, re, sys
+try:
+    from importlib import metadata
+except ImportError:
+    import importlib_metadata as metadata
+try:
+    from packaging.markers import Marker, default_environment
+    from packaging.requirements import Requirement
+    from packaging.specifiers import SpecifierSet
+    from packaging.version import Version
+except ImportError:
+    try:
+        from pip._vendor.packaging.markers import Marker, default_environment
+        from pip._vendor.packaging.requirements import Requirement
+        from pip._vendor.packaging.specifiers import SpecifierSet
+        from pip._vendor.packaging.version import Version
+    except ImportError:
+        Marker = Requirement = SpecifierSet = Version = default_environment = None
+
+def canonical(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+# Scan results, reused while no sys.path directory changes
+cache = {"state": None, "dists": {}, "entries": {}, "requires": {}}
+
+def path_state():
+    state = []
+    for path in sys.path:
+        try:
+            state.append(os.stat(path or ".").st_mtime_ns)
+        except OSError:
+            state.append(None)
+    return tuple(state)
+
+def distributions():
+    state = path_state()
+    if cache["state"] != state:
+        importlib.invalidate_caches()
+        seen, entries = {}, {}
+        for dist in metadata.distributions():
+            meta = dist.metadata
+            name = meta["Name"]
+            if name and canonical(name) not in seen:  # first on sys.path wins
+                seen[canonical(name)] = dist
+                entries[canonical(name)] = {"name": name, "version": meta["Version"], "location": location(dist)}
+        cache.update(state=state, dists=seen, entries=entries, requires={})
+    return cache["dists"]
+
+def requirement_names(key, dist):
+    if key in cache["requires"]:
+        return cache["requires"][key]
+    names = []
+    for line in dist.requires or []:
+        if Requirement is None:
+            if ";" not in line:
+                names.append(re.split(r"[\s<>=!~\[(;]", line.strip(), 1)[0])
+            continue
+        try:
+            req = Requirement(line)
+        except Exception:
+            continue
+        if req.marker is None or req.marker.evaluate({"extra": ""}):
+            names.append(req.name)
+    cache["requires"][key] = names
+    return names
+
+def location(dist):
+    try:
+        return os.path.abspath(str(dist.locate_file("")))
+    except Exception:
+        return ""
+
+def marker_environment():
+    if default_environment is not None:
+        return default_environment()
+    impl = sys.implementation
+    return {"implementation_name": impl.name, "os_name": os.name,
+            "platform_machine": platform.machine(), "platform_system": platform.system(),
+            "platform_release": platform.release(), "platform_version": platform.version(),
+            "python_full_version": platform.python_version(),
+            "platform_python_implementation": platform.python_implementation(),
+            "python_version": ".".join(platform.python_version_tuple()[:2]),
+            "sys_platform": sys.platform}
+
+def do_ping(params):
+    return {"python_version": platform.python_version(), "executable": sys.executable,
+            "sys_path": [os.path.abspath(p) for p in sys.path if p],
+            "packaging": Requirement is not None}
+
+def do_sys_path(params):
+    return [os.path.abspath(p) for p in sys.path if p]
+
+def do_marker_environment(params):
+    return marker_environment()
+
+def do_list(params):
+    distributions()
+    return list(cache["entries"].values())
+
+def do_show(params):
+    dists = distributions()
+    wanted = [canonical(n) for n in params.get("names", [])]
+    requires = {}
+    if wanted:
+        for key, dist in dists.items():
+            requires[key] = requirement_names(key, dist)
+    entries = cache["entries"]
+    result = []
+    for key in wanted:
+        dist = dists.get(key)
+        if dist is None:
+            continue
+        meta = dist.metadata
+        required_by = sorted((entries[other]["name"] for other, names in requires.items()
+                              if key in {canonical(n) for n in names}), key=str.lower)
+        result.append({
+            "Name": meta["Name"], "Version": meta["Version"], "Summary": meta["Summary"] or "",
+            "Home-page": meta["Home-page"] or "", "Author": meta["Author"] or "",
+            "Author-email": meta["Author-email"] or "", "License": meta["License"] or "",
+            "Location": entries[key]["location"],
+            "Requires": ", ".join(sorted(requires.get(key, []), key=str.lower)),
+            "Required-by": ", ".join(required_by),
+            "Requires-Dist": list(dist.requires or []),
+        })
+    return result
+
+def do_check_marker(params):
+    if Marker is None:
+        raise RuntimeError("packaging is not available in this interpreter")
+    environment = {"extra": params.get("extra") or ""}
+    return Marker(params["marker"]).evaluate(environment)
+
+def do_evaluate_version(params):
+    if SpecifierSet is None:
+        raise RuntimeError("packaging is not available in this interpreter")
+    try:
+        version = Version(params["version"])
+    except Exception:
+        return {"valid": False, "contains": False}
+    specifier = SpecifierSet(params.get("specifier") or "")
+    return {"valid": True, "contains": specifier.contains(version, prereleases=params.get("prereleases", True))}
+
+HANDLERS = {name[3:]: func for name, func in list(globals().items()) if name.startswith("do_")}
+
+for line in sys.stdin:
+    if not line.strip():
+        continue
+    request_id = None
+    try:
+        request = json.loads(line)
+        request_id = request.get("id")
+        handler = HANDLERS.get(request.get("method"))
+        if handler is None:
+            response = {"jsonrpc": "2.0", "id": request_id,
+                        "error": {"code": -32601, "message": "Method not found"}}
+        else:
+            response = {"jsonrpc": "2.0", "id": request_id, "result": handler(request.get("params") or {})}
+    except Exception as e:
+        response = {"jsonrpc": "2.0", "id": request_id,
+                    "error": {"code": -32000, "message": "%s: %s" % (type(e).__name__, e)}}
+    sys.stdout.write(json.dumps(response) + "\n")
+    sys.stdout.flush()
+'''
+
+
+class PipWorkerError(Exception):
+    """The helper could not be started or did not answer"""
+
+
+class PipWorker:
+    """One persistent helper process bound to an interpreter"""
+
+    def __init__(self, python_executable: str, timeout: float = REQUEST_TIMEOUT):
+        self.python_executable = python_executable
+        self.timeout = timeout
+        self.info: Dict = {}
+        self.restarts = 0
+        self._process: Optional[subprocess.Popen] = None
+        self._responses: "queue.Queue" = queue.Queue()
+        self._next_id = 0
+        self._fingerprint: Tuple = ()
+        self._lock = threading.Lock()
+
+    # -- process management --------------------------------------------
+
+    def _environment_state(self, paths: List[str]) -> Tuple:
+        state = []
+        for path in [self.python_executable] + paths:
+            try:
+                state.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                state.append(None)
+        return tuple(state)
+
+    def _start(self):
+        env = dict(os.environ, PYTHONIOENCODING="utf-8", PYTHONDONTWRITEBYTECODE="1")
+        with tracing.span("pip_worker.start", tracing.SUBPROCESS, python=self.python_executable):
+            tracing.count_spawn(f"{os.path.basename(self.python_executable)} (pip worker)")
+            try:
+                self._process = subprocess.Popen(
+                    [self.python_executable, "-c", _WORKER_SCRIPT],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    encoding="utf-8",
+                    bufsize=1,
+                    env=env,
+                )
+            except OSError as e:
+                raise PipWorkerError(f"{self.python_executable}: {e}")
+
+            # A fresh queue per process, so answers of a killed helper never leak
+            self._responses = queue.Queue()
+            threading.Thread(target=self._read_responses, args=(self._process, self._responses),
+                             daemon=True).start()
+            self.info = self._request("ping", {}, START_TIMEOUT)
+        self._fingerprint = self._environment_state(self.info.get("sys_path", []))
+
+    @staticmethod
+    def _read_responses(process: subprocess.Popen, responses: "queue.Queue"):
+        for line in process.stdout:
+            try:
+                responses.put(json.loads(line))
+            except ValueError:
+                continue
+        responses.put(None)  # helper exited
+
+    def _is_current(self) -> bool:
+        if self._process is None or self._process.poll() is not None:
+            return False
+        return self._environment_state(self.info.get("sys_path", [])) == self._fingerprint
+
+    def close(self):
+        """Stop the helper"""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+            process.wait(timeout=2)
+        except Exception:
+            process.kill()
+
+    # -- requests ------------------------------------------------------
+
+    def _request(self, method: str, params: Dict, timeout: float):
+        self._next_id += 1
+        request_id = self._next_id
+        try:
+            self._process.stdin.write(json.dumps({"jsonrpc": "2.0", "id": request_id,
+                                                  "method": method, "params": params}) + "\n")
+            self._process.stdin.flush()
+        except (OSError, ValueError) as e:
+            self.close()
+            raise PipWorkerError(f"{self.python_executable}: helper is gone ({e})")
+
+        while True:
+            try:
+                response = self._responses.get(timeout=timeout)
+            except queue.Empty:
+                self.close()
+                raise PipWorkerError(f"{self.python_executable}: no answer to '{method}' within {timeout} s")
+            if response is None:
+                self.close()
+                raise PipWorkerError(f"{self.python_executable}: helper exited")
+            if response.get("id") != request_id:
+                continue  # answer to an abandoned request
+            if "error" in response:
+                raise PipWorkerError(response["error"].get("message", "unknown error"))
+            return response.get("result")
+
+    def call(self, method: str, **params):
+        """
+        Send one request, (re)starting the helper if needed
+
+        Raises:
+            PipWorkerError: The helper failed or reported an error
+        """
+        with self._lock:
+            if not self._is_current():
+                if self._process is not None:
+                    self.restarts += 1
+                self.close()
+                self._start()
+            with tracing.span(f"pip_worker.{method}", tracing.RPC, python=self.python_executable):
+                return self._request(method, params, self.timeout)
+
+    # -- queries -------------------------------------------------------
+
+    def sys_path(self) -> List[str]:
+        return self.call("sys_path")
+
+    def marker_environment(self) -> Dict[str, str]:
+        return self.call("marker_environment")
+
+    def list_distributions(self) -> List[Dict]:
+        """[{'name', 'version', 'location'}] for every installed distribution"""
+        return self.call("list")
+
+    def show(self, names: List[str]) -> List[Dict]:
+        """'pip show' fields (plus 'Requires-Dist') for the installed ones of names"""
+        return self.call("show", names=list(names))
+
+    def check_marker(self, marker: str, extra: str = "") -> bool:
+        return self.call("check_marker", marker=marker, extra=extra)
+
+    def evaluate_version(self, version: str, specifier: str = "", prereleases: bool = True) -> Dict:
+        """{'valid', 'contains'}: whether version parses and matches specifier"""
+        return self.call("evaluate_version", version=version, specifier=specifier,
+                         prereleases=prereleases)
+
+
+# Most recently used last
+_workers: "OrderedDict[str, PipWorker]" = OrderedDict()
+_workers_lock = threading.Lock()
+
+
+def get_pip_worker(python_executable: Optional[str] = None) -> PipWorker:
+    """
+    Get the shared helper for an interpreter
+
+    At most MAX_WORKERS helpers are kept; the least recently used one is
+    stopped when another interpreter needs one. The helper itself starts on
+    the first call.
+    """
+    python_executable = python_executable or sys.executable
+    with _workers_lock:
+        worker = _workers.pop(python_executable, None) or PipWorker(python_executable)
+        _workers[python_executable] = worker
+        evicted = []
+        while len(_workers) > MAX_WORKERS:
+            evicted.append(_workers.popitem(last=False)[1])
+    for old in evicted:
+        with old._lock:
+            old.close()
+    return worker
+
+
+def shutdown_all():
+    """Stop every helper"""
+    with _workers_lock:
+        workers = list(_workers.values())
+        _workers.clear()
+    for worker in workers:
+        with worker._lock:
+            worker.close()
+
+
+def pip_show(package_name: str, python_executable: Optional[str] = None):
+    """
+    Get the 'pip show' fields of an installed package
+
+    Asks the interpreter's helper; if it cannot be used, runs 'pip show'
+    through the shared command runner instead.
+
+    Args:
+        package_name: Package name (any spelling)
+        python_executable: Interpreter to ask (default: the one owning the
+                           'pip' on PATH)
+
+    Returns:
+        tuple: (fields dict or None, error message or None)
+    """
+    from core.command_runner import interpreter_for_command, parse_pip_show, run_read_only
+
+    try:
+        worker = get_pip_worker(python_executable or interpreter_for_command(["pip"]))
+        shown = worker.show([package_name])
+        if not shown:
+            return None, "Package not installed"
+        return shown[0], None
+    except PipWorkerError:
+        pass
+
+    command = [python_executable, "-m", "pip"] if python_executable else ["pip"]
+    try:
+        result = run_read_only(command + ["show", package_name], capture_output=True, text=True, timeout=10)
+        packages = parse_pip_show(result.stdout) if result.returncode == 0 else []
+        if not packages:
+            return None, "Package not installed"
+        return packages[0], None
+    except Exception as e:
+        return None, str(e)
+
+
+atexit.register(shutdown_all)
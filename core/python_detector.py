@@ -2,11 +2,12 @@
 
 import os
 import sys
-import subprocess
 import platform
 from pathlib import Path
 from typing import List, Dict, Optional
 
+from core import tracing
+
 
 class PythonVersion:
     """Represents a Python installation"""
@@ -96,7 +97,7 @@ class PythonDetector:
 
         # Check Windows Python Launcher
         try:
-            result = subprocess.run(['py', '-0'], capture_output=True, text=True, timeout=5)
+            result = tracing.run(['py', '-0'], capture_output=True, text=True, timeout=5)
             if result.returncode == 0:
                 for line in result.stdout.split('\n'):
                     if line.strip().startswith('-'):
@@ -106,7 +107,7 @@ class PythonDetector:
                             version_flag = parts[0].strip('-')
                             # Get path for this version
                             try:
-                                path_result = subprocess.run(
+                                path_result = tracing.run(
                                     ['py', f'-{version_flag}', '-c', 'import sys; print(sys.executable)'],
                                     capture_output=True, text=True, timeout=5
                                 )
@@ -207,7 +208,7 @@ class PythonDetector:
         """Check if commands are available in PATH"""
         for cmd in commands:
             try:
-                result = subprocess.run(
+                result = tracing.run(
                     [cmd, '-c', 'import sys; print(sys.executable)'],
                     capture_output=True, text=True, timeout=5
                 )
@@ -222,7 +223,7 @@ class PythonDetector:
     def _get_python_version(self, python_path: str) -> Optional[str]:
         """Get Python version for a given executable"""
         try:
-            result = subprocess.run(
+            result = tracing.run(
                 [python_path, '--version'],
                 capture_output=True, text=True, timeout=5
             )
@@ -256,7 +257,7 @@ class PythonDetector:
     def get_python_info(self, python_path: str) -> Dict[str, str]:
         """Get detailed information about a Python installation"""
         try:
-            result = subprocess.run(
+            result = tracing.run(
                 [python_path, '-c',
                  'import sys, platform; '
                  'print(f"{sys.version}|{platform.architecture()[0]}|{sys.prefix}")'
@@ -0,0 +1,236 @@
+"""Requirements Diff - compare a parsed requirement set with an environment
+
+Every requirement is classified as one of:
+
+    satisfied        installed and matching the specifier (and constraints)
+    version-mismatch installed, but the version does not match
+    missing          not installed
+    marker-excluded  its environment marker does not apply to the interpreter
+
+and every installed distribution not named in the file is reported as
+'extra'. Comparisons run against the in-memory InstalledIndex; the engine
+memoizes each requirement's verdict by its inputs (requirement, installed
+version, marker environment), so re-diffing after a small change only
+re-evaluates the entries that changed.
+"""
+
+import json
+from typing import Dict, List, Optional, Tuple
+
+from core import tracing
+
+SATISFIED = "satisfied"
+VERSION_MISMATCH = "version-mismatch"
+MISSING = "missing"
+EXTRA = "extra"
+MARKER_EXCLUDED = "marker-excluded"
+
+
+class DiffEntry:
+    """Status of one requirement (or one extra distribution)"""
+
+    def __init__(self, name: str, key: str, status: str, requirement=None,
+                 installed_version: Optional[str] = None, reason: str = ""):
+        self.name = name
+        self.key = key
+        self.status = status
+        self.requirement = requirement  # ParsedRequirement, None for extras
+        self.installed_version = installed_version
+        self.reason = reason
+
+    @property
+    def fix(self) -> Optional[str]:
+        """pip install argument that would fix this entry, if any"""
+        if self.status not in (MISSING, VERSION_MISMATCH) or self.requirement is None:
+            return None
+        return requirement_spec(self.requirement)
+
+    def to_dict(self) -> Dict:
+        """Plain-dict form"""
+        return {
+            "name": self.name,
+            "status": self.status,
+            "required": self.requirement.version_display if self.requirement is not None else None,
+            "installed": self.installed_version,
+            "reason": self.reason,
+            "fix": self.fix,
+        }
+
+    def __repr__(self):
+        return f"DiffEntry(name='{self.name}', status='{self.status}')"
+
+
+class RequirementsDiff:
+    """Result of comparing a requirement set with an environment"""
+
+    def __init__(self, entries: List[DiffEntry]):
+        self.entries = entries
+
+    def with_status(self, status: str) -> List[DiffEntry]:
+        """Entries with the given status"""
+        return [entry for entry in self.entries if entry.status == status]
+
+    @property
+    def is_clean(self) -> bool:
+        """True if every applicable requirement is satisfied"""
+        return not any(entry.status in (MISSING, VERSION_MISMATCH) for entry in self.entries)
+
+    def fix_specs(self) -> List[str]:
+        """Requirement specifiers to install so the environment matches the file"""
+        return [entry.fix for entry in self.entries if entry.fix]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of entries per status"""
+        counts = {status: 0 for status in (SATISFIED, VERSION_MISMATCH, MISSING, MARKER_EXCLUDED, EXTRA)}
+        for entry in self.entries:
+            counts[entry.status] += 1
+        return counts
+
+    def to_dict(self) -> Dict:
+        """
+        Plain-dict form
+
+        The 'missing', 'extra' and 'matching' name lists are kept for
+        callers of the original RequirementsManager diff.
+        """
+        return {
+            "missing": [e.key for e in self.with_status(MISSING)],
+            "extra": [e.key for e in self.with_status(EXTRA)],
+            "matching": [e.key for e in self.entries if e.status in (SATISFIED, VERSION_MISMATCH)],
+            "mismatched": [e.to_dict() for e in self.with_status(VERSION_MISMATCH)],
+            "marker_excluded": [e.key for e in self.with_status(MARKER_EXCLUDED)],
+            "install": self.fix_specs(),
+            "counts": self.counts(),
+            "entries": [e.to_dict() for e in self.entries],
+        }
+
+
+def requirement_spec(requirement) -> str:
+    """Format a ParsedRequirement as a pip install argument"""
+    if requirement.url:
+        if requirement.name and not requirement.editable:
+            return f"{requirement.name} @ {requirement.url}"
+        return requirement.url
+    extras = f"[{','.join(sorted(requirement.extras))}]" if requirement.extras else ""
+    return f"{requirement.name}{extras}{requirement.specifier}"
+
+
+class RequirementsDiffEngine:
+    """Diffs requirement sets against an interpreter's installed index"""
+
+    def __init__(self, python_executable: Optional[str] = None):
+        self.python_executable = python_executable
+        # memo key -> (status, reason)
+        self._verdicts: Dict[Tuple, Tuple[str, str]] = {}
+        self._environment: Optional[Dict[str, str]] = None
+        self._environment_key = ""
+        self.evaluated = 0  # verdicts computed by the last diff (not served from the memo)
+
+    def _marker_environment(self) -> Dict[str, str]:
+        """Marker variables of the target interpreter"""
+        if self._environment is None:
+            from core.installed_index import get_marker_environment
+            self._environment = get_marker_environment(self.python_executable) or {}
+            self._environment_key = json.dumps(self._environment, sort_keys=True)
+        return self._environment
+
+    def _evaluate(self, requirement, constraints, dist) -> Tuple[str, str]:
+        """Classify one requirement"""
+        if requirement.marker is not None:
+            environment = dict(self._marker_environment())
+            environment.setdefault("extra", "")
+            try:
+                if not requirement.marker.evaluate(environment):
+                    return MARKER_EXCLUDED, f"marker not met: {requirement.marker}"
+            except Exception as e:
+                return MARKER_EXCLUDED, f"marker could not be evaluated: {e}"
+
+        if dist is None:
+            return MISSING, "not installed"
+
+        if requirement.url:
+            # Direct references cannot be compared by version
+            return SATISFIED, ""
+
+        specifiers = [requirement.specifier] + [c.specifier for c in constraints]
+        if not any(len(spec) for spec in specifiers):
+            return SATISFIED, ""
+
+        version = dist.parsed_version
+        if version is None:
+            return VERSION_MISMATCH, f"installed version '{dist.version}' is not a valid version"
+
+        for spec in specifiers:
+            if not spec.contains(version, prereleases=True):
+                source = "constraint" if spec is not requirement.specifier else "requirement"
+                return VERSION_MISMATCH, f"{dist.version} does not match {source} '{spec}'"
+        return SATISFIED, ""
+
+    def diff(self, requirement_set, index=None, include_extra: bool = True) -> RequirementsDiff:
+        """
+        Compare a requirement set with the installed distributions
+
+        Args:
+            requirement_set: RequirementSet from core.requirements_parser
+            index: InstalledIndex (defaults to the shared one for the interpreter)
+            include_extra: Report installed distributions not in the file
+
+        Returns:
+            RequirementsDiff: Per-requirement statuses
+        """
+        if index is None:
+            from core.installed_index import get_installed_index
+            index = get_installed_index(self.python_executable)
+
+        self._marker_environment()
+        constraints = requirement_set.constraints_by_key()
+        verdicts = {}
+        # key -> entry, in file order; a marker-excluded entry is replaced
+        # by a later line for the same key whose marker applies
+        by_key: Dict[str, DiffEntry] = {}
+        resolved = set()
+        self.evaluated = 0
+
+        for requirement in requirement_set:
+            key = requirement.key
+            if key is None or key in resolved:
+                continue
+
+            dist = index.get(key)
+            applicable = constraints.get(key, [])
+            memo_key = (
+                key,
+                str(requirement.specifier),
+                str(requirement.marker) if requirement.marker is not None else "",
+                requirement.url or "",
+                tuple(str(c.specifier) for c in applicable),
+                dist.version if dist is not None else None,
+                self._environment_key,
+            )
+            verdict = self._verdicts.get(memo_key)
+            if verdict is None:
+                verdict = self._evaluate(requirement, applicable, dist)
+                self.evaluated += 1
+            verdicts[memo_key] = verdict
+
+            status, reason = verdict
+            if status == MARKER_EXCLUDED and key in by_key:
+                continue  # keep the first excluded line until one applies
+            if status != MARKER_EXCLUDED:
+                resolved.add(key)
+            by_key[key] = DiffEntry(
+                requirement.name, key, status, requirement,
+                dist.version if dist is not None else None, reason
+            )
+
+        entries = list(by_key.values())
+        if include_extra:
+            for dist in index:
+                if dist.key not in by_key:
+                    entries.append(DiffEntry(dist.name, dist.key, EXTRA, None, dist.version))
+
+        tracing.record_cache("requirements_diff", True, len(verdicts) - self.evaluated)
+        tracing.record_cache("requirements_diff", False, self.evaluated)
+        # Keep only verdicts that are still relevant
+        self._verdicts = verdicts
+        return RequirementsDiff(entries)
@@ -5,12 +5,15 @@ import sys
 import os
 from typing import List, Tuple, Dict
 
+from core import tracing
+
 
 class RequirementsManager:
     """Manages requirements.txt import/export"""
 
     def __init__(self, python_executable=None):
         self.python_executable = python_executable or sys.executable
+        self._diff_engine = None
 
     def export_requirements(self, file_path: str, include_versions: bool = True) -> Tuple[bool, str]:
         """
@@ -25,7 +28,7 @@ class RequirementsManager:
         """
         try:
             if include_versions:
-                result = subprocess.run(
+                result = tracing.run(
                     [self.python_executable, '-m', 'pip', 'freeze'],
                     capture_output=True,
                     text=True,
@@ -33,7 +36,7 @@ class RequirementsManager:
                 )
             else:
                 # Get packages without versions
-                result = subprocess.run(
+                result = tracing.run(
                     [self.python_executable, '-m', 'pip', 'list', '--format', 'freeze'],
                     capture_output=True,
                     text=True,
@@ -56,6 +59,54 @@ class RequirementsManager:
         except Exception as e:
             return False, str(e)
 
+    def export_lockfile(self, file_path: str, wheelhouse: str = None) -> Tuple[bool, str]:
+        """
+        Lock the environment with artifact hashes (see core.lockfile)
+
+        Args:
+            file_path: Path to save the lockfile
+            wheelhouse: Directory receiving the locked artifacts
+                        (default: the wheelhouse in the cache directory)
+
+        Returns:
+            tuple: (success: bool, message: str)
+        """
+        from core.lockfile import generate_lockfile
+
+        success, lock = generate_lockfile(self.python_executable, wheelhouse)
+        if not success:
+            return False, lock
+        try:
+            lock.save(file_path)
+        except OSError as e:
+            return False, str(e)
+        return True, f"Locked {len(lock.distributions)} packages to {file_path}"
+
+    def install_lockfile(self, file_path: str, wheelhouse: str = None,
+                         force: bool = False) -> Tuple[bool, str]:
+        """
+        Install a lockfile offline from a wheelhouse, verifying every hash
+
+        Args:
+            file_path: Lockfile to install
+            wheelhouse: Directory holding the locked artifacts
+            force: Install even if the interpreter differs from the locked one
+
+        Returns:
+            tuple: (success: bool, output: str)
+        """
+        from core.lockfile import install_from_lock
+
+        if wheelhouse is None:
+            from core.app_paths import get_cache_dir
+            from core.wheelhouse import get_wheelhouse_path
+            wheelhouse = get_wheelhouse_path() or get_cache_dir("wheelhouse")
+        success, output = install_from_lock(file_path, wheelhouse, self.python_executable, force)
+        if success:
+            from core.installed_index import get_installed_index
+            get_installed_index(self.python_executable, refresh=True)
+        return success, output
+
     def export_selected_packages(self, file_path: str, package_names: List[str],
                                  include_versions: bool = True) -> Tuple[bool, str]:
         """
@@ -74,7 +125,7 @@ class RequirementsManager:
 
             if include_versions:
                 # Get all installed packages with versions
-                result = subprocess.run(
+                result = tracing.run(
                     [self.python_executable, '-m', 'pip', 'freeze'],
                     capture_output=True,
                     text=True,
@@ -112,6 +163,9 @@ class RequirementsManager:
         """
         Install packages from requirements.txt
 
+        Only the requirements that are missing or at the wrong version are
+        handed to pip; nothing is removed.
+
         Args:
             file_path: Path to requirements.txt
 
@@ -122,11 +176,19 @@ class RequirementsManager:
             if not os.path.exists(file_path):
                 return False, f"File not found: {file_path}"
 
-            result = subprocess.run(
-                [self.python_executable, '-m', 'pip', 'install', '-r', file_path],
-                capture_output=True,
-                text=True,
-                timeout=600
+            success, requirement_set = self.load_requirement_set(file_path)
+            # Hash-checking mode needs pip to see every requirement of the file
+            if success and not requirement_set.errors and \
+                    not any(req.hashes for req in requirement_set):
+                success, result = self.sync_requirements(file_path)
+                if success:
+                    return True, "Successfully installed packages from requirements.txt"
+                return False, result
+
+            from core import wheelhouse
+
+            result = wheelhouse.run_pip_install(
+                [self.python_executable, '-m', 'pip', 'install'], ['-r', file_path], timeout=600
             )
 
             if result.returncode == 0:
@@ -139,51 +201,39 @@ class RequirementsManager:
         except Exception as e:
             return False, str(e)
 
-    def parse_requirements_file(self, file_path: str) -> Tuple[bool, List[Dict]]:
+    def load_requirement_set(self, file_path: str):
         """
-        Parse requirements.txt and return list of packages
+        Parse a requirements file, including the files it references
 
         Args:
             file_path: Path to requirements.txt
 
         Returns:
-            tuple: (success: bool, packages: List[Dict])
+            tuple: (success: bool, requirement set or error message)
         """
+        from core.requirements_parser import parse_requirements
+
         try:
-            if not os.path.exists(file_path):
-                return False, []
-
-            packages = []
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        # Parse package name and version
-                        if '==' in line:
-                            name, version = line.split('==', 1)
-                            packages.append({
-                                'name': name.strip(),
-                                'version': version.strip(),
-                                'line': line
-                            })
-                        elif '>=' in line:
-                            name, version = line.split('>=', 1)
-                            packages.append({
-                                'name': name.strip(),
-                                'version': f'>={version.strip()}',
-                                'line': line
-                            })
-                        else:
-                            packages.append({
-                                'name': line,
-                                'version': 'any',
-                                'line': line
-                            })
+            return True, parse_requirements(file_path)
+        except OSError as e:
+            return False, f"Cannot read {file_path}: {e.strerror or e}"
+        except Exception as e:
+            return False, str(e)
 
-            return True, packages
+    def parse_requirements_file(self, file_path: str) -> Tuple[bool, List[Dict]]:
+        """
+        Parse requirements.txt and return list of packages
 
-        except Exception as e:
+        Args:
+            file_path: Path to requirements.txt
+
+        Returns:
+            tuple: (success: bool, packages: List[Dict])
+        """
+        success, requirement_set = self.load_requirement_set(file_path)
+        if not success:
             return False, []
+        return True, [req.to_dict() for req in requirement_set]
 
     def validate_requirements(self, file_path: str) -> Tuple[bool, str, List[str]]:
         """
@@ -195,27 +245,39 @@ class RequirementsManager:
         Returns:
             tuple: (valid: bool, message: str, errors: List[str])
         """
-        try:
-            if not os.path.exists(file_path):
-                return False, "File not found", []
-
-            errors = []
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for i, line in enumerate(f, 1):
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        # Basic validation
-                        if not any(op in line for op in ['==', '>=', '<=', '>', '<', '~=']):
-                            if ' ' in line:
-                                errors.append(f"Line {i}: Invalid format - '{line}'")
-
-            if errors:
-                return False, "Validation failed", errors
-            else:
-                return True, "Valid requirements file", []
+        if not os.path.exists(file_path):
+            return False, "File not found", []
+
+        success, requirement_set = self.load_requirement_set(file_path)
+        if not success:
+            return False, requirement_set, []
 
+        errors = requirement_set.format_errors()
+        if errors:
+            return False, "Validation failed", errors
+        return True, "Valid requirements file", []
+
+    def diff_requirements(self, file_path: str):
+        """
+        Compare a requirements file with the installed distributions
+
+        Args:
+            file_path: Path to requirements.txt
+
+        Returns:
+            tuple: (success: bool, RequirementsDiff or error message)
+        """
+        success, requirement_set = self.load_requirement_set(file_path)
+        if not success:
+            return False, requirement_set
+
+        try:
+            if self._diff_engine is None:
+                from core.requirements_diff import RequirementsDiffEngine
+                self._diff_engine = RequirementsDiffEngine(self.python_executable)
+            return True, self._diff_engine.diff(requirement_set)
         except Exception as e:
-            return False, str(e), []
+            return False, str(e)
 
     def get_requirements_diff(self, file_path: str) -> Tuple[bool, Dict]:
         """
@@ -225,40 +287,73 @@ class RequirementsManager:
             file_path: Path to requirements.txt
 
         Returns:
-            tuple: (success: bool, diff: Dict with missing/extra/matching)
+            tuple: (success: bool, diff: Dict with missing/extra/matching,
+                    mismatched, marker_excluded and the 'install' fix list)
         """
-        try:
-            success, req_packages = self.parse_requirements_file(file_path)
-            if not success:
-                return False, {}
-
-            # Get installed packages
-            result = subprocess.run(
-                [self.python_executable, '-m', 'pip', 'freeze'],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+        success, diff = self.diff_requirements(file_path)
+        if not success:
+            return False, {}
+        return True, diff.to_dict()
 
-            if result.returncode != 0:
-                return False, {}
+    def plan_sync(self, file_path: str, remove_extra: bool = False):
+        """
+        Compute the changes needed to make the environment match a requirements file
 
-            installed = {}
-            for line in result.stdout.split('\n'):
-                if '==' in line:
-                    name, version = line.split('==', 1)
-                    installed[name.lower()] = version
+        Args:
+            file_path: Path to requirements.txt
+            remove_extra: Also plan removal of distributions nothing requires
 
-            req_names = {pkg['name'].lower() for pkg in req_packages}
-            installed_names = set(installed.keys())
+        Returns:
+            tuple: (success: bool, SyncPlan or error message)
+        """
+        success, requirement_set = self.load_requirement_set(file_path)
+        if not success:
+            return False, requirement_set
+        if requirement_set.errors:
+            return False, "\n".join(requirement_set.format_errors())
 
-            diff = {
-                'missing': list(req_names - installed_names),
-                'extra': list(installed_names - req_names),
-                'matching': list(req_names & installed_names)
-            }
+        try:
+            from core.installed_index import get_installed_index, get_marker_environment
+            from core.requirements_diff import RequirementsDiffEngine
+            from core.requirements_sync import plan_sync
+
+            if self._diff_engine is None:
+                self._diff_engine = RequirementsDiffEngine(self.python_executable)
+            index = get_installed_index(self.python_executable)
+            diff = self._diff_engine.diff(requirement_set, index, include_extra=False)
+            plan = plan_sync(requirement_set, diff, index, remove_extra=remove_extra,
+                             environment=get_marker_environment(self.python_executable))
+            return True, plan
+        except Exception as e:
+            return False, str(e)
 
-            return True, diff
+    def sync_requirements(self, file_path: str, remove_extra: bool = False,
+                          dry_run: bool = False) -> Tuple[bool, object]:
+        """
+        Install, upgrade, downgrade (and optionally remove) exactly what differs
 
-        except Exception as e:
-            return False, {}
+        Args:
+            file_path: Path to requirements.txt
+            remove_extra: Remove distributions nothing in the file requires
+            dry_run: Only compute the plan
+
+        Returns:
+            tuple: (success: bool, SyncPlan for dry runs / result dict / error message)
+        """
+        success, plan = self.plan_sync(file_path, remove_extra)
+        if not success or dry_run:
+            return success, plan
+
+        from core.installed_index import get_installed_index
+        from core.requirements_sync import execute_sync
+
+        result = execute_sync(plan, self.python_executable)
+        result["plan"] = plan.to_dict()
+        if plan.is_empty:
+            result["output"] = plan.summary()
+            return True, result
+        # The environment changed - make the next diff see it
+        get_installed_index(self.python_executable, refresh=True)
+        if result["success"]:
+            return True, result
+        return False, result["output"]
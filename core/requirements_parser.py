@@ -0,0 +1,525 @@
+"""Requirements Parser - PEP 508 requirements files with includes and constraints
+
+Understands the pip requirements-file format:
+
+    - PEP 508 specifiers, extras, markers and 'name @ url' references
+    - bare URLs and paths (name taken from '#egg=' or the wheel filename)
+    - '-r' / '--requirement' and '-c' / '--constraint' includes, resolved
+      relative to the including file, with cycle detection
+    - '-e' / '--editable' entries
+    - '-i', '--extra-index-url', '-f', '--no-index' and '--pre' options
+    - per-requirement '--hash' options
+    - comments, '\\' line continuations and ${VAR} expansion
+
+Files are read line by line. Each file's parse result is cached by path
+and content hash, so re-reading a large tree of unchanged files costs one
+stat() per file.
+"""
+
+import os
+import re
+import threading
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from core import tracing
+from core.installed_index import canonical_name
+
+_COMMENT_RE = re.compile(r"(^|\s+)#.*$")
+_ENV_VAR_RE = re.compile(r"\$\{([A-Z0-9_]+)\}")
+_EGG_FRAGMENT_RE = re.compile(r"[#&]egg=([^&]+)")
+_URL_SCHEME_RE = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*://")
+_ARCHIVE_SUFFIXES = (".whl", ".zip", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz", ".tar")
+
+# Options taking a value, by every spelling pip accepts
+_INCLUDE_OPTIONS = {"-r": "requirement", "--requirement": "requirement",
+                    "-c": "constraint", "--constraint": "constraint"}
+_VALUE_OPTIONS = {"-e": "editable", "--editable": "editable",
+                  "-i": "index_url", "--index-url": "index_url",
+                  "--extra-index-url": "extra_index_url",
+                  "-f": "find_links", "--find-links": "find_links"}
+_FLAG_OPTIONS = {"--no-index": "no_index", "--pre": "pre"}
+
+
+class ParsedRequirement:
+    """One requirement line of a requirements file"""
+
+    def __init__(self, name: Optional[str], specifier=None, extras: FrozenSet[str] = frozenset(),
+                 marker=None, url: Optional[str] = None, editable: bool = False,
+                 hashes: Optional[List[str]] = None, constraint: bool = False,
+                 source: str = "", line_number: int = 0, line: str = ""):
+        from packaging.specifiers import SpecifierSet
+
+        self.name = name
+        self.key = canonical_name(name) if name else None
+        self.specifier = specifier if specifier is not None else SpecifierSet()
+        self.extras = extras
+        self.marker = marker
+        self.url = url
+        self.editable = editable
+        self.hashes = hashes or []
+        self.constraint = constraint  # came from a '-c' file
+        self.source = source
+        self.line_number = line_number
+        self.line = line
+
+    @property
+    def pinned_version(self) -> Optional[str]:
+        """The exact version if the specifier is a single '==' / '===' pin"""
+        specs = list(self.specifier)
+        if len(specs) == 1 and specs[0].operator in ("==", "===") and not specs[0].version.endswith(".*"):
+            return specs[0].version
+        return None
+
+    @property
+    def version_display(self) -> str:
+        """Short version description ('1.2', '>=2,<3' or 'any')"""
+        if self.url:
+            return self.url
+        pinned = self.pinned_version
+        if pinned:
+            return pinned
+        return str(self.specifier) or "any"
+
+    def applies(self, environment: Optional[Dict[str, str]] = None) -> bool:
+        """
+        Evaluate the environment marker
+
+        Args:
+            environment: Marker variables overriding the running interpreter's
+
+        Returns:
+            bool: True if there is no marker or it matches
+        """
+        if self.marker is None:
+            return True
+        return self.marker.evaluate(environment)
+
+    def to_dict(self) -> Dict:
+        """Plain-dict form (used by RequirementsManager)"""
+        return {
+            "name": self.name or self.url or self.line,
+            "version": self.version_display,
+            "line": self.line,
+            "specifier": str(self.specifier),
+            "extras": sorted(self.extras),
+            "marker": str(self.marker) if self.marker is not None else None,
+            "url": self.url,
+            "editable": self.editable,
+            "hashes": list(self.hashes),
+            "constraint": self.constraint,
+            "source": self.source,
+            "line_number": self.line_number,
+        }
+
+    def __repr__(self):
+        return f"ParsedRequirement('{self.line}')"
+
+
+class RequirementSet:
+    """The expanded contents of a requirements file and everything it includes"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.requirements: List[ParsedRequirement] = []
+        self.constraints: List[ParsedRequirement] = []
+        self.index_url: Optional[str] = None
+        self.extra_index_urls: List[str] = []
+        self.find_links: List[str] = []
+        self.no_index = False
+        self.pre = False
+        self.files: List[str] = []
+        self.errors: List[Tuple[str, int, str]] = []  # (file, line number, message)
+
+    def by_key(self) -> Dict[str, ParsedRequirement]:
+        """Map canonical names to requirements (first occurrence wins)"""
+        result = {}
+        for req in self.requirements:
+            if req.key and req.key not in result:
+                result[req.key] = req
+        return result
+
+    def constraints_by_key(self) -> Dict[str, List[ParsedRequirement]]:
+        """Map canonical names to the constraints applying to them"""
+        result: Dict[str, List[ParsedRequirement]] = {}
+        for req in self.constraints:
+            if req.key:
+                result.setdefault(req.key, []).append(req)
+        return result
+
+    def names(self) -> List[str]:
+        """Names of all named requirements, in file order"""
+        return [req.name for req in self.requirements if req.name]
+
+    def format_errors(self) -> List[str]:
+        """Errors as 'file:line: message' strings"""
+        return [f"{os.path.basename(path)}:{line_number}: {message}" if line_number
+                else f"{os.path.basename(path)}: {message}"
+                for path, line_number, message in self.errors]
+
+    def __iter__(self) -> Iterator[ParsedRequirement]:
+        return iter(self.requirements)
+
+    def __len__(self):
+        return len(self.requirements)
+
+
+def iter_logical_lines(lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """
+    Join continuation lines and strip comments
+
+    Args:
+        lines: Physical lines (e.g. an open file)
+
+    Yields:
+        tuple: (line number of the first physical line, logical line)
+    """
+    buffer = []
+    start = 0
+    for number, raw in enumerate(lines, 1):
+        line = raw.rstrip("\r\n")
+        if not buffer:
+            start = number
+        # A comment line ends a continuation
+        if buffer and line.lstrip().startswith("#"):
+            line = ""
+        elif line.endswith("\\"):
+            buffer.append(line[:-1])
+            continue
+        buffer.append(line)
+        logical = _COMMENT_RE.sub("", "".join(buffer)).strip()
+        buffer = []
+        if logical:
+            yield start, logical
+
+    if buffer:
+        logical = _COMMENT_RE.sub("", "".join(buffer)).strip()
+        if logical:
+            yield start, logical
+
+
+def _expand_env_vars(line: str) -> str:
+    """Substitute ${VAR} references, leaving unknown variables as-is"""
+    return _ENV_VAR_RE.sub(lambda m: os.environ.get(m.group(1), m.group(0)), line)
+
+
+def _split_options(line: str) -> Tuple[str, List[str]]:
+    """Split a requirement line into the requirement and its trailing options"""
+    tokens = re.split(r"\s+", line)
+    for i, token in enumerate(tokens):
+        if token.startswith("-"):
+            return " ".join(tokens[:i]).strip(), [t for t in tokens[i:] if t]
+    return line, []
+
+
+def _looks_like_url_or_path(text: str) -> bool:
+    """Check whether a requirement is a URL or a local path rather than a name"""
+    if _URL_SCHEME_RE.match(text) or text.startswith("file:"):
+        return True
+    if text.startswith((".", "/", "~")) or "\\" in text or os.sep in text:
+        return True
+    return text.lower().endswith(_ARCHIVE_SUFFIXES)
+
+
+def _name_from_url(url: str) -> Optional[str]:
+    """Guess the project name of a URL or path requirement"""
+    match = _EGG_FRAGMENT_RE.search(url)
+    if match:
+        return match.group(1).split("[")[0]
+    filename = url.split("#")[0].rstrip("/").replace("\\", "/").rsplit("/", 1)[-1]
+    if filename.endswith(".whl"):
+        return filename.split("-")[0]
+    for suffix in _ARCHIVE_SUFFIXES:
+        if filename.endswith(suffix):
+            name, sep, _ = filename[:-len(suffix)].rpartition("-")
+            return name if sep else None
+    return None
+
+
+def parse_requirement_line(text: str, **kwargs) -> ParsedRequirement:
+    """
+    Parse one requirement (without requirements-file options)
+
+    Args:
+        text: e.g. 'requests[socks]>=2.28; python_version >= "3.8"'
+        **kwargs: Extra ParsedRequirement fields (source, line_number, ...)
+
+    Returns:
+        ParsedRequirement: The requirement
+
+    Raises:
+        ValueError: If the text is not a valid requirement
+    """
+    from packaging.requirements import InvalidRequirement, Requirement
+
+    kwargs.setdefault("line", text)
+    try:
+        req = Requirement(text)
+    except InvalidRequirement as e:
+        if not _looks_like_url_or_path(text):
+            raise ValueError(str(e).splitlines()[0])
+        url, _, marker_text = text.partition(";")
+        marker = None
+        if marker_text.strip():
+            from packaging.markers import InvalidMarker, Marker
+            try:
+                marker = Marker(marker_text.strip())
+            except InvalidMarker as marker_error:
+                raise ValueError(str(marker_error).splitlines()[0])
+        return ParsedRequirement(_name_from_url(url.strip()), marker=marker, url=url.strip(), **kwargs)
+
+    return ParsedRequirement(req.name, specifier=req.specifier, extras=frozenset(req.extras),
+                             marker=req.marker, url=req.url, **kwargs)
+
+
+class _ParsedFile:
+    """Cached parse result of a single file (includes not expanded)"""
+
+    def __init__(self, path: str, stat: Tuple[int, int], digest: str):
+        self.path = path
+        self.stat = stat
+        self.digest = digest
+        # ('requirement', ParsedRequirement) or ('include', kind, path, line number)
+        self.entries: List[Tuple] = []
+        self.options: List[Tuple[str, str]] = []
+        self.errors: List[Tuple[str, int, str]] = []
+
+
+def _parse_option_line(parsed: _ParsedFile, line_number: int, line: str):
+    """Handle a line starting with an option"""
+    option, sep, value = line.partition("=") if line.startswith("--") else (line, "", "")
+    if not sep:
+        parts = line.split(None, 1)
+        option = parts[0]
+        value = parts[1].strip() if len(parts) > 1 else ""
+        # Short options may be glued to their value ('-rdev.txt')
+        if not option.startswith("--") and len(option) > 2:
+            option, value = option[:2], (option[2:] + " " + value).strip()
+    option = option.strip()
+    value = value.strip()
+
+    if option in _FLAG_OPTIONS:
+        parsed.options.append((_FLAG_OPTIONS[option], ""))
+        return
+    if option not in _INCLUDE_OPTIONS and option not in _VALUE_OPTIONS:
+        # Other pip options (--no-binary, --trusted-host, ...) do not affect the set
+        parsed.options.append(("other", line))
+        return
+    if not value:
+        parsed.errors.append((parsed.path, line_number, f"{option} requires a value"))
+        return
+
+    if option in _INCLUDE_OPTIONS:
+        target = value
+        if not _URL_SCHEME_RE.match(target):
+            target = os.path.normpath(os.path.join(os.path.dirname(parsed.path),
+                                                   os.path.expanduser(target)))
+        parsed.entries.append(("include", _INCLUDE_OPTIONS[option], target, line_number))
+        return
+
+    kind = _VALUE_OPTIONS[option]
+    if kind == "editable":
+        url = value.strip("\"'")
+        parsed.entries.append(("requirement", ParsedRequirement(
+            _name_from_url(url), url=url, editable=True,
+            source=parsed.path, line_number=line_number, line=line)))
+    else:
+        parsed.options.append((kind, value))
+
+
+def _parse_requirement(parsed: _ParsedFile, line_number: int, line: str):
+    """Handle a requirement line"""
+    text, options = _split_options(line)
+    hashes = []
+    for i, option in enumerate(options):
+        if option.startswith("--hash="):
+            hashes.append(option[len("--hash="):])
+        elif option == "--hash" and i + 1 < len(options):
+            hashes.append(options[i + 1])
+
+    try:
+        req = parse_requirement_line(text, hashes=hashes, source=parsed.path,
+                                     line_number=line_number, line=line)
+    except ValueError as e:
+        parsed.errors.append((parsed.path, line_number, str(e)))
+        return
+    parsed.entries.append(("requirement", req))
+
+
+def _parse_stream(path: str, lines: Iterable[str], stat=(0, 0), digest: str = "") -> _ParsedFile:
+    """Parse the lines of one file"""
+    parsed = _ParsedFile(path, stat, digest)
+    for line_number, line in iter_logical_lines(lines):
+        line = _expand_env_vars(line)
+        if line.startswith("-"):
+            _parse_option_line(parsed, line_number, line)
+        else:
+            _parse_requirement(parsed, line_number, line)
+    return parsed
+
+
+# realpath -> parsed file
+_file_cache: Dict[str, _ParsedFile] = {}
+_cache_lock = threading.Lock()
+
+
+def _load_file(path: str, use_cache: bool = True) -> _ParsedFile:
+    """
+    Parse one file, reusing the cached result if its content is unchanged
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    from core.catalog_store import file_hash
+
+    st = os.stat(path)
+    stat = (st.st_mtime_ns, st.st_size)
+
+    with _cache_lock:
+        cached = _file_cache.get(path) if use_cache else None
+    if cached is not None:
+        if cached.stat == stat:
+            tracing.record_cache("requirements_parser", True)
+            return cached
+        # Touched but possibly not modified - compare contents
+        digest = file_hash(path)
+        if digest == cached.digest:
+            cached.stat = stat
+            tracing.record_cache("requirements_parser", True)
+            return cached
+    else:
+        digest = file_hash(path) if use_cache else ""
+    if use_cache:
+        tracing.record_cache("requirements_parser", False)
+
+    with tracing.span("requirements.parse", tracing.PARSE, path=path) as span, \
+            open(path, "r", encoding="utf-8") as f:
+        parsed = _parse_stream(path, f, stat, digest)
+        span.set(entries=len(parsed.entries))
+
+    if use_cache:
+        with _cache_lock:
+            _file_cache[path] = parsed
+    return parsed
+
+
+def clear_cache():
+    """Forget all cached parse results"""
+    with _cache_lock:
+        _file_cache.clear()
+
+
+def _apply_options(result: RequirementSet, options: List[Tuple[str, str]]):
+    """Copy index options of a parsed file into the result"""
+    for kind, value in options:
+        if kind == "index_url":
+            result.index_url = value
+        elif kind == "extra_index_url":
+            result.extra_index_urls.append(value)
+        elif kind == "find_links":
+            result.find_links.append(value)
+        elif kind == "no_index":
+            result.no_index = True
+        elif kind == "pre":
+            result.pre = True
+
+
+def _expand(result: RequirementSet, path: str, constraint: bool, stack: List[str],
+            seen: set, use_cache: bool, include_line: Tuple[str, int]):
+    """Add a file and everything it includes to the result"""
+    real = os.path.realpath(path)
+    if real in stack:
+        chain = " -> ".join(os.path.basename(p) for p in stack + [real])
+        result.errors.append((include_line[0], include_line[1], f"include cycle: {chain}"))
+        return
+    if (real, constraint) in seen:
+        return  # already included through another path
+    seen.add((real, constraint))
+
+    try:
+        parsed = _load_file(real, use_cache)
+    except (OSError, UnicodeDecodeError) as e:
+        reason = getattr(e, "strerror", None) or e
+        result.errors.append((include_line[0], include_line[1], f"cannot read {path}: {reason}"))
+        return
+
+    result.files.append(real)
+    result.errors.extend(parsed.errors)
+
+    _apply_options(result, parsed.options)
+
+    stack.append(real)
+    for entry in parsed.entries:
+        if entry[0] == "requirement":
+            req = entry[1]
+            if constraint:
+                req = _as_constraint(req)
+                result.constraints.append(req)
+            else:
+                result.requirements.append(req)
+        else:
+            _, kind, target, line_number = entry
+            if _URL_SCHEME_RE.match(target):
+                result.errors.append((real, line_number, f"remote includes are not supported: {target}"))
+                continue
+            _expand(result, target, constraint or kind == "constraint", stack, seen,
+                    use_cache, (real, line_number))
+    stack.pop()
+
+
+def _as_constraint(req: ParsedRequirement) -> ParsedRequirement:
+    """Copy of a requirement marked as coming from a constraints file"""
+    if req.constraint:
+        return req
+    copy = ParsedRequirement.__new__(ParsedRequirement)
+    copy.__dict__.update(req.__dict__)
+    copy.constraint = True
+    return copy
+
+
+def parse_requirements(path: str, use_cache: bool = True) -> RequirementSet:
+    """
+    Parse a requirements file and everything it includes
+
+    Syntax errors and unreadable includes do not stop parsing; they are
+    collected in RequirementSet.errors.
+
+    Args:
+        path: Path to the requirements file
+        use_cache: Reuse parse results of unchanged files
+
+    Returns:
+        RequirementSet: Requirements, constraints and index options
+
+    Raises:
+        OSError: If the top-level file cannot be read
+    """
+    path = os.path.abspath(path)
+    # Fail loudly for the file the caller asked for; includes only add errors
+    os.stat(path)
+    result = RequirementSet(path)
+    _expand(result, path, False, [], set(), use_cache, (path, 0))
+    return result
+
+
+def parse_requirements_text(text: str, source: str = "<string>") -> RequirementSet:
+    """
+    Parse requirements from a string (includes are resolved relative to the cwd)
+
+    Args:
+        text: Requirements file contents
+        source: Name used in error messages
+
+    Returns:
+        RequirementSet: The parsed set
+    """
+    parsed = _parse_stream(os.path.abspath(source), text.splitlines())
+    result = RequirementSet(source)
+    result.errors.extend(parsed.errors)
+    _apply_options(result, parsed.options)
+    for entry in parsed.entries:
+        if entry[0] == "requirement":
+            result.requirements.append(entry[1])
+        else:
+            _, kind, target, line_number = entry
+            _expand(result, target, kind == "constraint", [], set(), True, (source, line_number))
+    return result
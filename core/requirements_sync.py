@@ -0,0 +1,358 @@
+"""Requirements Sync - bring an environment in line with a requirements file
+
+The plan is the exact delta between the file and the environment:
+
+    install    required but not installed
+    upgrade    installed, but older than the specifier allows
+    downgrade  installed, but newer than the specifier allows
+    remove     installed, not required and not needed by anything required
+               (only when removal is requested)
+
+Executing a plan runs at most two pip processes: one install for every
+install/upgrade/downgrade, then one uninstall for the removals. Concurrent
+'pip uninstall' runs against one environment are not safe, so removals are
+batched into that single call rather than parallelised. An environment
+that already matches produces an empty plan and spawns nothing.
+
+What may be removed depends on the dependencies of what gets installed,
+which are only known once it is installed. A plan that both installs and
+removes therefore defers the removals: execute_sync() computes them from
+the refreshed index after the install succeeded.
+"""
+
+import os
+from typing import Dict, List, Optional, Set
+
+from core.requirements_diff import MISSING, VERSION_MISMATCH, requirement_spec
+
+# Never removed by a sync, like pip-sync
+PROTECTED_DISTRIBUTIONS = {"pip", "setuptools", "wheel", "distribute"}
+
+
+class SyncAction:
+    """One change to the environment"""
+
+    def __init__(self, action: str, name: str, key: Optional[str], installed_version: Optional[str] = None,
+                 spec: Optional[str] = None, reason: str = "", editable: bool = False):
+        self.action = action  # 'install', 'upgrade', 'downgrade' or 'remove'
+        self.name = name
+        self.key = key  # None for unnamed requirements (local paths, URLs)
+        self.installed_version = installed_version
+        self.spec = spec  # pip install argument (None for removals)
+        self.reason = reason
+        self.editable = editable
+
+    def install_args(self) -> List[str]:
+        """pip install arguments of this action"""
+        return ["-e", self.spec] if self.editable else [self.spec]
+
+    def describe(self) -> str:
+        """One-line human-readable description"""
+        if self.action == "remove":
+            return f"remove {self.name} {self.installed_version or ''}".rstrip()
+        if self.action == "install":
+            return f"install {' '.join(self.install_args())}"
+        return f"{self.action} {self.name} {self.installed_version} -> {self.spec}"
+
+    def to_dict(self) -> Dict:
+        """Plain-dict form"""
+        return {
+            "action": self.action,
+            "name": self.name,
+            "installed": self.installed_version,
+            "spec": self.spec,
+            "editable": self.editable,
+            "reason": self.reason,
+        }
+
+    def __repr__(self):
+        return f"SyncAction('{self.describe()}')"
+
+
+class SyncPlan:
+    """The set of changes that makes an environment match a requirements file"""
+
+    def __init__(self, actions: List[SyncAction], install_args: Optional[List[str]] = None,
+                 removal_scope: Optional[Dict] = None, requested: Optional[List[str]] = None):
+        self.actions = actions
+        self.install_args = install_args or []  # index / constraint options for pip install
+        # plan_removals() arguments when removals wait for the install, else None
+        self.removal_scope = removal_scope
+        # Specifiers of every named requirement in the file (cleanup roots)
+        self.requested = requested or []
+
+    @property
+    def removals_deferred(self) -> bool:
+        """True if removals are computed only after the installs ran"""
+        return self.removal_scope is not None
+
+    def of(self, action: str) -> List[SyncAction]:
+        """Actions of one kind"""
+        return [a for a in self.actions if a.action == action]
+
+    @property
+    def is_empty(self) -> bool:
+        """True if the environment already matches"""
+        return not self.actions
+
+    def install_specs(self) -> List[str]:
+        """pip install arguments for installs, upgrades and downgrades"""
+        return [arg for a in self.actions if a.action != "remove" for arg in a.install_args()]
+
+    def remove_names(self) -> List[str]:
+        """Distributions to uninstall"""
+        return [a.name for a in self.actions if a.action == "remove"]
+
+    def summary(self) -> str:
+        """Short summary such as '2 to install, 1 to upgrade'"""
+        if self.is_empty:
+            return "Environment already matches the requirements"
+        parts = []
+        for action, label in (("install", "to install"), ("upgrade", "to upgrade"),
+                              ("downgrade", "to downgrade"), ("remove", "to remove")):
+            count = len(self.of(action))
+            if count:
+                parts.append(f"{count} {label}")
+        if self.removals_deferred:
+            parts.append("removals checked after installing")
+        return ", ".join(parts)
+
+    def to_dict(self) -> Dict:
+        """Plain-dict form"""
+        return {
+            "summary": self.summary(),
+            "actions": [a.to_dict() for a in self.actions],
+            "install_args": list(self.install_args),
+            "removals_deferred": self.removals_deferred,
+        }
+
+
+def _direction(version, specifiers) -> str:
+    """Decide whether a mismatched version has to go up or down"""
+    from packaging.version import InvalidVersion, Version
+
+    for spec_set in specifiers:
+        for spec in spec_set:
+            if spec.contains(version, prereleases=True):
+                continue
+            if spec.operator in ("<", "<="):
+                return "downgrade"
+            if spec.operator in ("==", "===", "~="):
+                # Outside a pin or compatible range: below it or above it
+                try:
+                    if version > Version(spec.version.replace(".*", "")):
+                        return "downgrade"
+                except InvalidVersion:
+                    pass
+            return "upgrade"
+    return "upgrade"
+
+
+def _applies(requirement, environment: Optional[Dict[str, str]]) -> bool:
+    """Evaluate a requirement's marker for the target interpreter (True if unsure)"""
+    if requirement.marker is None:
+        return True
+    marker_environment = dict(environment or {})
+    marker_environment.setdefault("extra", "")
+    try:
+        return requirement.marker.evaluate(marker_environment)
+    except Exception:
+        return True
+
+
+def required_closure(keys: Set[str], index, environment: Optional[Dict[str, str]] = None,
+                     extras: Optional[Dict[str, Set[str]]] = None) -> Set[str]:
+    """
+    Get the installed distributions reachable from a set of names
+
+    Args:
+        keys: Canonical names to start from
+        index: InstalledIndex to walk
+        environment: Marker environment of the target interpreter
+        extras: Canonical name -> extras requested for it
+
+    Returns:
+        set: Canonical names of the roots and everything they depend on
+    """
+    extras = extras or {}
+    reachable = set()
+    pending = list(keys)
+    while pending:
+        key = pending.pop()
+        if key in reachable:
+            continue
+        reachable.add(key)
+        dist = index.get(key)
+        if dist is None:
+            continue
+        for dep in dist.dependency_keys(environment, extras.get(key, ())):
+            if dep not in reachable:
+                pending.append(dep)
+    return reachable
+
+
+def plan_removals(index, required: Set[str], environment: Optional[Dict[str, str]] = None,
+                  extras: Optional[Dict[str, Set[str]]] = None, keep: Optional[Set[str]] = None,
+                  unnamed: bool = False) -> List[SyncAction]:
+    """
+    Get the installed distributions nothing required depends on
+
+    Args:
+        index: InstalledIndex of the target interpreter
+        required: Canonical names the requirements file lists
+        environment: Marker environment of the target interpreter
+        extras: Canonical name -> extras requested for it
+        keep: Extra canonical names never to remove
+        unnamed: The file has local paths or URLs without a name
+
+    Returns:
+        list: 'remove' actions, sorted by name
+    """
+    protected = PROTECTED_DISTRIBUTIONS | set(keep or ())
+    if unnamed:
+        # Whatever they installed is among the distributions installed
+        # from a path or URL (or as legacy eggs); never remove those
+        protected |= {dist.key for dist in index
+                      if dist.path.endswith(".egg-info")
+                      or os.path.exists(os.path.join(dist.path, "direct_url.json"))}
+    needed = required_closure(required | protected, index, environment, extras)
+    return [SyncAction("remove", dist.name, dist.key, dist.version, None, "not required")
+            for dist in sorted(index, key=lambda d: d.key) if dist.key not in needed]
+
+
+def plan_sync(requirement_set, diff, index, remove_extra: bool = False,
+              environment: Optional[Dict[str, str]] = None,
+              keep: Optional[Set[str]] = None) -> SyncPlan:
+    """
+    Compute the changes that make the environment match the requirements
+
+    Args:
+        requirement_set: Parsed RequirementSet
+        diff: RequirementsDiff of that set against the index
+        index: InstalledIndex of the target interpreter
+        remove_extra: Also remove distributions nothing required depends on
+        environment: Marker environment of the target interpreter
+        keep: Extra canonical names never to remove
+
+    Returns:
+        SyncPlan: The delta (removals are deferred if anything is installed)
+    """
+    constraints = requirement_set.constraints_by_key()
+    actions = []
+
+    for entry in diff.entries:
+        if entry.status == MISSING:
+            actions.append(SyncAction("install", entry.name, entry.key, None,
+                                      requirement_spec(entry.requirement), entry.reason,
+                                      entry.requirement.editable))
+        elif entry.status == VERSION_MISMATCH:
+            dist = index.get(entry.key)
+            version = dist.parsed_version if dist is not None else None
+            specifiers = [entry.requirement.specifier] + [c.specifier for c in constraints.get(entry.key, [])]
+            action = _direction(version, specifiers) if version is not None else "upgrade"
+            actions.append(SyncAction(action, entry.name, entry.key, entry.installed_version,
+                                      requirement_spec(entry.requirement), entry.reason))
+
+    # Local paths and URLs without '#egg=' cannot be matched against the
+    # installed distributions: hand them to pip every time, as 'pip install -r' does
+    unnamed = [req for req in requirement_set if req.key is None and _applies(req, environment)]
+    for req in unnamed:
+        actions.append(SyncAction("install", req.url or req.line, None, None, requirement_spec(req),
+                                  "local path or URL (cannot be compared)", req.editable))
+
+    removal_scope = None
+    if remove_extra:
+        scope = {
+            "required": {req.key for req in requirement_set if req.key},
+            "environment": environment,
+            "extras": {req.key: set(req.extras) for req in requirement_set if req.key and req.extras},
+            "keep": set(keep or ()),
+            "unnamed": bool(unnamed),
+        }
+        if actions:
+            # Not-yet-installed requirements bring dependencies the current
+            # index cannot show; decide once they are installed
+            removal_scope = scope
+        else:
+            actions.extend(plan_removals(index, **scope))
+
+    install_args = []
+    if requirement_set.index_url:
+        install_args += ["--index-url", requirement_set.index_url]
+    for url in requirement_set.extra_index_urls:
+        install_args += ["--extra-index-url", url]
+    for link in requirement_set.find_links:
+        install_args += ["--find-links", link]
+    if requirement_set.no_index:
+        install_args.append("--no-index")
+    if requirement_set.pre:
+        install_args.append("--pre")
+    for source in sorted({c.source for c in requirement_set.constraints if c.source}):
+        install_args += ["-c", source]
+
+    requested = [requirement_spec(req) for req in requirement_set if req.key and _applies(req, environment)]
+    return SyncPlan(actions, install_args, removal_scope, requested)
+
+
+def execute_sync(plan: SyncPlan, python_executable: str) -> Dict:
+    """
+    Apply a sync plan
+
+    Installs run first, in a single pip call; removals run only if the
+    install succeeded, in a single 'pip uninstall' call. Deferred removals
+    are computed from the refreshed index in between. Every requirement of
+    the file is then marked as requested, so cleanup keeps it (an empty
+    plan only marks).
+
+    Args:
+        plan: The plan to apply
+        python_executable: Target interpreter
+
+    Returns:
+        dict: 'success', 'installed', 'removed' and pip 'output'
+    """
+    from core import tracing
+    from core.installed_index import get_installed_index
+
+    from core.cleanup_manager import CleanupManager
+    from core.installer import PackageInstaller
+
+    result = {"success": True, "installed": [], "removed": [], "output": ""}
+    if plan.is_empty:
+        CleanupManager(python_executable).mark_requested(plan.requested)
+        return result
+
+    specs = plan.install_specs()
+    if specs:
+        installer = PackageInstaller()
+        installer.set_python_executable(python_executable)
+        success, output = installer.install_packages(specs, plan.install_args)
+        result["output"] += output
+        if not success:
+            result["success"] = False
+            return result
+        result["installed"] = specs
+    CleanupManager(python_executable).mark_requested(plan.requested)
+
+    names = plan.remove_names()
+    if plan.removals_deferred:
+        index = get_installed_index(python_executable, refresh=True)
+        names = [action.name for action in plan_removals(index, **plan.removal_scope)]
+    if names:
+        try:
+            completed = tracing.run(
+                [python_executable, '-m', 'pip', 'uninstall', '-y'] + names,
+                capture_output=True,
+                text=True,
+                timeout=600
+            )
+            result["output"] += completed.stdout + completed.stderr
+            if completed.returncode == 0:
+                result["removed"] = names
+            else:
+                result["success"] = False
+        except Exception as e:
+            result["output"] += f"Error: {e}"
+            result["success"] = False
+
+    return result
@@ -0,0 +1,261 @@
+"""Catalog Search Index - inverted index with prefix and fuzzy matching"""
+
+import bisect
+import hashlib
+import json
+import os
+import re
+from typing import Callable, Dict, List, Optional
+
+from core import tracing
+from core.app_paths import get_cache_dir
+
+# Relative weight of a token depending on the field it came from
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "category": 1.5,
+    "description": 1.0,
+}
+
+# Minimum trigram similarity for a fuzzy match to count
+FUZZY_THRESHOLD = 0.35
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase alphanumeric tokens"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def trigrams(token: str) -> set:
+    """Get the padded trigram set of a token"""
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def catalog_hash(categories: Dict[str, List[Dict]]) -> str:
+    """Get a stable content hash of a catalog mapping"""
+    payload = json.dumps(categories, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SearchIndex:
+    """Inverted index over package name, description and category"""
+
+    FORMAT_VERSION = 1
+
+    def __init__(self):
+        self.catalog_hash = None
+        self.documents: List[Dict] = []
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.sorted_tokens: List[str] = []
+        self.trigram_index: Dict[str, List[str]] = {}
+
+    @classmethod
+    def build(cls, categories: Dict[str, List[Dict]], content_hash: Optional[str] = None):
+        """
+        Build an index from a catalog mapping
+
+        Args:
+            categories: Mapping of category name to package entries
+            content_hash: Precomputed catalog hash (computed if omitted)
+
+        Returns:
+            SearchIndex: The built index
+        """
+        index = cls()
+        index.catalog_hash = content_hash or catalog_hash(categories)
+
+        for category, packages in categories.items():
+            for pkg in packages:
+                doc_id = len(index.documents)
+                index.documents.append({
+                    "name": pkg["name"],
+                    "description": pkg.get("description", ""),
+                    "install_cmd": pkg.get("install_cmd", ""),
+                    "category": category,
+                })
+
+                fields = {
+                    "name": tokenize(pkg["name"]) + [pkg["name"].lower()],
+                    "category": tokenize(category),
+                    "description": tokenize(pkg.get("description", "")),
+                }
+                for field, tokens in fields.items():
+                    weight = FIELD_WEIGHTS[field]
+                    for token in tokens:
+                        doc_weights = index.postings.setdefault(token, {})
+                        # Keep the strongest field a token appears in
+                        if doc_weights.get(doc_id, 0.0) < weight:
+                            doc_weights[doc_id] = weight
+
+        index._finalize()
+        return index
+
+    def _finalize(self):
+        """Derive the lookup structures used for prefix and fuzzy matching"""
+        self.sorted_tokens = sorted(self.postings)
+        self.trigram_index = {}
+        for token in self.sorted_tokens:
+            for gram in trigrams(token):
+                self.trigram_index.setdefault(gram, []).append(token)
+
+    @classmethod
+    def load_or_build(cls, content_hash: str, load_categories: Callable[[], Dict[str, List[Dict]]],
+                      cache_path: Optional[str] = None):
+        """
+        Load the index from the disk cache, rebuilding it if the catalog changed
+
+        Args:
+            content_hash: Hash of the catalog the index must match
+            load_categories: Returns the catalog mapping; only called on rebuild
+            cache_path: Cache file location (defaults to the app cache dir)
+
+        Returns:
+            SearchIndex: A ready-to-query index
+        """
+        if cache_path is None:
+            cache_path = os.path.join(get_cache_dir(), "search_index.json")
+
+        with tracing.span("search_index.load", tracing.PARSE, path=cache_path):
+            index = cls.load(cache_path)
+        if index is not None and index.catalog_hash == content_hash:
+            tracing.record_cache("search_index", True)
+            return index
+
+        tracing.record_cache("search_index", False)
+        with tracing.span("search_index.build", tracing.PARSE) as span:
+            index = cls.build(load_categories(), content_hash)
+            span.set(documents=len(index.documents))
+        index.save(cache_path)
+        return index
+
+    @classmethod
+    def load(cls, cache_path: str):
+        """Load a cached index, or None if missing or unreadable"""
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") != cls.FORMAT_VERSION:
+                return None
+
+            index = cls()
+            index.catalog_hash = data["catalog_hash"]
+            index.documents = data["documents"]
+            index.postings = {
+                token: {int(doc_id): weight for doc_id, weight in docs}
+                for token, docs in data["postings"].items()
+            }
+            index._finalize()
+            return index
+        except Exception:
+            return None
+
+    def save(self, cache_path: str) -> bool:
+        """Write the index to disk"""
+        try:
+            data = {
+                "format": self.FORMAT_VERSION,
+                "catalog_hash": self.catalog_hash,
+                "documents": self.documents,
+                "postings": {
+                    token: [[doc_id, weight] for doc_id, weight in docs.items()]
+                    for token, docs in self.postings.items()
+                },
+            }
+            tmp_path = cache_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+            return True
+        except Exception:
+            return False
+
+    def _prefix_matches(self, term: str) -> List[str]:
+        """Get all indexed tokens starting with term"""
+        start = bisect.bisect_left(self.sorted_tokens, term)
+        end = bisect.bisect_left(self.sorted_tokens, term + "\uffff", start)
+        return self.sorted_tokens[start:end]
+
+    def _fuzzy_matches(self, term: str) -> Dict[str, float]:
+        """Get indexed tokens similar to term by trigram overlap"""
+        term_grams = trigrams(term)
+        shared: Dict[str, int] = {}
+        for gram in term_grams:
+            for token in self.trigram_index.get(gram, ()):
+                shared[token] = shared.get(token, 0) + 1
+
+        matches = {}
+        for token, count in shared.items():
+            # Dice coefficient over the two trigram sets
+            similarity = 2.0 * count / (len(term_grams) + len(token) + 1)
+            if similarity >= FUZZY_THRESHOLD:
+                matches[token] = similarity
+        return matches
+
+    def _score_term(self, term: str) -> Dict[int, float]:
+        """Score documents for a single query term"""
+        scores: Dict[int, float] = {}
+
+        for token in self._prefix_matches(term):
+            # Exact hits beat prefix hits; shorter completions beat longer ones
+            closeness = 1.0 if token == term else 0.5 + 0.5 * len(term) / len(token)
+            for doc_id, weight in self.postings[token].items():
+                score = weight * closeness
+                if score > scores.get(doc_id, 0.0):
+                    scores[doc_id] = score
+
+        if not scores and len(term) >= 3:
+            for token, similarity in self._fuzzy_matches(term).items():
+                for doc_id, weight in self.postings[token].items():
+                    score = weight * similarity * 0.5
+                    if score > scores.get(doc_id, 0.0):
+                        scores[doc_id] = score
+
+        return scores
+
+    def search(self, query: str, limit: int = 50) -> List[Dict]:
+        """
+        Search the index
+
+        Args:
+            query: Free text query, matched by prefix and fuzzily
+            limit: Maximum number of results
+
+        Returns:
+            list: Matching package entries (with 'category'), best first
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        totals: Dict[int, float] = {}
+        hits: Dict[int, int] = {}
+        for term in terms:
+            for doc_id, score in self._score_term(term).items():
+                totals[doc_id] = totals.get(doc_id, 0.0) + score
+                hits[doc_id] = hits.get(doc_id, 0) + 1
+
+        whole_query = query.strip().lower()
+        ranked = []
+        for doc_id, score in totals.items():
+            # Documents matching every term rank above partial matches
+            score *= hits[doc_id] / len(terms)
+            if self.documents[doc_id]["name"].lower() == whole_query:
+                score += 10.0
+            ranked.append((-score, self.documents[doc_id]["name"].lower(), doc_id))
+
+        ranked.sort()
+
+        # A package listed under several categories is reported once
+        results = []
+        seen = set()
+        for _, name, doc_id in ranked:
+            if name in seen:
+                continue
+            seen.add(name)
+            results.append(self.documents[doc_id])
+            if len(results) >= limit:
+                break
+        return results
@@ -0,0 +1,416 @@
+"""Snapshot Manager - undo for bulk installs and updates
+
+Before a mutating operation a snapshot records the exact installed set
+(name -> version) of the interpreter and archives the distributions the
+operation may replace: the packages it targets plus their installed
+dependencies, and for installs whatever pip's dry-run report says it would
+reinstall (the whole environment if pip cannot tell). Archiving repacks the installed files listed in each
+distribution's RECORD into a wheel, so it needs neither the network nor
+the original download.
+
+Rolling back compares the environment with the snapshot and touches only
+what changed: changed or removed distributions are reinstalled from the
+archived wheels (pip --no-index --no-deps), distributions added since are
+uninstalled. Distributions without an archived wheel are reported, and
+everything else is still rolled back.
+
+Snapshots live in <cache dir>/snapshots; the newest MAX_SNAPSHOTS are kept
+and wheels no longer referenced by any snapshot are deleted.
+"""
+
+import base64
+import csv
+import hashlib
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+import zipfile
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core import tracing
+from core.app_paths import get_cache_dir
+
+MAX_SNAPSHOTS = 10
+# Written by the installer; pip regenerates them
+_SKIPPED_METADATA = ("INSTALLER", "REQUESTED", "direct_url.json", "RECORD")
+
+
+def _record_hash(data: bytes) -> str:
+    """RECORD-style hash (urlsafe base64 sha256 without padding)"""
+    digest = hashlib.sha256(data).digest()
+    return "sha256=" + base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+def _wheel_tag(dist) -> str:
+    """Wheel tag of an installed distribution (from its WHEEL file)"""
+    pythons, abis, platforms = [], [], []
+    try:
+        with open(os.path.join(dist.path, "WHEEL"), "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("Tag:"):
+                    python, abi, platform = line.split(":", 1)[1].strip().split("-")
+                    for values, value in ((pythons, python), (abis, abi), (platforms, platform)):
+                        if value not in values:
+                            values.append(value)
+    except (OSError, ValueError):
+        pass
+    if not pythons:
+        return "py3-none-any"
+    return f"{'.'.join(pythons)}-{'.'.join(abis)}-{'.'.join(platforms)}"
+
+
+def repack_wheel(dist, target_dir: str) -> Optional[str]:
+    """
+    Rebuild a wheel from an installed distribution
+
+    Files are taken from the distribution's RECORD. Files installed outside
+    the site-packages directory (console scripts, data files) are skipped;
+    pip recreates console scripts from entry_points.txt.
+
+    Args:
+        dist: InstalledDistribution (.dist-info only)
+        target_dir: Directory receiving the wheel
+
+    Returns:
+        str: Path of the wheel, or None if the distribution cannot be repacked
+    """
+    if not dist.path.endswith(".dist-info"):
+        return None
+    record_path = os.path.join(dist.path, "RECORD")
+    try:
+        with open(record_path, "r", encoding="utf-8", newline="") as f:
+            rows = list(csv.reader(f))
+    except OSError:
+        return None
+
+    dist_info_name = os.path.basename(dist.path)
+    name = dist_info_name[:-len(".dist-info")].rpartition("-")[0]
+    filename = f"{name}-{dist.version}-{_wheel_tag(dist)}.whl"
+    os.makedirs(target_dir, exist_ok=True)
+    wheel_path = os.path.join(target_dir, filename)
+    if os.path.exists(wheel_path):
+        return wheel_path
+
+    location = os.path.abspath(dist.location)
+    tmp_path = wheel_path + ".part"
+    record = []
+    try:
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for row in rows:
+                if not row:
+                    continue
+                relative = row[0]
+                full = os.path.abspath(os.path.join(location, relative))
+                if not full.startswith(location + os.sep):
+                    continue  # outside site-packages (scripts, data)
+                arcname = os.path.relpath(full, location).replace(os.sep, "/")
+                if "/__pycache__/" in "/" + arcname or arcname.endswith(".pyc"):
+                    continue
+                if arcname.startswith(dist_info_name + "/") and \
+                        arcname.split("/", 1)[1] in _SKIPPED_METADATA:
+                    continue
+                try:
+                    with open(full, "rb") as f:
+                        data = f.read()
+                except OSError:
+                    continue
+                archive.writestr(arcname, data)
+                record.append((arcname, _record_hash(data), str(len(data))))
+
+            record_name = f"{dist_info_name}/RECORD"
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            writer.writerows(record)
+            writer.writerow((record_name, "", ""))
+            archive.writestr(record_name, buffer.getvalue())
+        os.replace(tmp_path, wheel_path)
+    except (OSError, zipfile.BadZipFile):
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return None
+    return wheel_path
+
+
+def install_replacements(python_executable: str, install_args: List[str], timeout: int = 300) -> Optional[set]:
+    """
+    Get the installed distributions a 'pip install' would replace
+
+    Asks pip for a dry-run installation report (pip 22.2 or newer), so
+    upgrades of dependencies the targets do not reach yet are included.
+
+    Args:
+        python_executable: Target interpreter
+        install_args: 'pip install' options and requirement specifiers
+
+    Returns:
+        set: Canonical names of installed distributions in the report, or
+             None if pip could not produce one
+    """
+    from core import wheelhouse
+    from core.installed_index import canonical_name, get_installed_index
+
+    try:
+        result = tracing.run(
+            [python_executable, '-m', 'pip', 'install', '--dry-run', '--quiet', '--report', '-'] +
+            wheelhouse.install_args() + list(install_args),
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+        if result.returncode != 0:
+            return None
+        report = json.loads(result.stdout)
+    except Exception:
+        return None
+
+    index = get_installed_index(python_executable)
+    replaced = set()
+    for item in report.get("install", []):
+        name = (item.get("metadata") or {}).get("name")
+        if name and index.is_installed(name):
+            replaced.add(canonical_name(name))
+    return replaced
+
+
+class Snapshot:
+    """The installed set of an interpreter at one point in time"""
+
+    def __init__(self, snapshot_id: str, python_executable: str, label: str,
+                 created: float, installed: Dict[str, Tuple[str, str]],
+                 wheels: Dict[str, str]):
+        self.id = snapshot_id
+        self.python_executable = python_executable
+        self.label = label
+        self.created = created
+        self.installed = installed  # canonical name -> (name, version)
+        self.wheels = wheels  # canonical name -> archived wheel file name
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "python": self.python_executable,
+            "label": self.label,
+            "created": self.created,
+            "installed": {key: list(value) for key, value in self.installed.items()},
+            "wheels": self.wheels,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Snapshot":
+        return cls(data["id"], data["python"], data.get("label", ""), data.get("created", 0),
+                   {key: tuple(value) for key, value in data.get("installed", {}).items()},
+                   data.get("wheels", {}))
+
+
+class SnapshotManager:
+    """Creates, lists and restores snapshots"""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or get_cache_dir("snapshots")
+        self.wheel_dir = os.path.join(self.directory, "wheels")
+
+    def _snapshot_path(self, snapshot_id: str) -> str:
+        return os.path.join(self.directory, f"{snapshot_id}.json")
+
+    def list_snapshots(self, python_executable: Optional[str] = None) -> List[Snapshot]:
+        """
+        List snapshots, newest first
+
+        Args:
+            python_executable: Only snapshots of this interpreter
+        """
+        snapshots = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), "r", encoding="utf-8") as f:
+                    snapshot = Snapshot.from_dict(json.load(f))
+            except (OSError, ValueError, KeyError):
+                continue
+            if python_executable and snapshot.python_executable != python_executable:
+                continue
+            snapshots.append(snapshot)
+        return sorted(snapshots, key=lambda s: s.created, reverse=True)
+
+    def get(self, snapshot_id: str) -> Optional[Snapshot]:
+        """Load one snapshot"""
+        try:
+            with open(self._snapshot_path(snapshot_id), "r", encoding="utf-8") as f:
+                return Snapshot.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def take(self, python_executable: Optional[str] = None, label: str = "",
+             affected: Optional[Iterable[str]] = None,
+             install_args: Optional[List[str]] = None) -> Snapshot:
+        """
+        Record the installed set and archive what an operation may replace
+
+        Args:
+            python_executable: Interpreter (defaults to the running one)
+            label: Description (e.g. 'Update 12 packages')
+            affected: Names the operation targets; they and their installed
+                      dependencies are archived. None archives everything.
+            install_args: For installs, the 'pip install' arguments: the
+                          installed distributions pip would replace are
+                          archived too (everything, if pip cannot tell)
+
+        Returns:
+            Snapshot: The stored snapshot
+        """
+        from core.installed_index import canonical_name, get_installed_index, get_marker_environment
+        from core.requirements_sync import required_closure
+
+        python_executable = python_executable or sys.executable
+        index = get_installed_index(python_executable)
+
+        if affected is None and install_args is None:
+            to_archive = {dist.key for dist in index}
+        else:
+            roots = {canonical_name(name) for name in affected or ()}
+            to_archive = required_closure(roots, index, get_marker_environment(python_executable))
+            if install_args is not None:
+                replaced = install_replacements(python_executable, install_args)
+                if replaced is None:
+                    to_archive = {dist.key for dist in index}
+                else:
+                    to_archive |= replaced
+
+        wheels = {}
+        for key in sorted(to_archive):
+            dist = index.get(key)
+            if dist is None:
+                continue
+            wheel_path = repack_wheel(dist, self.wheel_dir)
+            if wheel_path:
+                wheels[key] = os.path.basename(wheel_path)
+
+        created = time.time()
+        snapshot_id = time.strftime("%Y%m%d-%H%M%S", time.localtime(created)) + f"-{int(created * 1000) % 1000:03d}"
+        snapshot = Snapshot(snapshot_id, python_executable, label, created,
+                            {dist.key: (dist.name, dist.version) for dist in index}, wheels)
+
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self._snapshot_path(snapshot_id) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot.to_dict(), f, indent=1)
+        os.replace(tmp_path, self._snapshot_path(snapshot_id))
+
+        self.prune()
+        return snapshot
+
+    def changes_since(self, snapshot: Snapshot) -> Dict[str, List[Tuple[str, Optional[str], Optional[str]]]]:
+        """
+        Compare the environment with a snapshot
+
+        Returns:
+            dict: 'changed', 'removed' and 'added' lists of (name, snapshot version, current version)
+        """
+        from core.installed_index import get_installed_index
+
+        index = get_installed_index(snapshot.python_executable, refresh=True)
+        current = {dist.key: (dist.name, dist.version) for dist in index}
+
+        changes = {"changed": [], "removed": [], "added": []}
+        for key, (name, version) in snapshot.installed.items():
+            if key not in current:
+                changes["removed"].append((name, version, None))
+            elif current[key][1] != version:
+                changes["changed"].append((name, version, current[key][1]))
+        for key, (name, version) in current.items():
+            if key not in snapshot.installed:
+                changes["added"].append((name, None, version))
+        return changes
+
+    def rollback(self, snapshot: Snapshot, timeout: int = 600) -> Tuple[bool, str]:
+        """
+        Restore the environment to a snapshot without network access
+
+        Returns:
+            tuple: (success: bool, message or pip output)
+        """
+        from core.installed_index import canonical_name, get_installed_index
+
+        changes = self.changes_since(snapshot)
+        restore = changes["changed"] + changes["removed"]
+        remove = [name for name, _, _ in changes["added"]]
+        if not restore and not remove:
+            return True, "Environment already matches the snapshot"
+
+        # Without an archived wheel a distribution cannot be restored offline;
+        # still restore and remove everything else
+        missing = [f"{name}=={version}" for name, version, _ in restore
+                   if canonical_name(name) not in snapshot.wheels]
+        restore = [entry for entry in restore if canonical_name(entry[0]) in snapshot.wheels]
+
+        output = []
+        success = True
+        try:
+            if restore:
+                result = tracing.run(
+                    [snapshot.python_executable, '-m', 'pip', 'install', '--no-index', '--no-deps',
+                     '--find-links', self.wheel_dir] +
+                    [f"{name}=={version}" for name, version, _ in restore],
+                    capture_output=True,
+                    text=True,
+                    timeout=timeout
+                )
+                output.append(result.stdout + result.stderr)
+                success = result.returncode == 0
+
+            if remove:
+                result = tracing.run(
+                    [snapshot.python_executable, '-m', 'pip', 'uninstall', '-y'] + remove,
+                    capture_output=True,
+                    text=True,
+                    timeout=timeout
+                )
+                output.append(result.stdout + result.stderr)
+                success = success and result.returncode == 0
+        except subprocess.TimeoutExpired:
+            return False, "Rollback timed out"
+        except Exception as e:
+            return False, str(e)
+        finally:
+            get_installed_index(snapshot.python_executable, refresh=True)
+
+        if missing:
+            output.insert(0, "No archived wheel for: " + ", ".join(missing) +
+                          f" (restored {len(restore)} and removed {len(remove)} other package(s))")
+            return False, "\n".join(output)
+        if success:
+            return True, f"Restored {len(restore)} and removed {len(remove)} package(s)"
+        return False, "\n".join(output)
+
+    def prune(self, keep: int = MAX_SNAPSHOTS):
+        """Delete old snapshots and the wheels only they referenced"""
+        snapshots = self.list_snapshots()
+        for snapshot in snapshots[keep:]:
+            try:
+                os.remove(self._snapshot_path(snapshot.id))
+            except OSError:
+                pass
+
+        referenced = set()
+        for snapshot in snapshots[:keep]:
+            referenced.update(snapshot.wheels.values())
+        try:
+            names = os.listdir(self.wheel_dir)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith(".whl") and name not in referenced:
+                try:
+                    os.remove(os.path.join(self.wheel_dir, name))
+                except OSError:
+                    pass
@@ -0,0 +1,137 @@
+"""Startup Profiler - import time breakdown and time-to-first-paint report"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+MARKS_PREFIX = "STARTUP_MARKS "
+
+
+class StartupTimer:
+    """Records named wall-clock checkpoints relative to its creation"""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.marks: List[Dict] = []
+
+    def mark(self, label: str):
+        """Record a checkpoint"""
+        self.marks.append({"label": label, "seconds": time.perf_counter() - self.origin})
+
+    def emit(self, stream=None):
+        """Write the checkpoints as a single machine-readable line"""
+        stream = stream or sys.stdout
+        stream.write(MARKS_PREFIX + json.dumps(self.marks) + "\n")
+        stream.flush()
+
+
+def parse_importtime(text: str) -> List[Dict]:
+    """
+    Parse '-X importtime' output
+
+    Args:
+        text: stderr of an interpreter run with -X importtime
+
+    Returns:
+        list: Entries with 'module', 'self_us', 'cumulative_us' and 'level'
+    """
+    entries = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0])
+            cumulative_us = int(parts[1])
+        except ValueError:
+            continue  # header line
+        raw_name = parts[2]
+        # Nested imports are indented two spaces per level after the separator
+        level = max(0, (len(raw_name) - len(raw_name.lstrip()) - 1) // 2)
+        entries.append({
+            "module": raw_name.strip(),
+            "self_us": self_us,
+            "cumulative_us": cumulative_us,
+            "level": level,
+        })
+    return entries
+
+
+def format_report(marks: List[Dict], imports: List[Dict], top: int = 15) -> str:
+    """Format checkpoints and import costs as a human-readable report"""
+    lines = ["Startup timing report", "=" * 60, ""]
+
+    lines.append("Wall clock (from main.py start):")
+    previous = 0.0
+    for mark in marks:
+        delta = mark["seconds"] - previous
+        previous = mark["seconds"]
+        lines.append(f"  {mark['seconds'] * 1000:8.1f} ms  (+{delta * 1000:7.1f})  {mark['label']}")
+    if not marks:
+        lines.append("  (no checkpoints recorded)")
+    lines.append("")
+
+    if imports:
+        total_us = sum(entry["self_us"] for entry in imports)
+        lines.append(f"Imports: {len(imports)} modules, {total_us / 1000:.1f} ms total")
+        lines.append("")
+
+        lines.append(f"Slowest top-level imports (cumulative, top {top}):")
+        top_level = sorted((e for e in imports if e["level"] == 0),
+                           key=lambda e: e["cumulative_us"], reverse=True)
+        for entry in top_level[:top]:
+            lines.append(f"  {entry['cumulative_us'] / 1000:8.1f} ms  {entry['module']}")
+        lines.append("")
+
+        lines.append(f"Slowest individual modules (self time, top {top}):")
+        by_self = sorted(imports, key=lambda e: e["self_us"], reverse=True)
+        for entry in by_self[:top]:
+            lines.append(f"  {entry['self_us'] / 1000:8.1f} ms  {entry['module']}")
+
+    return "\n".join(lines)
+
+
+def run_startup_report(script_path: str, top: int = 15, timeout: int = 120) -> str:
+    """
+    Launch the app once under -X importtime and report where startup time goes
+
+    The child is started with --startup-exit so it prints its checkpoints
+    and quits right after the first paint.
+
+    Args:
+        script_path: Path to main.py
+        top: Number of entries per import table
+        timeout: Seconds to wait for the child
+
+    Returns:
+        str: The formatted report
+    """
+    started = time.perf_counter()
+    try:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", script_path, "--startup-exit"],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            cwd=os.path.dirname(os.path.abspath(script_path))
+        )
+    except subprocess.TimeoutExpired:
+        return "Startup report failed: application did not paint within the timeout"
+    elapsed = time.perf_counter() - started
+
+    marks: Optional[List[Dict]] = None
+    for line in result.stdout.splitlines():
+        if line.startswith(MARKS_PREFIX):
+            marks = json.loads(line[len(MARKS_PREFIX):])
+
+    if marks is None:
+        errors = "\n".join(line for line in result.stderr.splitlines() if not line.startswith("import time:"))
+        return f"Startup report failed (exit code {result.returncode}):\n{errors[-2000:]}"
+
+    report = format_report(marks, parse_importtime(result.stderr), top)
+    return f"{report}\n\nProcess wall clock including interpreter start and exit: {elapsed * 1000:.1f} ms"
@@ -0,0 +1,293 @@
+"""Tracing - lightweight spans, cache counters and Chrome trace export
+
+Core modules wrap their slow steps in spans:
+
+    from core import tracing
+
+    with tracing.span("installed_index.scan", tracing.FS, python=python):
+        ...
+    result = tracing.run(cmd, capture_output=True, text=True)   # subprocess.run
+    tracing.record_cache("requirements_parser", hit=True)
+
+Finished spans go into a bounded ring buffer, so tracing is always on and
+costs a perf_counter() call and an append per operation. Set
+LIBRARY_MANAGER_TRACE=0 to turn it off, or LIBRARY_MANAGER_TRACE_FILE to
+write a Chrome trace-event file (chrome://tracing, Perfetto) at exit.
+"""
+
+import atexit
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+MAX_SPANS = 5000
+
+# Span categories
+SUBPROCESS = "subprocess"
+FS = "fs"
+PARSE = "parse"
+CACHE = "cache"
+NETWORK = "network"
+RPC = "rpc"
+
+_enabled = os.environ.get("LIBRARY_MANAGER_TRACE", "1").strip().lower() not in ("0", "false", "no", "off")
+_origin = time.perf_counter()
+_spans = deque(maxlen=MAX_SPANS)
+_cache_counters: Dict[str, List[int]] = {}
+_spawn_counts: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+class Span:
+    """One finished (or running) operation"""
+
+    __slots__ = ("name", "category", "start", "duration", "thread_id", "args")
+
+    def __init__(self, name: str, category: str, args: Optional[Dict] = None):
+        self.name = name
+        self.category = category
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.thread_id = threading.get_ident()
+        self.args = args or {}
+
+    def set(self, **args):
+        """Attach more arguments, e.g. a result size"""
+        self.args.update(args)
+
+    def to_event(self, pid: int) -> Dict:
+        """Chrome trace-event 'complete' event (microseconds)"""
+        return {
+            "name": self.name,
+            "cat": self.category,
+            "ph": "X",
+            "ts": round((self.start - _origin) * 1e6, 1),
+            "dur": round(self.duration * 1e6, 1),
+            "pid": pid,
+            "tid": self.thread_id,
+            "args": _jsonable(self.args),
+        }
+
+
+class _NullSpan:
+    """Stand-in yielded while tracing is disabled"""
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _jsonable(args: Dict) -> Dict:
+    result = {}
+    for key, value in args.items():
+        if isinstance(value, (str, int, float, bool)) or value is None:
+            result[key] = value
+        elif isinstance(value, (list, tuple)):
+            result[key] = [str(item) for item in value]
+        else:
+            result[key] = str(value)
+    return result
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(enabled: bool):
+    """Turn span recording on or off at runtime"""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+@contextmanager
+def span(name: str, category: str = "", **args):
+    """
+    Time the enclosed block
+
+    Yields the span so callers can attach results (span.set(count=...)).
+    Exceptions propagate; the span records their type under 'error'.
+    """
+    if not _enabled:
+        yield _NULL_SPAN
+        return
+    current = Span(name, category, args)
+    try:
+        yield current
+    except BaseException as e:
+        current.args["error"] = type(e).__name__
+        raise
+    finally:
+        current.duration = time.perf_counter() - current.start
+        _spans.append(current)
+
+
+def record_cache(name: str, hit: bool, count: int = 1):
+    """Count hits or misses of the named cache"""
+    if not _enabled or count <= 0:
+        return
+    with _lock:
+        counters = _cache_counters.setdefault(name, [0, 0])
+        counters[0 if hit else 1] += count
+
+
+def count_spawn(label: str):
+    """Count a started process (run() does this itself)"""
+    with _lock:
+        _spawn_counts[label] = _spawn_counts.get(label, 0) + 1
+
+
+def _output_size(output) -> int:
+    if output is None:
+        return 0
+    if isinstance(output, bytes):
+        return len(output)
+    return len(output.encode("utf-8", "replace"))
+
+
+_URL = re.compile(r"[A-Za-z][A-Za-z0-9+.-]*://[^\s'\"]+")
+
+
+def _redact(arg: str) -> str:
+    """Argument with the credentials of any URL in it removed"""
+    if "://" not in arg or "@" not in arg:
+        return arg
+    from core.index_client import _strip_userinfo
+
+    return _URL.sub(lambda match: _strip_userinfo(match.group(0)), arg)
+
+
+def run(args, **kwargs) -> subprocess.CompletedProcess:
+    """
+    subprocess.run with a span recording argv, exit code and output size
+
+    URLs in the recorded argv lose their userinfo (index tokens in
+    --index-url and the like). Takes and returns exactly what
+    subprocess.run does. Every call is
+    counted in spawn_counts(), even while span recording is off.
+    """
+    argv = [str(arg) for arg in args] if isinstance(args, (list, tuple)) else [str(args)]
+    label = os.path.basename(argv[0]) if argv else "?"
+    if len(argv) > 2 and argv[1] == "-m":
+        label += f" -m {argv[2]}" + (f" {argv[3]}" if len(argv) > 3 and not argv[3].startswith("-") else "")
+    elif len(argv) > 1 and not argv[1].startswith("-"):
+        label += f" {argv[1]}"
+    count_spawn(label)
+    if not _enabled:
+        return subprocess.run(args, **kwargs)
+    with span(f"run {label}", SUBPROCESS, argv=[_redact(arg) for arg in argv]) as current:
+        try:
+            result = subprocess.run(args, **kwargs)
+        except subprocess.TimeoutExpired as e:
+            current.set(timeout=kwargs.get("timeout"),
+                        output_bytes=_output_size(e.output) + _output_size(e.stderr))
+            raise
+        current.set(returncode=result.returncode,
+                    stdout_bytes=_output_size(result.stdout),
+                    stderr_bytes=_output_size(result.stderr))
+        return result
+
+
+def spans() -> List[Span]:
+    """Snapshot of the recorded spans, oldest first"""
+    return list(_spans)
+
+
+def slowest(count: int = 20, category: Optional[str] = None) -> List[Span]:
+    """The longest recent spans, optionally of one category"""
+    selected = [s for s in list(_spans) if category is None or s.category == category]
+    selected.sort(key=lambda s: s.duration, reverse=True)
+    return selected[:count]
+
+
+def summary() -> List[Dict]:
+    """
+    Per-operation totals
+
+    Returns:
+        list: Dicts with 'name', 'category', 'count', 'total' and 'max'
+              (seconds), most expensive first
+    """
+    totals: Dict[str, Dict] = {}
+    for s in list(_spans):
+        entry = totals.setdefault(s.name, {"name": s.name, "category": s.category,
+                                           "count": 0, "total": 0.0, "max": 0.0})
+        entry["count"] += 1
+        entry["total"] += s.duration
+        entry["max"] = max(entry["max"], s.duration)
+    return sorted(totals.values(), key=lambda e: e["total"], reverse=True)
+
+
+def cache_stats() -> Dict[str, Dict]:
+    """
+    Hit/miss counts per cache
+
+    Returns:
+        dict: Cache name -> {'hits', 'misses', 'hit_rate'} (hit_rate is None
+              before the first lookup)
+    """
+    with _lock:
+        items = [(name, list(counters)) for name, counters in _cache_counters.items()]
+    stats = {}
+    for name, (hits, misses) in sorted(items):
+        total = hits + misses
+        stats[name] = {"hits": hits, "misses": misses,
+                       "hit_rate": hits / total if total else None}
+    return stats
+
+
+def spawn_counts() -> Dict[str, int]:
+    """Processes started through run(), per command ('pip show', 'python -m pip list', ...)"""
+    with _lock:
+        return dict(sorted(_spawn_counts.items(), key=lambda item: item[1], reverse=True))
+
+
+def clear():
+    """Forget all spans and counters"""
+    _spans.clear()
+    with _lock:
+        _cache_counters.clear()
+        _spawn_counts.clear()
+
+
+def chrome_trace() -> Dict:
+    """The recorded spans in Chrome trace-event format"""
+    pid = os.getpid()
+    events = [s.to_event(pid) for s in list(_spans)]
+    events.sort(key=lambda e: e["ts"])
+    for name, stats in cache_stats().items():
+        events.append({"name": f"cache {name}", "cat": CACHE, "ph": "C", "ts": events[-1]["ts"] if events else 0,
+                       "pid": pid, "args": {"hits": stats["hits"], "misses": stats["misses"]}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export_chrome_trace(path: str):
+    """
+    Write the trace for chrome://tracing or ui.perfetto.dev
+
+    Returns:
+        tuple: (success: bool, message: str)
+    """
+    try:
+        trace = chrome_trace()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+        return True, f"Wrote {len(trace['traceEvents'])} events to {path}"
+    except Exception as e:
+        return False, f"Could not write trace: {str(e)}"
+
+
+def _export_at_exit():
+    path = os.environ.get("LIBRARY_MANAGER_TRACE_FILE")
+    if path and _spans:
+        export_chrome_trace(path)
+
+
+atexit.register(_export_at_exit)
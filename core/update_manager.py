@@ -4,6 +4,8 @@ import subprocess
 import sys
 from typing import List, Dict, Tuple
 
+from core import tracing
+
 
 class UpdateManager:
     """Manages package updates"""
@@ -15,11 +17,21 @@ class UpdateManager:
         """
         Check for outdated packages
 
+        Queries the index client (one pooled request per installed
+        distribution, cached); falls back to 'pip list --outdated' if the
+        index cannot be reached.
+
         Returns:
-            tuple: (success: bool, packages: List[Dict])
+            tuple: (success: bool, packages: List[Dict]) - dicts as produced
+                   by 'pip list --outdated --format json'
         """
         try:
-            result = subprocess.run(
+            return True, self._outdated_from_index()
+        except Exception:
+            pass
+
+        try:
+            result = tracing.run(
                 [self.python_executable, '-m', 'pip', 'list', '--outdated', '--format', 'json'],
                 capture_output=True,
                 text=True,
@@ -36,6 +48,43 @@ class UpdateManager:
         except Exception as e:
             return False, []
 
+    def _outdated_from_index(self, jobs: int = 8) -> List[Dict]:
+        """Compare the installed distributions with the index"""
+        from concurrent.futures import ThreadPoolExecutor
+        from packaging.version import InvalidVersion, Version
+        from core.index_client import ProjectNotFound, get_index_client
+        from core.installed_index import get_installed_index, get_marker_environment
+        from core.version_catalog import get_version_catalog
+
+        client = get_index_client()
+        environment = get_marker_environment(self.python_executable) or {}
+        python_version = environment.get("python_full_version")
+        dists = list(get_installed_index(self.python_executable))
+
+        def check(dist):
+            try:
+                installed = Version(dist.version)
+            except InvalidVersion:
+                return None
+            try:
+                catalog = get_version_catalog(dist.name, client=client)
+            except ProjectNotFound:
+                return None  # not published on this index (local or private package)
+            latest = catalog.latest(installed.is_prerelease, python_version)
+            if latest is None or Version(latest) <= installed:
+                return None
+            files = client.get_project(dist.name).releases().get(latest, [])
+            return {
+                'name': dist.display_name,
+                'version': dist.version,
+                'latest_version': latest,
+                'latest_filetype': 'wheel' if any(f.is_wheel for f in files) else 'sdist',
+            }
+
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(check, dists))
+        return sorted((r for r in results if r), key=lambda r: r['name'].lower())
+
     def update_package(self, package_name: str) -> Tuple[bool, str]:
         """
         Update a single package
@@ -46,13 +95,17 @@ class UpdateManager:
         Returns:
             tuple: (success: bool, message: str)
         """
+        from core import wheelhouse
+
         try:
-            result = subprocess.run(
-                [self.python_executable, '-m', 'pip', 'install', '--upgrade', package_name],
+            result = tracing.run(
+                [self.python_executable, '-m', 'pip', 'install', '--upgrade', package_name] +
+                wheelhouse.install_args(),
                 capture_output=True,
                 text=True,
                 timeout=300
             )
+            wheelhouse.record_pip_output(result.stdout)
 
             if result.returncode == 0:
                 return True, f"Successfully updated {package_name}"
@@ -64,65 +117,85 @@ class UpdateManager:
         except Exception as e:
             return False, str(e)
 
-    def update_multiple_packages(self, package_names: List[str]) -> List[Dict]:
+    def update_multiple_packages(self, package_names: List[str], progress=None) -> List[Dict]:
         """
         Update multiple packages
 
+        Packages are upgraded in dependency-aware batches; a failing batch is
+        bisected so one bad package does not block the others.
+
         Args:
             package_names: List of package names to update
+            progress: Optional callable receiving status messages
 
         Returns:
             list: Results for each package
         """
-        results = []
+        from core.installed_index import get_installed_index
 
-        for package_name in package_names:
-            success, message = self.update_package(package_name)
-            results.append({
-                'package': package_name,
-                'success': success,
-                'message': message
-            })
+        index = get_installed_index(self.python_executable)
+        outdated = []
+        for name in package_names:
+            dist = index.get(name)
+            outdated.append({'name': name, 'version': dist.version if dist is not None else ''})
+        return self.update_packages(outdated, progress=progress)
 
-        return results
-
-    def update_all_outdated(self) -> Tuple[bool, str]:
+    def update_packages(self, outdated: List[Dict], progress=None, snapshot: bool = True) -> List[Dict]:
         """
-        Update all outdated packages at once
+        Upgrade packages as reported by check_outdated_packages
+
+        Args:
+            outdated: Dicts with 'name', 'version' and 'latest_version'
+            progress: Optional callable receiving status messages
+            snapshot: Take a snapshot first, so the upgrade can be rolled back
 
         Returns:
-            tuple: (success: bool, message: str)
+            list: Per-package dicts with 'package', 'success', 'message', 'from' and 'to'
         """
+        from core.snapshot_manager import SnapshotManager
+        from core.update_planner import UpdateExecutor, plan_updates
+
         try:
-            # Get list of outdated packages
-            success, outdated = self.check_outdated_packages()
+            if snapshot:
+                if progress is not None:
+                    progress("Taking snapshot")
+                SnapshotManager().take(self.python_executable, f"Update {len(outdated)} package(s)",
+                                       [pkg['name'] for pkg in outdated])
+            plan = plan_updates(outdated, self.python_executable)
+            return UpdateExecutor(self.python_executable, progress).execute(plan)
+        except Exception as e:
+            return [{'package': pkg['name'], 'success': False, 'message': str(e)} for pkg in outdated]
 
-            if not success or not outdated:
-                return True, "No packages to update"
+    def update_all_outdated(self) -> Tuple[bool, str]:
+        """
+        Update all outdated packages
+
+        Returns:
+            tuple: (success: bool, message: str) - success is False if any
+                   package could not be updated
+        """
+        # Get list of outdated packages
+        success, outdated = self.check_outdated_packages()
 
-            package_names = [pkg['name'] for pkg in outdated]
+        if not success or not outdated:
+            return True, "No packages to update"
 
-            # Update all at once
-            result = subprocess.run(
-                [self.python_executable, '-m', 'pip', 'install', '--upgrade'] + package_names,
-                capture_output=True,
-                text=True,
-                timeout=600
-            )
+        results = self.update_packages(outdated)
+        failed = [r for r in results if not r['success']]
+        updated = len(results) - len(failed)
 
-            if result.returncode == 0:
-                return True, f"Successfully updated {len(package_names)} packages"
-            else:
-                return False, result.stderr or result.stdout
+        if not failed:
+            return True, f"Successfully updated {updated} packages"
 
-        except subprocess.TimeoutExpired:
-            return False, "Update timeout"
-        except Exception as e:
-            return False, str(e)
+        lines = [f"Updated {updated} of {len(results)} packages. Failed:"]
+        for result in failed:
+            reason = (result['message'] or '').strip().splitlines()
+            lines.append(f"  {result['package']}: {reason[-1] if reason else 'unknown error'}")
+        return False, "\n".join(lines)
 
     def get_package_latest_version(self, package_name: str) -> str:
         """
-        Get latest version of a package from PyPI
+        Get latest version of a package from the package index
 
         Args:
             package_name: Name of the package
@@ -130,26 +203,9 @@ class UpdateManager:
         Returns:
             str: Latest version or 'Unknown'
         """
-        try:
-            result = subprocess.run(
-                [self.python_executable, '-m', 'pip', 'index', 'versions', package_name],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-
-            if result.returncode == 0:
-                # Parse output to get latest version
-                lines = result.stdout.split('\n')
-                for line in lines:
-                    if 'Available versions:' in line or 'LATEST:' in line:
-                        # Extract first version
-                        import re
-                        versions = re.findall(r'\d+\.\d+\.\d+', line)
-                        if versions:
-                            return versions[0]
-
-            return 'Unknown'
+        from core.version_catalog import get_version_catalog
 
+        try:
+            return get_version_catalog(package_name).latest() or 'Unknown'
         except Exception:
             return 'Unknown'
@@ -0,0 +1,250 @@
+"""Update Planner - dependency-aware, failure-isolating bulk upgrades
+
+Outdated packages are grouped into components: two packages land in the
+same component when one depends (directly or transitively, through the
+installed dependency graph) on the other, since those must be resolved
+together. Independent components are packed into batches, and each batch
+is upgraded with one pip resolver call.
+
+If a batch fails, it is bisected - first along component boundaries, then
+within a component - until the package that cannot be upgraded is isolated;
+everything else still gets upgraded. Results are reported per package.
+
+Before installing, the target wheels can be prefetched into the wheelhouse
+in parallel ('pip wheel' runs are independent), so the sequential install
+phase is mostly local disk work.
+"""
+
+import sys
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_BATCH_SIZE = 25
+
+
+class UpdateItem:
+    """One package to upgrade"""
+
+    def __init__(self, name: str, current_version: str, target_version: Optional[str] = None):
+        from core.installed_index import canonical_name
+
+        self.name = name
+        self.key = canonical_name(name)
+        self.current_version = current_version
+        self.target_version = target_version
+
+    @property
+    def spec(self) -> str:
+        """pip install argument"""
+        if self.target_version:
+            return f"{self.name}=={self.target_version}"
+        return self.name
+
+    def __repr__(self):
+        return f"UpdateItem('{self.name}' {self.current_version} -> {self.target_version})"
+
+
+def group_components(items: List[UpdateItem], index, environment: Optional[Dict[str, str]] = None) -> List[List[UpdateItem]]:
+    """
+    Group packages that depend on each other
+
+    Args:
+        items: Packages to upgrade
+        index: InstalledIndex with the current dependency metadata
+        environment: Marker environment of the target interpreter
+
+    Returns:
+        list: Components (lists of items), largest first
+    """
+    keys = {item.key for item in items}
+    parent = {key: key for key in keys}
+
+    def find(key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    # Walk each item's installed dependency closure once; join it with the
+    # other outdated packages found there
+    for item in items:
+        seen = {item.key}
+        stack = [item.key]
+        while stack:
+            dist = index.get(stack.pop())
+            if dist is None:
+                continue
+            for dep in dist.dependency_keys(environment):
+                if dep in seen:
+                    continue
+                seen.add(dep)
+                stack.append(dep)
+                if dep in keys:
+                    parent[find(dep)] = find(item.key)
+
+    components: Dict[str, List[UpdateItem]] = {}
+    for item in items:
+        components.setdefault(find(item.key), []).append(item)
+    return sorted(components.values(), key=len, reverse=True)
+
+
+def pack_batches(components: List[List[UpdateItem]], batch_size: int = DEFAULT_BATCH_SIZE) -> List[List[List[UpdateItem]]]:
+    """
+    Pack components into batches of about batch_size packages
+
+    A component larger than batch_size gets a batch of its own.
+
+    Returns:
+        list: Batches, each a list of components
+    """
+    batches: List[List[List[UpdateItem]]] = []
+    current: List[List[UpdateItem]] = []
+    count = 0
+    for component in components:
+        if current and count + len(component) > batch_size:
+            batches.append(current)
+            current, count = [], 0
+        current.append(component)
+        count += len(component)
+    if current:
+        batches.append(current)
+    return batches
+
+
+class UpdatePlan:
+    """Batches of independent upgrades"""
+
+    def __init__(self, batches: List[List[List[UpdateItem]]]):
+        self.batches = batches
+
+    @property
+    def items(self) -> List[UpdateItem]:
+        return [item for batch in self.batches for component in batch for item in component]
+
+    def to_dict(self) -> Dict:
+        return {
+            "batches": [[[item.name for item in component] for component in batch]
+                        for batch in self.batches],
+        }
+
+
+def plan_updates(outdated: List[Dict], python_executable: Optional[str] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE) -> UpdatePlan:
+    """
+    Plan the upgrade of packages reported by 'pip list --outdated'
+
+    Args:
+        outdated: Dicts with 'name', 'version' and optionally 'latest_version'
+        python_executable: Target interpreter
+        batch_size: Packages per resolver call
+
+    Returns:
+        UpdatePlan: The batches
+    """
+    from core.installed_index import get_installed_index, get_marker_environment
+
+    items = [UpdateItem(pkg['name'], pkg.get('version', ''), pkg.get('latest_version'))
+             for pkg in outdated]
+    index = get_installed_index(python_executable)
+    components = group_components(items, index, get_marker_environment(python_executable))
+    return UpdatePlan(pack_batches(components, batch_size))
+
+
+class UpdateExecutor:
+    """Runs an UpdatePlan, bisecting failed batches"""
+
+    def __init__(self, python_executable: Optional[str] = None,
+                 progress: Optional[Callable[[str], None]] = None):
+        self.python_executable = python_executable or sys.executable
+        self.progress = progress
+        self.pip_calls = 0
+
+    def _report(self, message: str):
+        if self.progress is not None:
+            self.progress(message)
+
+    def _install(self, items: List[UpdateItem]):
+        """One resolver call for a group of packages"""
+        from core import wheelhouse
+
+        self.pip_calls += 1
+        self._report(f"Upgrading {', '.join(item.name for item in items)}")
+        # Targets are pinned, so the wheelhouse can safely be tried alone first
+        pinned = all(item.target_version for item in items)
+        args = ([] if pinned else ['--upgrade']) + [item.spec for item in items]
+        try:
+            result = wheelhouse.run_pip_install(
+                [self.python_executable, '-m', 'pip', 'install'], args,
+                timeout=600, offline_first=pinned
+            )
+            return result.returncode == 0, result.stderr or result.stdout
+        except Exception as e:
+            return False, str(e)
+
+    def _run_group(self, groups: List[List[UpdateItem]], results: Dict[str, Dict]):
+        """Upgrade groups together; on failure split them and retry each half"""
+        items = [item for group in groups for item in group]
+        success, output = self._install(items)
+        if success:
+            for item in items:
+                results[item.key] = {"success": True, "message": f"Successfully updated {item.name}"}
+            return
+
+        if len(items) == 1:
+            results[items[0].key] = {"success": False, "message": output}
+            return
+
+        if len(groups) == 1:
+            # Bisect inside a component
+            groups = [[item] for item in groups[0]]
+        middle = len(groups) // 2
+        self._run_group(groups[:middle], results)
+        self._run_group(groups[middle:], results)
+
+    def execute(self, plan: UpdatePlan, prefetch: bool = True, jobs: int = 4) -> List[Dict]:
+        """
+        Apply a plan
+
+        Args:
+            plan: Batches to upgrade
+            prefetch: Download/build the target wheels into the wheelhouse first
+            jobs: Parallel prefetch processes
+
+        Returns:
+            list: Per-package dicts with 'package', 'success', 'message',
+                  'from', 'to' and 'batch'
+        """
+        from core import wheelhouse
+        from core.installed_index import get_installed_index
+
+        items = plan.items
+        if not items:
+            return []
+
+        store = wheelhouse.get_wheelhouse()
+        if prefetch and store is not None:
+            self._report(f"Fetching {len(items)} packages")
+            store.prefetch([item.spec for item in items if item.target_version],
+                           self.python_executable, jobs=jobs)
+
+        results: Dict[str, Dict] = {}
+        batch_of: Dict[str, int] = {}
+        for number, batch in enumerate(plan.batches, 1):
+            for component in batch:
+                for item in component:
+                    batch_of[item.key] = number
+            self._run_group(batch, results)
+
+        index = get_installed_index(self.python_executable, refresh=True)
+        report = []
+        for item in items:
+            result = results.get(item.key, {"success": False, "message": "not attempted"})
+            dist = index.get(item.key)
+            report.append({
+                "package": item.name,
+                "success": result["success"],
+                "message": result["message"],
+                "from": item.current_version,
+                "to": dist.version if dist is not None else None,
+                "batch": batch_of.get(item.key),
+            })
+        return report
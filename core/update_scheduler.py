@@ -0,0 +1,277 @@
+"""Update Scheduler - periodic background checks for outdated packages
+
+A daemon thread checks the watched interpreters every few hours. The
+delay is jittered so several machines (or app instances) do not hit the
+index at the same moment, grows exponentially while the index is
+unreachable, and checks are postponed while the machine is busy.
+
+Results go into a persistent cache (<cache dir>/outdated.json) that the
+Update view and 'python -m core outdated --cached' read without running
+pip. The cache also remembers which updates were already announced, so a
+notification is only raised for updates that are new.
+"""
+
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from core.app_paths import get_cache_dir
+
+CACHE_NAME = "outdated.json"
+DEFAULT_INTERVAL = 6 * 60 * 60  # 6 hours
+MAX_BACKOFF = 24 * 60 * 60
+JITTER = 0.1  # +/- 10 %
+BUSY_RETRY = 10 * 60
+DEFAULT_INDEX_URL = "https://pypi.org/simple"
+
+
+class OutdatedCache:
+    """Persistent per-interpreter results of outdated checks"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(get_cache_dir(), CACHE_NAME)
+        self._lock = threading.Lock()
+        self._data: Optional[Dict] = None
+
+    def _load(self) -> Dict:
+        if self._data is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError):
+                self._data = {}
+        return self._data
+
+    def _save(self):
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    def get(self, python_executable: str) -> Optional[Dict]:
+        """
+        Get the last result for an interpreter
+
+        Returns:
+            dict: 'checked_at' (epoch seconds) and 'packages', or None
+        """
+        with self._lock:
+            entry = self._load().get(python_executable)
+            return dict(entry) if entry else None
+
+    def put(self, python_executable: str, packages: List[Dict]) -> List[Dict]:
+        """
+        Store a check result
+
+        Returns:
+            list: Packages whose latest version was not announced before
+        """
+        with self._lock:
+            data = self._load()
+            entry = data.get(python_executable) or {}
+            announced = set(entry.get("announced", []))
+            new = [pkg for pkg in packages
+                   if f"{pkg['name'].lower()}=={pkg.get('latest_version')}" not in announced]
+            data[python_executable] = {
+                "checked_at": time.time(),
+                "packages": packages,
+                # Only remember announcements still relevant, so the list stays small
+                "announced": sorted(announced & {f"{p['name'].lower()}=={p.get('latest_version')}"
+                                                 for p in packages}),
+            }
+            self._save()
+            return new
+
+    def mark_announced(self, python_executable: str, packages: List[Dict]):
+        """Remember that these updates were announced"""
+        with self._lock:
+            entry = self._load().get(python_executable)
+            if not entry:
+                return
+            announced = set(entry.get("announced", []))
+            announced.update(f"{p['name'].lower()}=={p.get('latest_version')}" for p in packages)
+            entry["announced"] = sorted(announced)
+            self._save()
+
+    def invalidate(self, python_executable: str):
+        """Drop the result for an interpreter (e.g. after an upgrade)"""
+        with self._lock:
+            if self._load().pop(python_executable, None) is not None:
+                self._save()
+
+
+def next_delay(interval: float, failures: int = 0, jitter: float = JITTER,
+               rng: Optional[random.Random] = None) -> float:
+    """
+    Seconds until the next check
+
+    Args:
+        interval: Normal interval
+        failures: Consecutive checks that failed (index unreachable)
+        jitter: Relative random spread
+        rng: Random source
+
+    Returns:
+        float: Delay in seconds
+    """
+    rng = rng or random
+    if failures:
+        # Retry sooner than the interval at first, then back off
+        base = min(MAX_BACKOFF, 60 * (2 ** min(failures, 16)))
+    else:
+        base = interval
+    return base * (1 + rng.uniform(-jitter, jitter))
+
+
+def machine_is_busy(threshold: float = 0.75) -> bool:
+    """
+    Check whether the machine is busy enough to postpone background work
+
+    Uses the 1-minute load average where the OS provides one.
+
+    Returns:
+        bool: True if the load per CPU is above threshold
+    """
+    if not hasattr(os, "getloadavg"):
+        return False
+    try:
+        load = os.getloadavg()[0]
+    except OSError:
+        return False
+    return load / (os.cpu_count() or 1) > threshold
+
+
+def index_reachable(index_url: str = DEFAULT_INDEX_URL, timeout: float = 3.0) -> bool:
+    """Check cheaply (one TCP connect) whether the package index can be reached"""
+    parsed = urlparse(index_url)
+    if parsed.scheme == "file":
+        return os.path.exists(parsed.path)
+    host = parsed.hostname
+    if not host:
+        return False
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+class UpdateScheduler:
+    """Runs outdated checks for the watched interpreters on a background thread"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, cache: Optional[OutdatedCache] = None,
+                 on_result: Optional[Callable[[str, List[Dict], List[Dict]], None]] = None,
+                 on_failure: Optional[Callable[[str], None]] = None,
+                 index_url: Optional[str] = None, initial_delay: float = 60):
+        self.interval = interval
+        self.cache = cache or OutdatedCache()
+        self.on_result = on_result  # called with (python, packages, new packages) on the worker thread
+        self.on_failure = on_failure  # called with (python) when a check fails
+        if index_url is None:
+            from core.index_client import get_index_url
+            index_url = get_index_url()
+        self.index_url = index_url
+        self.initial_delay = initial_delay
+        self.interpreters: List[str] = [sys.executable]
+        self.failures = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._force = False
+        self._thread: Optional[threading.Thread] = None
+        self._rng = random.Random()
+
+    def set_interpreters(self, interpreters: List[str]):
+        """Choose the interpreters to check"""
+        self.interpreters = list(dict.fromkeys(interpreters))
+
+    def start(self):
+        """Start the background thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="update-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stop.set()
+        self._wake.set()
+
+    def request_check(self):
+        """Check now, regardless of schedule, load or previous failures"""
+        self._force = True
+        self._wake.set()
+
+    def _due_delay(self) -> float:
+        """Seconds until the oldest cached result is due again"""
+        oldest = None
+        for python in self.interpreters:
+            entry = self.cache.get(python)
+            if entry is None:
+                return 0
+            age = time.time() - entry.get("checked_at", 0)
+            oldest = age if oldest is None else max(oldest, age)
+        return max(0.0, self.interval - (oldest or 0))
+
+    def check_now(self, python_executable: str) -> Optional[List[Dict]]:
+        """
+        Check one interpreter and store the result
+
+        Returns:
+            list: Outdated packages, or None if the check failed
+        """
+        from core.update_manager import UpdateManager
+
+        success, packages = UpdateManager(python_executable).check_outdated_packages()
+        if not success:
+            if self.on_failure is not None:
+                try:
+                    self.on_failure(python_executable)
+                except Exception:
+                    pass
+            return None
+        new = self.cache.put(python_executable, packages)
+        if self.on_result is not None:
+            try:
+                self.on_result(python_executable, packages, new)
+            except Exception:
+                pass
+        return packages
+
+    def _run(self):
+        delay = max(self.initial_delay, self._due_delay())
+        while not self._stop.is_set():
+            self._wake.wait(delay)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+
+            forced, self._force = self._force, False
+            if not forced and machine_is_busy():
+                delay = BUSY_RETRY
+                continue
+
+            # A forced check still runs: pip may reach a mirror this probe cannot
+            if not forced and not index_reachable(self.index_url):
+                self.failures += 1
+                delay = next_delay(self.interval, self.failures, rng=self._rng)
+                continue
+
+            ok = True
+            for python in list(self.interpreters):
+                if self._stop.is_set():
+                    break
+                if self.check_now(python) is None:
+                    ok = False
+            self.failures = 0 if ok else self.failures + 1
+            delay = next_delay(self.interval, self.failures, rng=self._rng)
@@ -2,10 +2,12 @@
 
 import os
 import sys
-import subprocess
 import platform
 from pathlib import Path
 
+from core import tracing
+from core.command_runner import run_read_only
+
 
 class VirtualEnvManager:
     """Manages virtual environments"""
@@ -24,8 +26,13 @@ class VirtualEnvManager:
         os.makedirs(base, exist_ok=True)
         return base
 
-    def list_venvs(self, base_path=None):
-        """List all virtual environments in a directory"""
+    def list_venvs(self, base_path=None, jobs=1):
+        """List all virtual environments in a directory
+
+        Args:
+            base_path: Directory to search (defaults to ~/venvs)
+            jobs: Number of environments to inspect in parallel
+        """
         if base_path is None:
             base_path = self.get_default_venv_path()
 
@@ -34,13 +41,21 @@ class VirtualEnvManager:
         if not os.path.exists(base_path):
             return venvs
 
-        for item in os.listdir(base_path):
+        venv_paths = []
+        for item in sorted(os.listdir(base_path)):
             venv_path = os.path.join(base_path, item)
             if os.path.isdir(venv_path):
                 # Check if it's a valid venv
                 if self._is_valid_venv(venv_path):
-                    venv_info = self._get_venv_info(venv_path)
-                    venvs.append(venv_info)
+                    venv_paths.append(venv_path)
+
+        if jobs > 1 and len(venv_paths) > 1:
+            # Inspection is subprocess and disk bound, so threads parallelize it well
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                venvs = list(executor.map(self._get_venv_info, venv_paths))
+        else:
+            venvs = [self._get_venv_info(venv_path) for venv_path in venv_paths]
 
         return venvs
 
@@ -72,7 +87,7 @@ class VirtualEnvManager:
             else:
                 python_exe = os.path.join(venv_path, "bin", "python")
 
-            result = subprocess.run(
+            result = run_read_only(
                 [python_exe, "--version"],
                 capture_output=True,
                 text=True,
@@ -82,7 +97,7 @@ class VirtualEnvManager:
                 info["python_version"] = result.stdout.strip().replace("Python ", "")
 
             # Get package count
-            result = subprocess.run(
+            result = run_read_only(
                 [python_exe, "-m", "pip", "list"],
                 capture_output=True,
                 text=True,
@@ -95,13 +110,15 @@ class VirtualEnvManager:
 
             # Get size
             total_size = 0
-            for dirpath, dirnames, filenames in os.walk(venv_path):
-                for filename in filenames:
-                    filepath = os.path.join(dirpath, filename)
-                    try:
-                        total_size += os.path.getsize(filepath)
-                    except:
-                        pass
+            with tracing.span("venv.size_walk", tracing.FS, path=venv_path) as span:
+                for dirpath, dirnames, filenames in os.walk(venv_path):
+                    for filename in filenames:
+                        filepath = os.path.join(dirpath, filename)
+                        try:
+                            total_size += os.path.getsize(filepath)
+                        except:
+                            pass
+                span.set(bytes=total_size)
 
             # Convert to MB
             size_mb = total_size / (1024 * 1024)
@@ -127,7 +144,7 @@ class VirtualEnvManager:
             python_cmd = python_version if python_version else self.python_executable
 
             # Create venv
-            result = subprocess.run(
+            result = tracing.run(
                 [python_cmd, "-m", "venv", venv_path],
                 capture_output=True,
                 text=True,
@@ -172,12 +189,10 @@ class VirtualEnvManager:
             else:
                 pip_exe = os.path.join(venv_path, "bin", "pip")
 
-            result = subprocess.run(
-                [pip_exe, "install", package],
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
+            from core import wheelhouse
+
+            result = wheelhouse.run_pip_install([pip_exe, "install"], [package], timeout=300,
+                                                offline_first=wheelhouse.all_pinned([package]))
 
             return result.returncode == 0, result.stdout + result.stderr
 
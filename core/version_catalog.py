@@ -0,0 +1,226 @@
+"""Version Catalog - sorted, pre-parsed releases of a project
+
+A catalog holds a project's releases as packaging Version objects,
+parsed and sorted once per index page. Questions the UI asks repeatedly
+are answered with binary search:
+
+- latest()                 newest stable release (optionally for a Python version)
+- latest_matching(spec)    newest release satisfying a specifier
+- newer_than(version)      every release newer than the installed one
+
+Yanked releases (PEP 592) are left out unless pinned with '=='.
+Catalogs are memoized per index page, so they are rebuilt only when the
+index client refetches the page.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core import tracing
+
+
+class VersionCatalog:
+    """The releases of one project"""
+
+    def __init__(self, name: str, releases: Iterable[Tuple[str, bool, Iterable[Optional[str]]]]):
+        """
+        Args:
+            name: Project name
+            releases: (version string, yanked, Requires-Python values of its files)
+        """
+        from packaging.version import InvalidVersion, Version
+
+        self.name = name
+        entries = []
+        self._requires_python: Dict[str, List[Optional[str]]] = {}
+        for version, yanked, requires_python in releases:
+            try:
+                parsed = Version(version)
+            except InvalidVersion:
+                continue
+            entries.append((parsed, version, yanked))
+            self._requires_python[version] = list(requires_python) or [None]
+        entries.sort(key=lambda entry: entry[0])
+
+        # Ascending, index-aligned: Version objects and their original spelling
+        self._all = [v for v, _, yanked in entries if not yanked]
+        self._all_text = [text for _, text, yanked in entries if not yanked]
+        self._stable = [v for v in self._all if not v.is_prerelease]
+        self._stable_text = [text for v, text in zip(self._all, self._all_text) if not v.is_prerelease]
+        self._yanked = {v: text for v, text, yanked in entries if yanked}
+        self._specifier_cache: Dict[str, object] = {}
+
+    @classmethod
+    def from_project_page(cls, page) -> "VersionCatalog":
+        """Build a catalog from an index_client.ProjectPage"""
+        releases = []
+        for version, files in page.releases().items():
+            available = [f for f in files if not f.yanked]
+            releases.append((version, not available, [f.requires_python for f in available]))
+        return cls(page.name, releases)
+
+    def __len__(self):
+        return len(self._all)
+
+    def _lists(self, include_prereleases: bool):
+        if include_prereleases:
+            return self._all, self._all_text
+        return self._stable, self._stable_text
+
+    def versions(self, include_prereleases: bool = False, newest_first: bool = True) -> List[str]:
+        """Every (non-yanked) version"""
+        _, texts = self._lists(include_prereleases)
+        return texts[::-1] if newest_first else list(texts)
+
+    def _supports_python(self, version: str, python_version: Optional[str]) -> bool:
+        """Whether any file of a release accepts python_version"""
+        if not python_version:
+            return True
+        from packaging.specifiers import InvalidSpecifier, SpecifierSet
+
+        for requires_python in self._requires_python.get(version, [None]):
+            if not requires_python:
+                return True
+            specifier = self._specifier_cache.get(requires_python)
+            if specifier is None:
+                try:
+                    specifier = SpecifierSet(requires_python)
+                except InvalidSpecifier:
+                    return True
+                self._specifier_cache[requires_python] = specifier
+            if specifier.contains(python_version, prereleases=True):
+                return True
+        return False
+
+    def latest(self, include_prereleases: bool = False,
+               python_version: Optional[str] = None) -> Optional[str]:
+        """
+        Newest release
+
+        Args:
+            include_prereleases: Consider pre-releases too
+            python_version: Only releases installable on this Python (e.g. '3.11.7')
+        """
+        _, texts = self._lists(include_prereleases)
+        for text in reversed(texts):
+            if self._supports_python(text, python_version):
+                return text
+        return None
+
+    def latest_matching(self, specifier: str, include_prereleases: Optional[bool] = None,
+                        python_version: Optional[str] = None) -> Optional[str]:
+        """
+        Newest release satisfying a specifier (e.g. '>=2,<3')
+
+        Bounds from <, <=, >, >= and == narrow the range by binary search;
+        the remaining candidates are checked newest first.
+
+        Args:
+            specifier: PEP 440 specifier set
+            include_prereleases: None follows PEP 440 (pre-releases only if the
+                                 specifier names one or nothing else matches)
+            python_version: Only releases installable on this Python
+        """
+        from packaging.specifiers import SpecifierSet
+        from packaging.version import InvalidVersion, Version
+
+        spec = SpecifierSet(specifier)
+        allow_pre = spec.prereleases if include_prereleases is None else include_prereleases
+        versions, texts = self._lists(bool(allow_pre))
+
+        low, high = 0, len(versions)
+        for item in spec:
+            if "*" in item.version:
+                continue
+            try:
+                bound = Version(item.version)
+            except InvalidVersion:
+                continue
+            if item.operator == "<":
+                high = min(high, bisect_left(versions, bound))
+            elif item.operator == "<=":
+                high = min(high, bisect_right(versions, bound))
+            elif item.operator == ">":
+                low = max(low, bisect_right(versions, bound))
+            elif item.operator in (">=", "=="):
+                low = max(low, bisect_left(versions, bound))
+
+        for i in range(high - 1, low - 1, -1):
+            if spec.contains(versions[i], prereleases=True) and self._supports_python(texts[i], python_version):
+                return texts[i]
+
+        # An exact pin may select a yanked release
+        if any(item.operator in ("==", "===") and "*" not in item.version for item in spec):
+            for version, text in sorted(self._yanked.items(), reverse=True):
+                if spec.contains(version, prereleases=True):
+                    return text
+
+        if include_prereleases is None and not allow_pre:
+            return self.latest_matching(specifier, True, python_version)
+        return None
+
+    def newer_than(self, version: str, include_prereleases: bool = False) -> List[str]:
+        """
+        Releases newer than version, newest first
+
+        Args:
+            version: e.g. the installed version
+            include_prereleases: Include pre-releases
+        """
+        from packaging.version import InvalidVersion, Version
+
+        versions, texts = self._lists(include_prereleases)
+        try:
+            start = bisect_right(versions, Version(version))
+        except InvalidVersion:
+            return []
+        return texts[start:][::-1]
+
+    def compare(self, a: str, b: str) -> int:
+        """-1, 0 or 1 as version a is older than, equal to or newer than b"""
+        from packaging.version import InvalidVersion, Version
+
+        try:
+            va, vb = Version(a), Version(b)
+        except InvalidVersion:
+            return 0
+        return (va > vb) - (va < vb)
+
+
+_catalogs: Dict[Tuple[str, str], Tuple[object, VersionCatalog]] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_version_catalog(name: str, refresh: bool = False, client=None) -> VersionCatalog:
+    """
+    Get the catalog of a project on the configured index
+
+    Args:
+        name: Project name
+        refresh: Revalidate the index page first
+        client: IndexClient (defaults to the shared one)
+
+    Returns:
+        VersionCatalog: The catalog (rebuilt only when the page changed)
+
+    Raises:
+        index_client.IndexClientError: The index could not be queried
+    """
+    from core.index_client import get_index_client
+    from core.installed_index import canonical_name
+
+    client = client or get_index_client()
+    page = client.get_project(name, refresh=refresh)
+    key = (client.index_url, canonical_name(name))
+    with _catalogs_lock:
+        cached = _catalogs.get(key)
+        if cached is not None and cached[0] is page:
+            tracing.record_cache("version_catalog", True)
+            return cached[1]
+    tracing.record_cache("version_catalog", False)
+    with tracing.span("version_catalog.build", tracing.PARSE, project=name):
+        catalog = VersionCatalog.from_project_page(page)
+    with _catalogs_lock:
+        _catalogs[key] = (page, catalog)
+    return catalog
@@ -0,0 +1,488 @@
+"""Wheelhouse - local store of built wheels shared by every install path
+
+Wheels are kept in one flat directory (what pip's --find-links expects);
+the wheel file name already encodes name, version and tags. A small JSON
+index next to them records sizes and last use for LRU eviction.
+
+Every pip install the app runs (PackageInstaller, UpdateManager,
+VirtualEnvManager, requirements sync) gets '--find-links <wheelhouse>'
+via install_args(), so wheels prefetched once are reused by every
+interpreter and venv whose tags they match instead of being downloaded or
+rebuilt. Plain installs go through run_pip_install(), which tries the
+wheelhouse alone first.
+
+Location: <cache dir>/wheelhouse, or $LIBRARY_MANAGER_WHEELHOUSE.
+Set LIBRARY_MANAGER_WHEELHOUSE=off to disable the injection.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from core import tracing
+
+WHEELHOUSE_ENV = "LIBRARY_MANAGER_WHEELHOUSE"
+INDEX_NAME = "wheelhouse-index.json"
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2 GB
+_ARTIFACT_SUFFIXES = (".whl", ".tar.gz", ".zip", ".tar.bz2", ".tgz")
+
+
+def sha256_file(path: str) -> str:
+    """Get the sha256 of a file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def artifact_identity(filename: str) -> Optional[Tuple[str, str]]:
+    """
+    Get (canonical name, version) of a wheel or sdist file name
+
+    Returns:
+        tuple: (name, version), or None if the name is not recognised
+    """
+    from core.installed_index import canonical_name
+
+    if filename.endswith(".whl"):
+        parts = filename[:-4].split("-")
+        if len(parts) < 5:
+            return None
+        return canonical_name(parts[0]), parts[1]
+
+    for suffix in _ARTIFACT_SUFFIXES[1:]:
+        if filename.endswith(suffix):
+            name, sep, version = filename[:-len(suffix)].rpartition("-")
+            if not sep:
+                return None
+            return canonical_name(name), version
+    return None
+
+
+def wheel_tags(filename: str) -> List[str]:
+    """Expand the compressed tag set of a wheel file name ('py2.py3-none-any')"""
+    if not filename.endswith(".whl"):
+        return []
+    pythons, abis, platforms = filename[:-4].split("-")[-3:]
+    return [f"{py}-{abi}-{plat}" for py in pythons.split(".")
+            for abi in abis.split(".") for plat in platforms.split(".")]
+
+
+def scan_wheelhouse(wheelhouse: str) -> Dict[Tuple[str, str], List[str]]:
+    """Map (canonical name, version) to artifact file names in a directory"""
+    artifacts: Dict[Tuple[str, str], List[str]] = {}
+    try:
+        entries = os.listdir(wheelhouse)
+    except OSError:
+        return artifacts
+    for filename in entries:
+        identity = artifact_identity(filename)
+        if identity is not None:
+            artifacts.setdefault(identity, []).append(filename)
+    return artifacts
+
+
+def get_wheelhouse_path() -> Optional[str]:
+    """Get the configured wheelhouse directory (None if disabled)"""
+    configured = os.environ.get(WHEELHOUSE_ENV)
+    if configured is not None:
+        if configured.strip().lower() in ("", "0", "off", "none", "false"):
+            return None
+        return os.path.abspath(os.path.expanduser(configured))
+    from core.app_paths import get_cache_dir
+    return get_cache_dir("wheelhouse")
+
+
+class Wheelhouse:
+    """A size-bounded directory of wheels"""
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path or get_wheelhouse_path()
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, Dict]] = None
+
+    # -- index ---------------------------------------------------------
+
+    def _index_path(self) -> str:
+        return os.path.join(self.path, INDEX_NAME)
+
+    def _load_index(self) -> Dict[str, Dict]:
+        """Load the usage index, reconciled with the directory contents"""
+        if self._index is not None:
+            return self._index
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+
+        present = {}
+        with tracing.span("wheelhouse.scan", tracing.FS, path=self.path) as span:
+            try:
+                entries = list(os.scandir(self.path))
+            except OSError:
+                entries = []
+            for entry in entries:
+                if not entry.name.endswith(_ARTIFACT_SUFFIXES) or not entry.is_file():
+                    continue
+                record = index.get(entry.name) or {}
+                stat = entry.stat()
+                present[entry.name] = {
+                    "size": stat.st_size,
+                    "last_used": record.get("last_used", stat.st_mtime),
+                }
+            span.set(artifacts=len(present))
+        self._index = present
+        return present
+
+    def _save_index(self):
+        """Write the usage index (atomically)"""
+        if self._index is None:
+            return
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            tmp_path = self._index_path() + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._index, f)
+            os.replace(tmp_path, self._index_path())
+        except OSError:
+            pass
+
+    def refresh(self):
+        """Re-read the directory (after files were added externally)"""
+        with self._lock:
+            self._index = None
+            self._load_index()
+
+    # -- queries -------------------------------------------------------
+
+    def artifacts(self) -> List[Dict]:
+        """
+        List stored artifacts
+
+        Returns:
+            list: Dicts with 'filename', 'name', 'version', 'tags', 'size', 'last_used'
+        """
+        with self._lock:
+            index = dict(self._load_index())
+        result = []
+        for filename, record in sorted(index.items()):
+            identity = artifact_identity(filename)
+            if identity is None:
+                continue
+            result.append({
+                "filename": filename,
+                "name": identity[0],
+                "version": identity[1],
+                "tags": wheel_tags(filename),
+                "size": record["size"],
+                "last_used": record["last_used"],
+            })
+        return result
+
+    def total_size(self) -> int:
+        """Total size of stored artifacts in bytes"""
+        with self._lock:
+            return sum(record["size"] for record in self._load_index().values())
+
+    def find(self, name: str, version: Optional[str] = None,
+             tags: Optional[List[str]] = None) -> List[str]:
+        """
+        Find stored artifacts
+
+        Args:
+            name: Project name (any spelling)
+            version: Exact version, or None for any
+            tags: Accepted wheel tags (None accepts any; sdists always match)
+
+        Returns:
+            list: Matching file names
+        """
+        from core.installed_index import canonical_name
+
+        key = canonical_name(name)
+        accepted = set(tags) if tags else None
+        with self._lock:
+            filenames = list(self._load_index())
+        matches = []
+        for filename in filenames:
+            identity = artifact_identity(filename)
+            if identity is None or identity[0] != key or (version and identity[1] != version):
+                continue
+            if accepted is not None and filename.endswith(".whl") and \
+                    not accepted.intersection(wheel_tags(filename)):
+                continue
+            matches.append(filename)
+        return sorted(matches)
+
+    def touch(self, filenames: List[str]):
+        """Mark artifacts as used now"""
+        now = time.time()
+        with self._lock:
+            index = self._load_index()
+            changed = False
+            for filename in filenames:
+                if filename in index:
+                    index[filename]["last_used"] = now
+                    changed = True
+            if changed:
+                self._save_index()
+
+    def record_pip_output(self, output: str):
+        """Mark the wheelhouse files pip reports having used as recently used"""
+        prefix = os.path.normcase(self.path)
+        used = []
+        for line in output.splitlines():
+            line = line.strip()
+            if not line.startswith("Processing "):
+                continue
+            path = line[len("Processing "):].split(" ")[0]
+            if os.path.normcase(os.path.abspath(path)).startswith(prefix):
+                used.append(os.path.basename(path))
+        if used:
+            self.touch(used)
+
+    def install_args(self) -> List[str]:
+        """pip install arguments that make pip look in the wheelhouse"""
+        if not self.path or not os.path.isdir(self.path):
+            return []
+        return ["--find-links", self.path]
+
+    # -- maintenance ---------------------------------------------------
+
+    def add(self, source_path: str) -> str:
+        """
+        Move an artifact into the wheelhouse
+
+        The file is moved with os.replace so concurrent readers never see a
+        partial wheel.
+
+        Returns:
+            str: The stored file name
+        """
+        filename = os.path.basename(source_path)
+        os.makedirs(self.path, exist_ok=True)
+        target = os.path.join(self.path, filename)
+        try:
+            os.replace(source_path, target)
+        except OSError:
+            # Different filesystem: copy next to the target first, then rename
+            tmp_target = target + ".part"
+            shutil.copyfile(source_path, tmp_target)
+            os.replace(tmp_target, target)
+        with self._lock:
+            index = self._load_index()
+            index[filename] = {"size": os.path.getsize(target), "last_used": time.time()}
+            self._save_index()
+        return filename
+
+    def evict(self, max_bytes: Optional[int] = None) -> List[str]:
+        """
+        Delete least recently used artifacts until the wheelhouse fits the size limit
+
+        Args:
+            max_bytes: Size limit (defaults to the wheelhouse's max_bytes)
+
+        Returns:
+            list: Deleted file names
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        removed = []
+        with self._lock:
+            index = self._load_index()
+            total = sum(record["size"] for record in index.values())
+            for filename, record in sorted(index.items(), key=lambda item: item[1]["last_used"]):
+                if total <= limit:
+                    break
+                try:
+                    os.remove(os.path.join(self.path, filename))
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    continue
+                total -= record["size"]
+                del index[filename]
+                removed.append(filename)
+            if removed:
+                self._save_index()
+        return removed
+
+    def _build_one(self, requirement: str, python_executable: str,
+                   extra_args: List[str], timeout: int) -> Tuple[str, bool, List[str], str]:
+        """Download or build the wheels of one requirement into a private temp dir"""
+        os.makedirs(self.path, exist_ok=True)
+        work_dir = tempfile.mkdtemp(prefix=".prefetch-", dir=self.path)
+        try:
+            result = tracing.run(
+                [python_executable, '-m', 'pip', 'wheel', '--wheel-dir', work_dir,
+                 '--find-links', self.path] + list(extra_args) + [requirement],
+                capture_output=True,
+                text=True,
+                timeout=timeout
+            )
+            if result.returncode != 0:
+                return requirement, False, [], result.stderr or result.stdout
+
+            added = []
+            for filename in os.listdir(work_dir):
+                if os.path.exists(os.path.join(self.path, filename)):
+                    continue  # already stored (pip copied it from --find-links)
+                added.append(self.add(os.path.join(work_dir, filename)))
+            return requirement, True, added, ""
+        except subprocess.TimeoutExpired:
+            return requirement, False, [], "timed out"
+        except Exception as e:
+            return requirement, False, [], str(e)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def prefetch(self, requirements: List[str], python_executable: Optional[str] = None,
+                 jobs: int = 4, with_deps: bool = True, extra_args: Optional[List[str]] = None,
+                 timeout: int = 1800) -> List[Dict]:
+        """
+        Download or build wheels ahead of time
+
+        Each requirement runs its own 'pip wheel' in a private directory, so
+        several can run in parallel; finished wheels are moved into the
+        wheelhouse atomically. Pinned requirements already stored are skipped.
+
+        Args:
+            requirements: Requirement specifiers
+            python_executable: Interpreter whose tags the wheels are built for
+            jobs: Parallel pip processes
+            with_deps: Also fetch dependencies
+            extra_args: Additional 'pip wheel' arguments
+            timeout: Seconds per requirement
+
+        Returns:
+            list: Per-requirement results ('requirement', 'success', 'added', 'error')
+        """
+        python_executable = python_executable or sys.executable
+        args = list(extra_args or [])
+        if not with_deps:
+            args.append("--no-deps")
+
+        pending = []
+        results = []
+        for requirement in requirements:
+            name, sep, version = requirement.partition("==")
+            if sep and not with_deps and self.find(name.strip(), version.strip()):
+                results.append({"requirement": requirement, "success": True, "added": [], "error": ""})
+            else:
+                pending.append(requirement)
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            for requirement, success, added, error in pool.map(
+                    lambda req: self._build_one(req, python_executable, args, timeout), pending):
+                results.append({"requirement": requirement, "success": success,
+                                "added": added, "error": error})
+
+        self.evict()
+        return results
+
+
+_default_wheelhouse: Optional[Wheelhouse] = None
+
+
+def get_wheelhouse() -> Optional[Wheelhouse]:
+    """Get the shared wheelhouse (None if disabled)"""
+    global _default_wheelhouse
+    path = get_wheelhouse_path()
+    if path is None:
+        return None
+    if _default_wheelhouse is None or _default_wheelhouse.path != path:
+        _default_wheelhouse = Wheelhouse(path)
+    return _default_wheelhouse
+
+
+def install_args() -> List[str]:
+    """pip install arguments for the shared wheelhouse ([] if disabled or empty)"""
+    wheelhouse = get_wheelhouse()
+    return wheelhouse.install_args() if wheelhouse is not None else []
+
+
+def all_pinned(args: List[str]) -> bool:
+    """
+    Check whether every requirement in pip install arguments is pinned
+
+    Args:
+        args: Options and requirement specifiers
+
+    Returns:
+        bool: True if there is at least one requirement and each is
+              'name==version' (requirement files and editables never count)
+    """
+    from packaging.requirements import InvalidRequirement, Requirement
+
+    pinned = False
+    for arg in args:
+        if arg.startswith("-"):
+            if arg.split("=", 1)[0] in ("-r", "--requirement", "-e", "--editable"):
+                return False
+            continue
+        try:
+            req = Requirement(arg)
+        except InvalidRequirement:
+            return False
+        specifiers = list(req.specifier)
+        if req.url or len(specifiers) != 1 or specifiers[0].operator != "==" or "*" in specifiers[0].version:
+            return False
+        pinned = True
+    return pinned
+
+
+def run_pip_install(command: List[str], args: List[str], timeout: int = 600,
+                    offline_first: bool = False) -> subprocess.CompletedProcess:
+    """
+    Run 'pip install' preferring the wheelhouse
+
+    pip ranks an index link and a --find-links file of the same version
+    equally and may download anyway, so with offline_first and a wheelhouse
+    that has content the install is first attempted with --no-index. If
+    something is not in the wheelhouse that attempt fails quickly and the
+    install is repeated with the index enabled (and the wheelhouse as an
+    extra source).
+
+    Use offline_first only for pinned requirements (see all_pinned): for
+    anything else the wheelhouse may satisfy the install with an older
+    release than the index would.
+
+    Args:
+        command: pip invocation up to and including 'install'
+                 (e.g. [python, '-m', 'pip', 'install'])
+        args: Options and requirement specifiers
+        timeout: Seconds per attempt
+        offline_first: Try the wheelhouse alone first
+
+    Returns:
+        subprocess.CompletedProcess: The last attempt
+    """
+    links = install_args()
+    wheelhouse = get_wheelhouse()
+    if offline_first and links and "--no-index" not in args and wheelhouse.artifacts():
+        result = tracing.run(command + ["--no-index"] + links + list(args),
+                             capture_output=True, text=True, timeout=timeout)
+        if result.returncode == 0:
+            record_pip_output(result.stdout)
+            return result
+
+    result = tracing.run(command + links + list(args), capture_output=True, text=True, timeout=timeout)
+    record_pip_output(result.stdout)
+    return result
+
+
+def record_pip_output(output: str):
+    """Update wheel usage from the output of a pip install"""
+    wheelhouse = get_wheelhouse()
+    if wheelhouse is not None and output:
+        wheelhouse.record_pip_output(output)
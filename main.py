@@ -2,16 +2,31 @@
 """
 Library Manager - Cross-Platform Package Installation Tool
 Main entry point for the application
+
+Options:
+    --startup-report   Print an import-time and time-to-first-paint breakdown
 """
 
+import os
 import sys
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import Qt
-from ui.main_window import MainWindow
+from core.startup_profile import StartupTimer
+
+startup_timer = StartupTimer()
 
 
 def main():
     """Initialize and run the application"""
+    if "--startup-report" in sys.argv:
+        from core.startup_profile import run_startup_report
+        print(run_startup_report(os.path.abspath(__file__)))
+        return
+
+    startup_exit = "--startup-exit" in sys.argv
+
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import Qt
+    startup_timer.mark("PyQt6 imported")
+
     # Enable high DPI scaling
     QApplication.setHighDpiScaleFactorRoundingPolicy(
         Qt.HighDpiScaleFactorRoundingPolicy.PassThrough
@@ -21,9 +36,22 @@ def main():
     app.setApplicationName("Library Manager")
     app.setOrganizationName("DevTools")
     app.setQuitOnLastWindowClosed(False)  # Keep app running when window is closed
+    startup_timer.mark("QApplication created")
+
+    from ui.main_window import MainWindow
+    startup_timer.mark("ui.main_window imported")
 
     # Create and show main window
     window = MainWindow(app)
+    startup_timer.mark("MainWindow constructed")
+
+    def on_first_paint():
+        startup_timer.mark("first paint")
+        if startup_exit:
+            startup_timer.emit()
+            app.quit()
+
+    window.first_painted.connect(on_first_paint)
     window.show()
 
     sys.exit(app.exec())
@@ -0,0 +1,88 @@
+"""Shared fixtures: synthetic environments behind a fake interpreter
+
+Environments are plain site-packages directories of .dist-info entries,
+reached through the benchmark interpreter shims (benchmarks/fake_pip.py),
+so the engines under test read real metadata without touching the
+interpreter running the tests.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks import synthetic  # noqa: E402
+
+
+def write_dist(site, name, version, requires=(), extras=()):
+    """Create a .dist-info directory for one distribution"""
+    module = name.replace("-", "_")
+    info_dir = os.path.join(site, f"{module}-{version}.dist-info")
+    os.makedirs(info_dir, exist_ok=True)
+    lines = ["Metadata-Version: 2.1", f"Name: {name}", f"Version: {version}"]
+    lines += [f"Provides-Extra: {extra}" for extra in extras]
+    lines += [f"Requires-Dist: {requirement}" for requirement in requires]
+    with open(os.path.join(info_dir, "METADATA"), "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    with open(os.path.join(info_dir, "RECORD"), "w", encoding="utf-8") as f:
+        f.write(f"{module}-{version}.dist-info/METADATA,,\n")
+    return info_dir
+
+
+class Environment:
+    """A synthetic site-packages and the interpreter shim bound to it"""
+
+    def __init__(self, root):
+        self.site = os.path.join(root, "site-packages")
+        os.makedirs(self.site)
+        self.python = synthetic.make_interpreter(os.path.join(root, "bin"), self.site)
+
+    def add(self, name, version, requires=(), extras=()):
+        """Install a distribution (bumps the directory mtime like pip does)"""
+        write_dist(self.site, name, version, requires, extras)
+        os.utime(self.site, ns=(os.stat(self.site).st_mtime_ns + 1000,) * 2)
+
+    def remove(self, name):
+        """Uninstall a distribution"""
+        import shutil
+
+        prefix = name.replace("-", "_") + "-"
+        for entry in os.listdir(self.site):
+            if entry.startswith(prefix) and entry.endswith(".dist-info"):
+                shutil.rmtree(os.path.join(self.site, entry))
+        os.utime(self.site, ns=(os.stat(self.site).st_mtime_ns + 1000,) * 2)
+
+    def index(self):
+        """Fresh InstalledIndex of the environment"""
+        from core.installed_index import get_installed_index
+
+        return get_installed_index(self.python, refresh=True)
+
+
+@pytest.fixture(autouse=True)
+def app_home(tmp_path, monkeypatch):
+    """Keep config and cache files of the code under test in tmp_path"""
+    home = tmp_path / "app-home"
+    monkeypatch.setenv("LIBRARY_MANAGER_HOME", str(home))
+    monkeypatch.setenv("LIBRARY_MANAGER_WHEELHOUSE", "off")
+    return home
+
+
+@pytest.fixture
+def make_env(tmp_path):
+    """Factory for synthetic environments: make_env({'name': ('1.0', [requires])})"""
+    counter = [0]
+
+    def factory(dists=None):
+        counter[0] += 1
+        env = Environment(str(tmp_path / f"env-{counter[0]}"))
+        for name, spec in (dists or {}).items():
+            version, requires = spec if isinstance(spec, tuple) else (spec, [])
+            env.add(name, version, requires)
+        return env
+
+    return factory
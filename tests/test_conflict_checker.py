@@ -0,0 +1,65 @@
+"""Broken-requirement detection, incremental and full"""
+
+from core.conflict_checker import MISSING, VERSION, ConflictChecker
+
+DISTS = {
+    "app": ("1.0", ["lib>=2", "helper"]),
+    "lib": "2.1",
+    "helper": ("1.0", ['legacy ; python_version < "3"']),
+    "other": ("1.0", ["lib<3"]),
+}
+
+
+def _described(conflicts):
+    return [(c.kind, c.package, c.dependency) for c in conflicts]
+
+
+def test_clean_environment(make_env):
+    env = make_env(DISTS)
+    env.index()
+    assert ConflictChecker(env.python).check() == []
+
+
+def test_missing_and_version_conflicts(make_env):
+    env = make_env(dict(DISTS, lib="1.5"))
+    env.remove("helper")
+    env.index()
+    conflicts = ConflictChecker(env.python).check()
+    assert _described(conflicts) == [(VERSION, "app", "lib"), (MISSING, "app", "helper")]
+    assert conflicts[0].describe() == "app 1.0 has requirement lib>=2, but you have lib 1.5."
+
+
+def test_incremental_check_matches_full_check(make_env):
+    env = make_env(DISTS)
+    env.index()
+    checker = ConflictChecker(env.python)
+    assert checker.check() == []
+
+    # Downgrade lib below app's minimum, then upgrade it past other's maximum
+    env.remove("lib")
+    env.add("lib", "1.0")
+    env.index()
+    incremental = checker.check()
+    assert _described(incremental) == [(VERSION, "app", "lib")]
+    assert checker.last_checked_edges < 4  # only edges touching lib
+    assert _described(ConflictChecker(env.python).check(full=True)) == _described(incremental)
+
+    env.remove("lib")
+    env.add("lib", "3.0")
+    env.index()
+    assert _described(checker.check()) == [(VERSION, "other", "lib")]
+
+    env.remove("other")
+    env.index()
+    assert checker.check() == []
+    assert _described(checker.check(full=True)) == []
+
+
+def test_new_distribution_with_broken_requirement(make_env):
+    env = make_env(DISTS)
+    env.index()
+    checker = ConflictChecker(env.python)
+    checker.check()
+    env.add("plugin", "0.1", ["app>=2"])
+    env.index()
+    assert _described(checker.check()) == [(VERSION, "plugin", "app")]
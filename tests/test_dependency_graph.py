@@ -0,0 +1,89 @@
+"""Dependency graph, removal impact and the cleanup plan built on it"""
+
+from core.cleanup_manager import CleanupManager, RequestedMarks, app_requirement_keys
+from core.dependency_graph import DependencyGraph, get_dependency_graph
+from core.installed_index import get_marker_environment
+
+# web -> requests -> (urllib3, idna); cli -> (click, idna); tool -> click
+DISTS = {
+    "web": ("1.0", ["requests>=2"]),
+    "requests": ("2.31.0", ["urllib3<3", "idna>=2.5", 'brotli ; extra == "brotli"']),
+    "urllib3": "2.2.3",
+    "idna": "3.7",
+    "cli": ("1.0", ["click", "idna"]),
+    "click": "8.1.7",
+    "tool": ("0.1", ["click", "missing-dep"]),
+    "pip": "24.0",
+}
+
+
+def _graph(env):
+    return DependencyGraph.from_index(env.index(), get_marker_environment(env.python))
+
+
+def test_edges_and_missing_nodes(make_env):
+    graph = _graph(make_env(DISTS))
+    assert graph.dependencies("web", transitive=True) == ["idna", "requests", "urllib3"]
+    assert graph.dependents("idna") == ["cli", "requests"]
+    assert graph.reverse_closure(["urllib3"]) == ["requests", "web"]
+    assert "missing-dep" in graph and not graph.is_installed("missing-dep")
+    assert "brotli" not in graph  # behind an extra nobody requested
+
+
+def test_removal_impact_orphans_and_shared_dependencies(make_env):
+    impact = _graph(make_env(DISTS)).removal_impact(["web"])
+    assert impact.removed == ["web"]
+    assert impact.is_safe
+    # idna is still needed by cli, so only urllib3 and requests are left behind
+    assert impact.orphans == ["requests", "urllib3"]
+    assert impact.safe_to_remove == ["web", "requests", "urllib3"]
+
+
+def test_removal_impact_reports_what_breaks(make_env):
+    impact = _graph(make_env(DISTS)).removal_impact(["click"])
+    assert impact.blocked == ["click"]
+    assert impact.direct_dependents == ["cli", "tool"]
+    assert impact.affected == ["cli", "tool"]
+    assert impact.orphans == []
+
+
+def test_removal_impact_keep(make_env):
+    impact = _graph(make_env(DISTS)).removal_impact(["web"], keep=["urllib3"])
+    assert impact.orphans == ["requests"]
+
+
+def test_graph_cache_follows_environment_changes(make_env):
+    env = make_env(DISTS)
+    env.index()
+    first = get_dependency_graph(env.python)
+    assert get_dependency_graph(env.python) is first
+    env.remove("tool")
+    env.index()
+    assert "tool" not in get_dependency_graph(env.python)
+
+
+def test_cleanup_plan_from_requested_roots(make_env, tmp_path):
+    env = make_env(DISTS)
+    manager = CleanupManager(env.python, RequestedMarks(str(tmp_path / "marks.json")))
+    env.index()
+    assert manager.plan().is_empty  # nothing recorded yet: suggest nothing
+
+    manager.mark_requested(["cli", "tool"])
+    plan = manager.plan()
+    assert sorted(plan.names()) == ["requests", "urllib3", "web"]
+
+
+def test_cleanup_keeps_extras_of_roots(make_env, tmp_path):
+    env = make_env(dict(DISTS, brotli="1.1.0"))
+    manager = CleanupManager(env.python, RequestedMarks(str(tmp_path / "marks.json")))
+    manager.mark_requested(["web", "cli", "tool", "requests[brotli]"])
+    env.index()
+    assert manager.plan().names() == []
+
+
+def test_app_requirements_only_protect_the_app_interpreter(make_env):
+    import sys
+
+    env = make_env()
+    assert app_requirement_keys(env.python) == set()
+    assert "packaging" in app_requirement_keys(sys.executable)
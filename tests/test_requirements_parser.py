@@ -0,0 +1,107 @@
+"""Requirements file parsing: options, includes and edge cases pip accepts"""
+
+from core.requirements_parser import parse_requirement_line, parse_requirements, parse_requirements_text
+
+
+def test_specifiers_extras_and_markers():
+    result = parse_requirements_text('Requests[socks]>=2.28,<3 ; python_version >= "3.8"\n')
+    assert not result.errors
+    (req,) = result.requirements
+    assert req.name == "Requests"
+    assert req.key == "requests"
+    assert req.extras == frozenset({"socks"})
+    assert str(req.specifier) == "<3,>=2.28"
+    assert str(req.marker) == 'python_version >= "3.8"'
+
+
+def test_hash_option_after_space_or_tab():
+    result = parse_requirements_text("requests==2.31.0\t--hash=sha256:aaaa\n"
+                                     "six==1.16.0  --hash=sha256:bbbb --hash=sha256:cccc\n")
+    assert not result.errors
+    assert [req.hashes for req in result] == [["sha256:aaaa"], ["sha256:bbbb", "sha256:cccc"]]
+    assert result.requirements[0].pinned_version == "2.31.0"
+
+
+def test_comments_and_line_continuations():
+    text = ("# header\n"
+            "requests==2.31.0 \\\n"
+            "    --hash=sha256:aaaa  # trailing comment\n"
+            "\n"
+            "six  # another\n")
+    result = parse_requirements_text(text)
+    assert not result.errors
+    assert result.names() == ["requests", "six"]
+    assert result.requirements[0].hashes == ["sha256:aaaa"]
+    assert result.requirements[1].line_number == 5
+
+
+def test_environment_variables(monkeypatch):
+    monkeypatch.setenv("PKG_VERSION", "1.2.3")
+    result = parse_requirements_text("demo==${PKG_VERSION}\nother==${UNSET_VARIABLE_X}\n")
+    assert result.requirements[0].pinned_version == "1.2.3"
+    assert result.errors  # unknown variables are left as-is and do not parse
+
+
+def test_index_options():
+    result = parse_requirements_text("-i https://mirror.example/simple\n"
+                                     "--extra-index-url=https://extra.example/simple\n"
+                                     "-f ./wheels\n--pre\n--no-index\nsix\n")
+    assert result.index_url == "https://mirror.example/simple"
+    assert result.extra_index_urls == ["https://extra.example/simple"]
+    assert result.find_links == ["./wheels"]
+    assert result.pre and result.no_index
+
+
+def test_urls_paths_and_editables():
+    result = parse_requirements_text("https://example.com/pkgs/demo-1.0-py3-none-any.whl\n"
+                                     "git+https://example.com/repo.git#egg=tool\n"
+                                     "-e ./local/project\n"
+                                     "./plain/dir\n"
+                                     "name @ https://example.com/name-2.0.tar.gz\n")
+    assert not result.errors
+    demo, tool, editable, plain, named = result.requirements
+    assert demo.name == "demo"
+    assert tool.name == "tool"
+    assert editable.editable and editable.url == "./local/project" and editable.key is None
+    assert plain.key is None
+    assert named.name == "name" and named.url == "https://example.com/name-2.0.tar.gz"
+
+
+def test_invalid_line_reports_file_and_line():
+    result = parse_requirements_text("six\nnot a requirement!!\n", source="reqs.txt")
+    assert result.names() == ["six"]
+    assert result.format_errors()[0].startswith("reqs.txt:2:")
+
+
+def test_includes_constraints_and_cycles(tmp_path):
+    (tmp_path / "base.txt").write_text("six\n-r extra.txt\n-c constraints.txt\n")
+    (tmp_path / "extra.txt").write_text("requests\n-r base.txt\n")
+    (tmp_path / "constraints.txt").write_text("six<2\n")
+
+    result = parse_requirements(str(tmp_path / "base.txt"), use_cache=False)
+    assert result.names() == ["six", "requests"]
+    assert [(c.key, str(c.specifier), c.constraint) for c in result.constraints] == [("six", "<2", True)]
+    assert any("include cycle" in message for _, _, message in result.errors)
+
+
+def test_missing_include(tmp_path):
+    (tmp_path / "base.txt").write_text("-r nowhere.txt\n")
+    result = parse_requirements(str(tmp_path / "base.txt"), use_cache=False)
+    assert "cannot read" in result.errors[0][2]
+
+
+def test_cached_parse_sees_changes(tmp_path):
+    path = tmp_path / "reqs.txt"
+    path.write_text("six\n")
+    assert parse_requirements(str(path)).names() == ["six"]
+    path.write_text("six\nrequests\n")
+    assert parse_requirements(str(path)).names() == ["six", "requests"]
+
+
+def test_parse_requirement_line_rejects_garbage():
+    try:
+        parse_requirement_line("===")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
@@ -0,0 +1,123 @@
+"""Requirements diff and sync plans against synthetic environments"""
+
+from core.installed_index import get_marker_environment
+from core.installer import PackageInstaller
+from core.requirements_diff import MARKER_EXCLUDED, MISSING, SATISFIED, VERSION_MISMATCH, RequirementsDiffEngine
+from core.requirements_parser import parse_requirements_text
+from core.requirements_sync import execute_sync, plan_sync
+
+
+def _plan(env, text, remove_extra=False):
+    requirement_set = parse_requirements_text(text)
+    index = env.index()
+    diff = RequirementsDiffEngine(env.python).diff(requirement_set, index, include_extra=False)
+    return plan_sync(requirement_set, diff, index, remove_extra=remove_extra,
+                     environment=get_marker_environment(env.python))
+
+
+def _described(plan):
+    return [action.describe() for action in plan.actions]
+
+
+def test_diff_statuses(make_env):
+    env = make_env({"six": "1.16.0", "attrs": "22.1.0"})
+    diff = RequirementsDiffEngine(env.python).diff(
+        parse_requirements_text('six==1.16.0\nattrs>=23\nrequests\nidna ; python_version < "3"\n'), env.index())
+    statuses = {entry.key: entry.status for entry in diff.entries}
+    assert statuses == {"six": SATISFIED, "attrs": VERSION_MISMATCH, "requests": MISSING,
+                        "idna": MARKER_EXCLUDED}
+
+
+def test_diff_prefers_the_line_whose_marker_applies(make_env):
+    env = make_env({"six": "1.16.0"})
+    diff = RequirementsDiffEngine(env.python).diff(
+        parse_requirements_text('six==1.0 ; python_version < "3"\nsix==1.17.0 ; python_version >= "3"\n'),
+        env.index())
+    (entry,) = diff.entries
+    assert entry.status == VERSION_MISMATCH
+    assert str(entry.requirement.specifier) == "==1.17.0"
+
+
+def test_matching_environment_gives_empty_plan(make_env):
+    env = make_env({"six": "1.16.0"})
+    plan = _plan(env, "six==1.16.0\n", remove_extra=True)
+    assert plan.is_empty
+    assert plan.requested == ["six==1.16.0"]
+
+
+def test_install_upgrade_and_downgrade(make_env):
+    env = make_env({"six": "1.10.0", "attrs": "23.1.0"})
+    plan = _plan(env, "six>=1.16\nattrs<23\nrequests==2.31.0\n")
+    assert sorted(_described(plan)) == ["downgrade attrs 23.1.0 -> attrs<23",
+                                        "install requests==2.31.0",
+                                        "upgrade six 1.10.0 -> six>=1.16"]
+
+
+def test_removal_without_installs_is_planned_up_front(make_env):
+    env = make_env({"six": "1.16.0", "leftover": "1.0", "pip": "24.0",
+                    "app": ("1.0", ["helper"]), "helper": "1.0"})
+    plan = _plan(env, "six\napp\n", remove_extra=True)
+    assert not plan.removals_deferred
+    assert plan.remove_names() == ["leftover"]
+
+
+def test_removals_wait_for_missing_requirements(make_env):
+    # urllib3 and certifi are installed; requests, which needs them, is not
+    env = make_env({"urllib3": "2.2.3", "certifi": "2024.8.30", "leftover": "1.0"})
+    plan = _plan(env, "requests\n", remove_extra=True)
+    assert _described(plan) == ["install requests"]
+    assert plan.removals_deferred
+    assert plan.remove_names() == []
+
+
+def test_execute_sync_recomputes_removals_after_install(make_env, monkeypatch):
+    env = make_env({"urllib3": "2.2.3", "certifi": "2024.8.30", "leftover": "1.0"})
+    plan = _plan(env, "requests\n", remove_extra=True)
+
+    def fake_install(self, requirements, extra_args=None):
+        env.add("requests", "2.32.3", ["urllib3<3,>=1.21.1", "certifi>=2017.4.17"])
+        return True, "installed"
+
+    monkeypatch.setattr(PackageInstaller, "install_packages", fake_install)
+    result = execute_sync(plan, env.python)
+    assert result["success"]
+    assert result["installed"] == ["requests"]
+    assert result["removed"] == ["leftover"]
+
+
+def test_upgrade_with_a_new_dependency_keeps_it(make_env, monkeypatch):
+    env = make_env({"app": "1.0", "helper": "1.0"})
+    plan = _plan(env, "app==2.0\n", remove_extra=True)
+    assert plan.removals_deferred
+
+    def fake_install(self, requirements, extra_args=None):
+        env.remove("app")
+        env.add("app", "2.0", ["helper"])
+        return True, "installed"
+
+    monkeypatch.setattr(PackageInstaller, "install_packages", fake_install)
+    result = execute_sync(plan, env.python)
+    assert result["success"]
+    assert result["removed"] == []
+
+
+def test_failed_install_removes_nothing(make_env, monkeypatch):
+    env = make_env({"leftover": "1.0"})
+    plan = _plan(env, "requests\n", remove_extra=True)
+    monkeypatch.setattr(PackageInstaller, "install_packages", lambda self, reqs, extra_args=None: (False, "boom"))
+    result = execute_sync(plan, env.python)
+    assert not result["success"]
+    assert result["removed"] == []
+
+
+def test_unnamed_requirements_are_installed_and_protected(make_env):
+    env = make_env({"six": "1.16.0"})
+    plan = _plan(env, "six\n./proj\n-e ./editable\n", remove_extra=True)
+    assert plan.install_specs() == ["./proj", "-e", "./editable"]
+    assert plan.removals_deferred
+
+
+def test_index_options_are_passed_to_pip(make_env):
+    env = make_env()
+    plan = _plan(env, "--index-url https://mirror.example/simple\n--pre\nsix\n")
+    assert plan.install_args == ["--index-url", "https://mirror.example/simple", "--pre"]
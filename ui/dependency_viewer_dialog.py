@@ -1,40 +1,54 @@
 """Dependency Viewer Dialog"""
 
+import os
+
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
     QTreeWidget, QTreeWidgetItem, QLabel, QTextEdit,
-    QSplitter, QWidget, QProgressBar, QMessageBox
+    QSplitter, QWidget, QProgressBar, QMessageBox, QFileDialog
 )
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtGui import QFont, QColor
 from core.dependency_manager import DependencyManager
+from core.installed_index import canonical_name
+from core.package_details import get_local_details
 
 
-class DependencyWorker(QThread):
-    """Worker thread to build dependency tree"""
-    finished = pyqtSignal(object, str)
+class DependencyLevelWorker(QThread):
+    """Worker thread resolving a node and its children"""
+    finished = pyqtSignal(object, object, list, str)  # (tree item or None, node, child nodes, error)
 
-    def __init__(self, package_name):
+    def __init__(self, dep_manager, package_name, item=None):
         super().__init__()
+        self.dep_manager = dep_manager
         self.package_name = package_name
-        self.dep_manager = DependencyManager()
+        self.item = item
 
     def run(self):
         try:
-            tree = self.dep_manager.build_dependency_tree(self.package_name)
-            self.finished.emit(tree, "")
+            node, children = self.dep_manager.get_dependency_level(self.package_name)
+            self.finished.emit(self.item, node, children, "")
         except Exception as e:
-            self.finished.emit(None, str(e))
+            self.finished.emit(self.item, None, [], str(e))
 
 
 class DependencyViewerDialog(QDialog):
-    """Dialog for viewing package dependencies"""
+    """Dialog for viewing package dependencies
+
+    The tree is loaded lazily: a node's children are resolved when it is
+    expanded, the level below is prefetched in the background, and resolved
+    nodes are shared with every other dialog until the environment changes.
+    """
 
-    def __init__(self, package_name, parent=None):
+    LOADED_ROLE = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, package_name, parent=None, python_executable=None):
         super().__init__(parent)
         self.package_name = package_name
-        self.dep_manager = DependencyManager()
-        self.dependency_tree = None
+        self.python_executable = python_executable
+        self.dep_manager = DependencyManager(python_executable)
+        self.root_node = None
+        self._workers = set()
 
         self.setWindowTitle(f"Dependency Viewer - {package_name}")
         self.setMinimumSize(900, 700)
@@ -56,8 +70,8 @@ class DependencyViewerDialog(QDialog):
 
         # Info text
         info = QLabel(
-            "This shows all dependencies (packages required by this package) "
-            "up to 3 levels deep."
+            "This shows all dependencies (packages required by this package). "
+            "Expand a package to see what it requires in turn."
         )
         info.setStyleSheet("color: #7f8c8d; margin-bottom: 10px;")
         info.setWordWrap(True)
@@ -105,6 +119,7 @@ class DependencyViewerDialog(QDialog):
             }
         """)
         self.tree_widget.itemClicked.connect(self.on_item_clicked)
+        self.tree_widget.itemExpanded.connect(self.on_item_expanded)
         tree_layout.addWidget(self.tree_widget)
 
         tree_container.setLayout(tree_layout)
@@ -187,6 +202,12 @@ class DependencyViewerDialog(QDialog):
         self.export_btn.clicked.connect(self.export_tree)
         button_layout.addWidget(self.export_btn)
 
+        self.export_graph_btn = QPushButton("🕸 Export Graph...")
+        self.export_graph_btn.setEnabled(False)
+        self.export_graph_btn.setStyleSheet(self.export_btn.styleSheet())
+        self.export_graph_btn.clicked.connect(self.export_graph)
+        button_layout.addWidget(self.export_graph_btn)
+
         button_layout.addStretch()
 
         close_btn = QPushButton("Close")
@@ -209,14 +230,24 @@ class DependencyViewerDialog(QDialog):
         layout.addLayout(button_layout)
         self.setLayout(layout)
 
+    def _start_worker(self, package_name, item=None):
+        worker = DependencyLevelWorker(self.dep_manager, package_name, item)
+        worker.finished.connect(self.on_level_loaded)
+        worker.finished.connect(lambda *_: self._workers.discard(worker))
+        self._workers.add(worker)
+        worker.start()
+
     def load_dependencies(self):
-        """Load dependencies in background"""
-        self.worker = DependencyWorker(self.package_name)
-        self.worker.finished.connect(self.on_dependencies_loaded)
-        self.worker.start()
+        """Load the root package in background"""
+        self._start_worker(self.package_name)
+
+    def on_level_loaded(self, item, node, children, error):
+        """Handle a resolved node (the root if item is None)"""
+        if item is not None:
+            if node is not None:
+                self.populate_item(item, node, children)
+            return
 
-    def on_dependencies_loaded(self, tree, error):
-        """Handle loaded dependencies"""
         self.loading_label.setVisible(False)
         self.progress_bar.setVisible(False)
 
@@ -224,12 +255,12 @@ class DependencyViewerDialog(QDialog):
             QMessageBox.warning(self, "Error", f"Failed to load dependencies:\n{error}")
             return
 
-        if not tree:
+        if node is None or node["version"] is None:
             self.loading_label.setText("⚠ Package not installed or no dependencies found.")
             self.loading_label.setVisible(True)
             return
 
-        self.dependency_tree = tree
+        self.root_node = node
 
         # Show UI elements
         self.tree_label.setVisible(True)
@@ -238,51 +269,89 @@ class DependencyViewerDialog(QDialog):
         self.details_panel.setVisible(True)
         self.splitter.setVisible(True)
         self.export_btn.setEnabled(True)
+        self.export_graph_btn.setEnabled(True)
 
-        # Build tree widget
+        # Build the first level; deeper levels load on expand
         self.tree_widget.clear()
-        self.add_tree_items(tree, None)
-        self.tree_widget.expandAll()
+        root_item = self.create_item(None, node["name"], node)
+        font = QFont()
+        font.setBold(True)
+        font.setPointSize(11)
+        root_item.setFont(0, font)
+        self.populate_item(root_item, node, children)
+        root_item.setExpanded(True)
 
         # Load reverse dependencies
         self.load_reverse_dependencies()
 
-    def add_tree_items(self, tree_node, parent_item):
-        """Recursively add items to tree widget"""
+    def _ancestor_keys(self, item):
+        keys = set()
+        item = item.parent() if item is not None else None
+        while item is not None:
+            keys.add(canonical_name(item.data(0, Qt.ItemDataRole.UserRole)))
+            item = item.parent()
+        return keys
+
+    def create_item(self, parent_item, name, node=None):
+        """Add a tree item; a placeholder child marks it as expandable"""
         if parent_item is None:
             item = QTreeWidgetItem(self.tree_widget)
         else:
             item = QTreeWidgetItem(parent_item)
 
-        item.setText(0, tree_node["name"])
-        item.setData(0, Qt.ItemDataRole.UserRole, tree_node["name"])
+        item.setText(0, name)
+        item.setData(0, Qt.ItemDataRole.UserRole, name)
+        item.setData(0, self.LOADED_ROLE, False)
 
-        # Check if package is installed
-        info = self.dep_manager.get_package_info_summary(tree_node["name"])
-        if info:
-            item.setText(1, f"✓ v{info.get('Version', '?')}")
+        if node is None:
+            item.setText(1, "…")
+        elif node["version"] is not None:
+            item.setText(1, f"✓ v{node['version']}")
             item.setForeground(1, QColor("#27ae60"))
         else:
             item.setText(1, "✗ Not installed")
             item.setForeground(1, QColor("#e74c3c"))
 
-        # Set font based on depth
-        font = QFont()
-        if tree_node["depth"] == 0:
-            font.setBold(True)
-            font.setPointSize(11)
-        item.setFont(0, font)
+        circular = parent_item is not None and canonical_name(name) in self._ancestor_keys(item)
+        if circular:
+            item.setText(1, item.text(1) + "  ↻ circular")
+        elif node is None or node["children"]:
+            QTreeWidgetItem(item, ["Loading…"])
+        return item
 
-        # Add children
-        for child in tree_node.get("dependencies", []):
-            self.add_tree_items(child, item)
+    def populate_item(self, item, node, children):
+        """Replace the placeholder of an item with its children"""
+        if item.data(0, self.LOADED_ROLE):
+            return
+        item.setData(0, self.LOADED_ROLE, True)
+        item.takeChildren()
+        for child in children:
+            self.create_item(item, child["name"], child)
+
+        # Prefetch one level ahead so expanding a child is instant
+        grandchildren = [name for child in children for name in child["children"]]
+        if grandchildren:
+            self.dep_manager.prefetch_dependency_nodes(grandchildren)
+
+    def on_item_expanded(self, item):
+        """Load the children of an item the first time it is expanded"""
+        if item.data(0, self.LOADED_ROLE) or item.childCount() == 0:
+            return
+        name = item.data(0, Qt.ItemDataRole.UserRole)
+        node = self.dep_manager.get_dependency_node(name, cached_only=True)
+        if node is not None:
+            children = [self.dep_manager.get_dependency_node(child, cached_only=True) for child in node["children"]]
+            if all(child is not None for child in children):
+                self.populate_item(item, node, children)
+                return
+        self._start_worker(name, item)
 
     def load_reverse_dependencies(self):
         """Load reverse dependencies"""
-        reverse_deps, error = self.dep_manager.get_reverse_dependencies(self.package_name)
-
-        if error:
+        info = get_local_details(self.package_name, self.python_executable)
+        if not info:
             return
+        reverse_deps = [d.strip() for d in info.get("Required-by", "").split(",") if d.strip()]
 
         if reverse_deps and reverse_deps[0]:  # Check if not empty
             self.reverse_deps_label.setVisible(True)
@@ -292,10 +361,27 @@ class DependencyViewerDialog(QDialog):
             for dep in reverse_deps:
                 text += f"  • {dep}\n"
 
+            indirect = self._indirect_dependents(reverse_deps)
+            if indirect:
+                text += f"\nThrough them, {len(indirect)} more package(s) depend on it indirectly:\n"
+                text += "  " + ", ".join(indirect) + "\n"
+
             text += f"\n💡 If you uninstall {self.package_name}, these packages may not work correctly."
 
             self.reverse_deps_text.setText(text)
 
+    def _indirect_dependents(self, direct):
+        """Packages needing this one only through other packages"""
+        from core.dependency_graph import get_dependency_graph
+
+        try:
+            graph = get_dependency_graph(self.python_executable)
+            closure = graph.reverse_closure([self.package_name])
+        except Exception:
+            return []
+        direct_keys = {canonical_name(name) for name in direct}
+        return [name for name in closure if canonical_name(name) not in direct_keys]
+
     def on_item_clicked(self, item, column):
         """Handle tree item click"""
         package_name = item.data(0, Qt.ItemDataRole.UserRole)
@@ -304,7 +390,7 @@ class DependencyViewerDialog(QDialog):
             return
 
         # Show package details
-        info = self.dep_manager.get_package_info_summary(package_name)
+        info = get_local_details(package_name, self.python_executable)
 
         self.details_panel.clear()
 
@@ -319,8 +405,8 @@ class DependencyViewerDialog(QDialog):
             self.details_panel.append(f"Summary:")
             self.details_panel.append(f"{info.get('Summary', 'N/A')}")
             self.details_panel.append("")
-            self.details_panel.append(f"Requires: {info.get('Requires', 'None')}")
-            self.details_panel.append(f"Required-by: {info.get('Required-by', 'None')}")
+            self.details_panel.append(f"Requires: {info.get('Requires') or 'None'}")
+            self.details_panel.append(f"Required-by: {info.get('Required-by') or 'None'}")
         else:
             self.details_panel.append(f"Package: {package_name}")
             self.details_panel.append("=" * 60)
@@ -330,10 +416,12 @@ class DependencyViewerDialog(QDialog):
 
     def export_tree(self):
         """Export dependency tree as text"""
-        if not self.dependency_tree:
+        if not self.root_node:
             return
 
-        text = self._tree_to_text(self.dependency_tree, 0)
+        lines = []
+        self._tree_to_text(self.root_node["name"], 0, [], set(), lines)
+        text = "\n".join(lines) + "\n"
 
         # Copy to clipboard
         from PyQt6.QtWidgets import QApplication
@@ -346,14 +434,47 @@ class DependencyViewerDialog(QDialog):
             "Dependency tree copied to clipboard!\n\nYou can paste it anywhere."
         )
 
-    def _tree_to_text(self, node, depth):
-        """Convert tree to text format"""
+    def export_graph(self):
+        """Write this package's dependency graph as DOT, JSON or GraphML"""
+        from core.dependency_graph import get_dependency_graph
+        from core.graph_export import export_graph
+
+        if not self.root_node:
+            return
+
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Export Dependency Graph", f"{self.root_node['key']}-dependencies.dot",
+            "Graphviz DOT (*.dot *.gv);;JSON node-link (*.json);;GraphML (*.graphml)"
+        )
+        if not file_path:
+            return
+
+        fmt = None
+        if not os.path.splitext(file_path)[1]:
+            fmt = "json" if "JSON" in selected_filter else "graphml" if "GraphML" in selected_filter else "dot"
+        success, message = export_graph(get_dependency_graph(self.python_executable), file_path, fmt,
+                                        roots=[self.root_node["name"]])
+        if success:
+            QMessageBox.information(self, "Graph Exported", message)
+        else:
+            QMessageBox.warning(self, "Export Failed", message)
+
+    def _tree_to_text(self, name, depth, path, written, lines):
+        """Append the full tree below name (each subtree written once)"""
         indent = "  " * depth
         prefix = "├─ " if depth > 0 else ""
+        node = self.dep_manager.get_dependency_node(name)
 
-        text = f"{indent}{prefix}{node['name']}\n"
-
-        for i, child in enumerate(node.get("dependencies", [])):
-            text += self._tree_to_text(child, depth + 1)
+        if node["key"] in path:
+            lines.append(f"{indent}{prefix}{node['name']} (circular)")
+            return
+        if node["key"] in written and node["children"]:
+            lines.append(f"{indent}{prefix}{node['name']} (see above)")
+            return
+        lines.append(f"{indent}{prefix}{node['name']}")
+        written.add(node["key"])
 
-        return text
+        path.append(node["key"])
+        for child in node["children"]:
+            self._tree_to_text(child, depth + 1, path, written, lines)
+        path.pop()
@@ -0,0 +1,162 @@
+"""Diagnostics Dialog - slowest recent operations and cache hit rates"""
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
+    QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog, QMessageBox
+)
+from PyQt6.QtCore import Qt
+from core import tracing
+
+BUTTON_STYLE = """
+    QPushButton {
+        background-color: %s;
+        color: white;
+        border: none;
+        padding: 10px 20px;
+        border-radius: 5px;
+        font-size: 13px;
+    }
+    QPushButton:hover {
+        background-color: %s;
+    }
+"""
+
+
+def _format_duration(seconds):
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    return f"{seconds * 1000:.1f} ms"
+
+
+class DiagnosticsDialog(QDialog):
+    """Dialog showing where recent operations spent their time"""
+
+    SLOWEST_COUNT = 50
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self.setWindowTitle("Diagnostics")
+        self.setMinimumSize(900, 650)
+
+        self.init_ui()
+        self.refresh()
+
+    def init_ui(self):
+        """Initialize the user interface"""
+        layout = QVBoxLayout()
+        layout.setSpacing(15)
+        layout.setContentsMargins(20, 20, 20, 20)
+
+        header = QLabel("<h1>Diagnostics</h1>")
+        header.setStyleSheet("color: #3498db; margin-bottom: 10px;")
+        layout.addWidget(header)
+
+        self.summary_label = QLabel()
+        self.summary_label.setStyleSheet("color: #7f8c8d;")
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+        layout.addWidget(QLabel("<b>Slowest recent operations:</b>"))
+        self.spans_table = QTableWidget(0, 4)
+        self.spans_table.setHorizontalHeaderLabels(["Operation", "Category", "Duration", "Details"])
+        self.spans_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
+        self.spans_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.spans_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        layout.addWidget(self.spans_table, 3)
+
+        layout.addWidget(QLabel("<b>Cache hit rates:</b>"))
+        self.cache_table = QTableWidget(0, 4)
+        self.cache_table.setHorizontalHeaderLabels(["Cache", "Hits", "Misses", "Hit Rate"])
+        self.cache_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.cache_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.cache_table, 2)
+
+        button_layout = QHBoxLayout()
+
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.setStyleSheet(BUTTON_STYLE % ("#3498db", "#2980b9"))
+        refresh_btn.clicked.connect(self.refresh)
+        button_layout.addWidget(refresh_btn)
+
+        export_btn = QPushButton("Export Chrome Trace")
+        export_btn.setStyleSheet(BUTTON_STYLE % ("#27ae60", "#229954"))
+        export_btn.clicked.connect(self.export_trace)
+        button_layout.addWidget(export_btn)
+
+        clear_btn = QPushButton("Clear")
+        clear_btn.setStyleSheet(BUTTON_STYLE % ("#e67e22", "#d35400"))
+        clear_btn.clicked.connect(self.clear)
+        button_layout.addWidget(clear_btn)
+
+        button_layout.addStretch()
+
+        close_btn = QPushButton("Close")
+        close_btn.setStyleSheet(BUTTON_STYLE % ("#95a5a6", "#7f8c8d"))
+        close_btn.clicked.connect(self.accept)
+        button_layout.addWidget(close_btn)
+
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+    def refresh(self):
+        """Reload the tables from the trace buffer"""
+        recorded = tracing.spans()
+        if not tracing.is_enabled():
+            self.summary_label.setText("Tracing is disabled (LIBRARY_MANAGER_TRACE=0).")
+        else:
+            subprocess_spans = [s for s in recorded if s.category == tracing.SUBPROCESS]
+            spawns = tracing.spawn_counts()
+            text = (f"{len(recorded)} operations recorded (last {tracing.MAX_SPANS} kept), "
+                    f"{len(subprocess_spans)} subprocesses taking "
+                    f"{_format_duration(sum(s.duration for s in subprocess_spans))} in total.")
+            if spawns:
+                text += "\nProcesses started: " + ", ".join(
+                    f"{command} ×{count}" for command, count in list(spawns.items())[:8])
+            self.summary_label.setText(text)
+
+        slowest = tracing.slowest(self.SLOWEST_COUNT)
+        self.spans_table.setRowCount(len(slowest))
+        for row, span in enumerate(slowest):
+            if "argv" in span.args:
+                details = " ".join(span.args["argv"])
+                if "returncode" in span.args:
+                    details += (f"  [exit {span.args['returncode']}, "
+                                f"{span.args.get('stdout_bytes', 0) + span.args.get('stderr_bytes', 0)} bytes]")
+            else:
+                details = ", ".join(f"{key}={value}" for key, value in span.args.items())
+            duration_item = QTableWidgetItem(_format_duration(span.duration))
+            duration_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.spans_table.setItem(row, 0, QTableWidgetItem(span.name))
+            self.spans_table.setItem(row, 1, QTableWidgetItem(span.category))
+            self.spans_table.setItem(row, 2, duration_item)
+            self.spans_table.setItem(row, 3, QTableWidgetItem(details))
+        self.spans_table.resizeColumnsToContents()
+
+        stats = tracing.cache_stats()
+        self.cache_table.setRowCount(len(stats))
+        for row, (name, entry) in enumerate(stats.items()):
+            rate = entry["hit_rate"]
+            self.cache_table.setItem(row, 0, QTableWidgetItem(name))
+            self.cache_table.setItem(row, 1, QTableWidgetItem(str(entry["hits"])))
+            self.cache_table.setItem(row, 2, QTableWidgetItem(str(entry["misses"])))
+            self.cache_table.setItem(row, 3, QTableWidgetItem("-" if rate is None else f"{rate:.0%}"))
+
+    def export_trace(self):
+        """Save the trace in Chrome trace-event format"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Chrome Trace", "library-manager-trace.json", "Trace files (*.json)"
+        )
+        if not file_path:
+            return
+        success, message = tracing.export_chrome_trace(file_path)
+        if success:
+            QMessageBox.information(self, "Trace Exported",
+                                    f"{message}\n\nOpen it in chrome://tracing or ui.perfetto.dev.")
+        else:
+            QMessageBox.warning(self, "Export Failed", message)
+
+    def clear(self):
+        """Forget recorded operations and cache counters"""
+        tracing.clear()
+        self.refresh()
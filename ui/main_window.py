@@ -4,19 +4,16 @@ from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QListWidget, QTextEdit, QSplitter,
     QLabel, QCheckBox, QScrollArea, QFrame, QMessageBox,
-    QStackedWidget, QListWidgetItem
+    QStackedWidget, QListWidgetItem, QLineEdit
 )
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont, QIcon
-from core.library_data import LIBRARY_CATEGORIES
+from core.catalog_store import open_catalog
 from core.installer import PackageInstaller
 from ui.theme_manager import ThemeManager
-from ui.package_details_dialog import PackageDetailsDialog
-from ui.venv_manager_dialog import VenvManagerDialog
-from ui.version_selector_dialog import VersionSelectorDialog
-from ui.dependency_viewer_dialog import DependencyViewerDialog
 from ui.system_tray import SystemTrayManager
-from ui.python_selector_dialog import PythonSelectorDialog
+
+# Dialog modules are imported when first opened to keep startup fast
 
 
 class LibraryItem(QWidget):
@@ -141,35 +138,70 @@ class LibraryItem(QWidget):
 
     def show_details(self):
         """Show package details dialog"""
-        dialog = PackageDetailsDialog(self.name, self.description, self.install_cmd, self)
+        from ui.package_details_dialog import PackageDetailsDialog
+        window = self.window()
+        python = window.current_python() if hasattr(window, "current_python") else None
+        dialog = PackageDetailsDialog(self.name, self.description, self.install_cmd, self, python_executable=python)
         dialog.exec()
 
     def show_versions(self):
         """Show package version selector dialog"""
+        from ui.version_selector_dialog import VersionSelectorDialog
         dialog = VersionSelectorDialog(self.name, self)
         dialog.exec()
 
     def show_dependencies(self):
         """Show package dependency viewer dialog"""
-        dialog = DependencyViewerDialog(self.name, self)
+        from ui.dependency_viewer_dialog import DependencyViewerDialog
+        window = self.window()
+        python = window.current_python() if hasattr(window, "current_python") else None
+        dialog = DependencyViewerDialog(self.name, self, python_executable=python)
         dialog.exec()
 
 
+class SearchBox(QLineEdit):
+    """Search input that reports when it receives focus"""
+
+    focused = pyqtSignal()
+
+    def focusInEvent(self, event):
+        super().focusInEvent(event)
+        self.focused.emit()
+
+
 class MainWindow(QMainWindow):
     """Main application window"""
 
+    first_painted = pyqtSignal()
+    # Emitted from the update scheduler thread: (python, outdated packages, newly outdated)
+    outdated_checked = pyqtSignal(str, list, list)
+    outdated_check_failed = pyqtSignal(str)
+
+    # Stacked widget index -> (attribute name, builder method name)
+    LAZY_VIEWS = {
+        1: ("scan_view", "create_scan_view"),
+        2: ("venv_view", "create_venv_view"),
+        3: ("python_view", "create_python_view"),
+        4: ("update_view", "create_update_view"),
+        5: ("requirements_view", "create_requirements_view"),
+    }
+
     def __init__(self, app=None):
         super().__init__()
         self.app = app
         self.installer = PackageInstaller()
+        self.catalog = open_catalog()  # Category headers only; entries load per category
         self.theme_manager = ThemeManager()
         self.library_items = []
         self.current_category = None
         self.installed_packages_cache = None  # Cache for installed packages
+        self.search_index = None  # Built lazily on first search box focus
         self.system_tray = None
         self.selected_python_path = None  # Selected Python version path
         self.selected_python_version = None  # Selected Python version string
         self.current_view = "packages"  # Track current view: packages, scan, venv, python
+        self._first_paint_done = False
+        self.update_scheduler = None  # Background outdated checks, started below
 
         self.init_ui()
         self.apply_theme()
@@ -184,10 +216,44 @@ class MainWindow(QMainWindow):
                 )
 
         # Load first category (without checking installations to speed up)
-        if LIBRARY_CATEGORIES:
-            first_category = list(LIBRARY_CATEGORIES.keys())[0]
+        category_names = self.catalog.get_category_names()
+        if category_names:
+            first_category = category_names[0]
             self.load_category(first_category, check_installed=False)
 
+        # Report catalog overlay files that could not be read
+        for error in self.catalog.source_errors:
+            self.log(f"⚠ Skipped {error}\n")
+
+        self.start_update_scheduler()
+
+    def current_python(self):
+        """Interpreter all package operations target"""
+        import sys
+        return self.selected_python_path or sys.executable
+
+    def start_update_scheduler(self):
+        """Start periodic background checks for outdated packages"""
+        from core.update_scheduler import UpdateScheduler
+
+        self.outdated_checked.connect(self.on_outdated_checked)
+        self.outdated_check_failed.connect(self.on_outdated_check_failed)
+        # The callbacks run on the scheduler thread; the signals hand them to the GUI thread
+        self.update_scheduler = UpdateScheduler(on_result=self.outdated_checked.emit,
+                                                on_failure=self.outdated_check_failed.emit)
+        self.update_scheduler.set_interpreters([self.current_python()])
+        self.update_scheduler.start()
+
+    def on_outdated_checked(self, python_path, packages, new_packages):
+        """Show the result of a background outdated check"""
+        if python_path != self.current_python():
+            return
+        if getattr(self, "update_view", None) is not None:
+            self.show_outdated_packages(packages, "just now")
+        if new_packages and self.system_tray:
+            self.system_tray.notify_updates(new_packages)
+            self.update_scheduler.cache.mark_announced(python_path, new_packages)
+
     def init_ui(self):
         """Initialize the user interface"""
         self.setWindowTitle("Library Manager - Cross-Platform Package Installer")
@@ -213,25 +279,10 @@ class MainWindow(QMainWindow):
         self.packages_view = self.create_packages_view()
         self.stacked_widget.addWidget(self.packages_view)
 
-        # View 2: Scan results view
-        self.scan_view = self.create_scan_view()
-        self.stacked_widget.addWidget(self.scan_view)
-
-        # View 3: Virtual Environment Manager view
-        self.venv_view = self.create_venv_view()
-        self.stacked_widget.addWidget(self.venv_view)
-
-        # View 4: Python Selector view
-        self.python_view = self.create_python_view()
-        self.stacked_widget.addWidget(self.python_view)
-
-        # View 5: Bulk Update Manager view
-        self.update_view = self.create_update_view()
-        self.stacked_widget.addWidget(self.update_view)
-
-        # View 6: Requirements Manager view
-        self.requirements_view = self.create_requirements_view()
-        self.stacked_widget.addWidget(self.requirements_view)
+        # Views 2-6 (scan, venv, python, update, requirements) are built on
+        # first switch_view; empty placeholders hold their indexes until then
+        for index in sorted(self.LAZY_VIEWS):
+            self.stacked_widget.addWidget(QWidget())
 
         main_vertical_layout.addWidget(self.stacked_widget)
 
@@ -624,6 +675,24 @@ class MainWindow(QMainWindow):
         update_all_btn.clicked.connect(self.update_all_packages)
         toolbar.addWidget(update_all_btn)
 
+        undo_btn = QPushButton("Undo Last Update")
+        undo_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #95a5a6;
+                color: white;
+                border: none;
+                padding: 10px 20px;
+                border-radius: 5px;
+                font-size: 13px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #7f8c8d;
+            }
+        """)
+        undo_btn.clicked.connect(self.undo_last_update)
+        toolbar.addWidget(undo_btn)
+
         toolbar.addStretch()
         layout.addLayout(toolbar)
 
@@ -890,6 +959,25 @@ class MainWindow(QMainWindow):
         # Add stretch to push buttons to left
         layout.addStretch()
 
+        # Diagnostics (operation timings, cache hit rates) on right
+        diagnostics_btn = QPushButton("Diagnostics")
+        diagnostics_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #3498db;
+                color: white;
+                border: none;
+                padding: 15px 25px;
+                font-size: 13px;
+                font-weight: bold;
+                border-left: 1px solid #2c3e50;
+            }
+            QPushButton:hover {
+                background-color: #2980b9;
+            }
+        """)
+        diagnostics_btn.clicked.connect(self.open_diagnostics)
+        layout.addWidget(diagnostics_btn)
+
         # Theme toggle button on right
         theme_btn = QPushButton("Toggle Theme")
         theme_btn.setStyleSheet("""
@@ -978,7 +1066,7 @@ class MainWindow(QMainWindow):
 
         # Category buttons
         self.category_buttons = {}
-        for category in LIBRARY_CATEGORIES.keys():
+        for category in self.catalog.get_category_names():
             btn = QPushButton(category)
             btn.setCheckable(True)
             btn.setStyleSheet("""
@@ -1035,6 +1123,26 @@ class MainWindow(QMainWindow):
 
         top_layout.addStretch()
 
+        # Search box
+        self.search_box = SearchBox()
+        self.search_box.setPlaceholderText("Search packages...")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.setFixedWidth(280)
+        self.search_box.setStyleSheet("""
+            QLineEdit {
+                border: 1px solid #bdc3c7;
+                border-radius: 4px;
+                padding: 6px 10px;
+                font-size: 13px;
+            }
+            QLineEdit:focus {
+                border: 1px solid #3498db;
+            }
+        """)
+        self.search_box.focused.connect(self.ensure_search_index)
+        self.search_box.textChanged.connect(self.on_search_text_changed)
+        top_layout.addWidget(self.search_box)
+
         # Select All / Deselect All buttons
         self.select_all_btn = QPushButton("Select All")
         self.select_all_btn.clicked.connect(self.select_all)
@@ -1210,10 +1318,20 @@ class MainWindow(QMainWindow):
         self.current_category = category
         self.category_label.setText(category)
 
+        # Picking a category ends any active search
+        if self.search_box.text():
+            self.search_box.blockSignals(True)
+            self.search_box.clear()
+            self.search_box.blockSignals(False)
+
         # Update button states
         for cat, btn in self.category_buttons.items():
             btn.setChecked(cat == category)
 
+        self._populate_library_list(self.catalog.get_packages(category), check_installed)
+
+    def _populate_library_list(self, libraries, check_installed=True):
+        """Replace the package list contents with the given library entries"""
         # Clear existing items
         while self.libraries_layout.count():
             child = self.libraries_layout.takeAt(0)
@@ -1227,7 +1345,6 @@ class MainWindow(QMainWindow):
             self._build_installed_cache()
 
         # Add library items
-        libraries = LIBRARY_CATEGORIES.get(category, [])
         for lib in libraries:
             # Check if package is installed (use cache for speed)
             is_installed = False
@@ -1243,6 +1360,37 @@ class MainWindow(QMainWindow):
         # Add stretch at the end
         self.libraries_layout.addStretch()
 
+    def refresh_library_list(self, check_installed=True):
+        """Reload the package list, keeping an active search"""
+        if self.search_box.text().strip():
+            self.on_search_text_changed(self.search_box.text())
+        elif self.current_category:
+            self.load_category(self.current_category, check_installed=check_installed)
+
+    def ensure_search_index(self):
+        """Build (or load from the disk cache) the catalog search index"""
+        if self.search_index is None:
+            from core.search_index import SearchIndex
+            self.search_index = SearchIndex.load_or_build(self.catalog.catalog_hash, self.catalog.to_dict)
+
+    def on_search_text_changed(self, text):
+        """Show ranked search results as the user types"""
+        query = text.strip()
+        if not query:
+            # Search cleared - go back to the selected category
+            if self.current_category:
+                self.load_category(self.current_category, check_installed=self.installed_packages_cache is not None)
+            return
+
+        self.ensure_search_index()
+        results = self.search_index.search(query)
+
+        for btn in self.category_buttons.values():
+            btn.setChecked(False)
+        self.category_label.setText(f'Search: "{query}" ({len(results)} found)')
+
+        self._populate_library_list(results, check_installed=self.installed_packages_cache is not None)
+
     def _build_installed_cache(self):
         """Build cache of installed packages for fast lookup"""
         try:
@@ -1288,6 +1436,21 @@ class MainWindow(QMainWindow):
         self.log(f"Operating System: {self.installer.get_os_info()}\n")
         self.log("-" * 80 + "\n\n")
 
+        # Snapshot first so the installation can be undone
+        affected = []
+        install_args = []
+        for item in selected:
+            affected.extend(self.installer.command_packages(item.install_cmd) or [item.name])
+            install_args.extend(self.installer.command_install_args(item.install_cmd) or [item.name])
+        try:
+            from core.snapshot_manager import SnapshotManager
+            SnapshotManager().take(self.installer.python_executable,
+                                   f"Install {len(selected)} package(s)", affected,
+                                   install_args=install_args)
+            self.log("Snapshot taken (use 'Undo Last Update' to roll back)\n\n")
+        except Exception as e:
+            self.log(f"Could not take snapshot: {e}\n\n")
+
         # Install each selected library
         success_count = 0
         fail_count = 0
@@ -1301,6 +1464,7 @@ class MainWindow(QMainWindow):
             if success:
                 self.log(f"✓ Successfully installed {item.name}\n")
                 success_count += 1
+                self._mark_requested(self.installer.command_packages(item.install_cmd) or [item.name])
             else:
                 self.log(f"✗ Failed to install {item.name}\n")
                 fail_count += 1
@@ -1314,6 +1478,7 @@ class MainWindow(QMainWindow):
         self.log(f"  Successful: {success_count}\n")
         self.log(f"  Failed: {fail_count}\n")
         self.log(f"{'=' * 80}\n")
+        self.report_conflicts()
 
         # Re-enable buttons
         self.install_btn.setEnabled(True)
@@ -1344,9 +1509,12 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "No Selection", "Please select at least one library to uninstall.")
             return
 
-        # Confirm uninstallation
-        reply = QMessageBox.question(self, "Confirm Uninstall",
-                                      f"Are you sure you want to uninstall {len(selected)} package(s)?",
+        # Confirm uninstallation, showing what else the removal affects
+        message = f"Are you sure you want to uninstall {len(selected)} package(s)?"
+        impact_lines = self._removal_impact_lines([item.name.split()[0] for item in selected])
+        if impact_lines:
+            message += "\n\n" + "\n".join(impact_lines)
+        reply = QMessageBox.question(self, "Confirm Uninstall", message,
                                       QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
 
         if reply == QMessageBox.StandardButton.No:
@@ -1362,6 +1530,7 @@ class MainWindow(QMainWindow):
 
         success_count = 0
         fail_count = 0
+        removed = []
 
         for item in selected:
             self.log(f"Uninstalling: {item.name}\n")
@@ -1371,6 +1540,7 @@ class MainWindow(QMainWindow):
             if success:
                 self.log(f"✓ Successfully uninstalled {item.name}\n")
                 success_count += 1
+                removed.append(item.name.split()[0])
             else:
                 self.log(f"✗ Failed to uninstall {item.name}\n")
                 fail_count += 1
@@ -1385,6 +1555,11 @@ class MainWindow(QMainWindow):
         self.log(f"  Failed: {fail_count}\n")
         self.log(f"{'=' * 80}\n")
 
+        # Offer to remove what the uninstalled packages left behind
+        if removed:
+            self.offer_cleanup(removed)
+        self.report_conflicts()
+
         # Re-enable buttons
         self.install_btn.setEnabled(True)
         self.uninstall_btn.setEnabled(True)
@@ -1406,6 +1581,86 @@ class MainWindow(QMainWindow):
                     f"Uninstalled {success_count} package(s), {fail_count} failed."
                 )
 
+    def report_conflicts(self):
+        """Log requirements the last change left unsatisfied (only changed packages are rechecked)"""
+        from core.conflict_checker import check_environment
+
+        try:
+            conflicts = check_environment(self.current_python())
+        except Exception as e:
+            self.log(f"Could not check installed requirements: {e}\n")
+            return []
+        if conflicts:
+            self.log(f"\n⚠ {len(conflicts)} broken requirement(s) in this environment:\n")
+            for conflict in conflicts:
+                self.log(f"  {conflict.describe()}\n")
+        return conflicts
+
+    def _mark_requested(self, requirements):
+        """Remember packages the user asked for (roots for the unused-package cleanup)"""
+        from core.cleanup_manager import CleanupManager
+
+        try:
+            CleanupManager(self.current_python()).mark_requested(requirements)
+        except Exception:
+            pass
+
+    def offer_cleanup(self, uninstalled):
+        """Offer to remove installed packages nothing requested needs anymore"""
+        from core.cleanup_manager import CleanupManager
+
+        manager = CleanupManager(self.current_python())
+        try:
+            manager.marks.remove(manager.python_executable, uninstalled)
+            plan = manager.plan()
+        except Exception as e:
+            self.log(f"Could not check for unused packages: {e}\n")
+            return
+        if plan.is_empty:
+            return
+
+        names = plan.names()
+        shown = names[:20] + ([f"... and {len(names) - 20} more"] if len(names) > 20 else [])
+        reply = QMessageBox.question(
+            self, "Remove Unused Packages",
+            f"{plan.summary()} are no longer needed by anything you installed:\n\n"
+            + "\n".join(f"  {name}" for name in shown)
+            + "\n\nRemove them too?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+
+        self.log(f"\nRemoving {plan.summary()}...\n")
+        success, output = manager.remove(names, progress=lambda message: self.log(message + "\n"))
+        self.log(output + "\n")
+        self.log(("✓ Unused packages removed\n" if success else "✗ Some unused packages could not be removed\n"))
+
+    def _removal_impact_lines(self, names):
+        """Describe what removing packages breaks or leaves behind (empty if nothing)"""
+        from core.cleanup_manager import app_requirement_keys
+        from core.dependency_graph import get_dependency_graph
+
+        try:
+            python = self.current_python()
+            impact = get_dependency_graph(python).removal_impact(names, keep=app_requirement_keys(python))
+        except Exception:
+            return []
+
+        def shown(packages, limit=15):
+            return ", ".join(packages[:limit]) + (f" ... and {len(packages) - limit} more" if len(packages) > limit else "")
+
+        lines = []
+        if impact.affected:
+            lines.append(f"⚠ {len(impact.affected)} installed package(s) depend on them, directly or "
+                         f"indirectly, and may stop working:")
+            lines.append(f"  {shown(impact.affected)}")
+        if impact.orphans:
+            lines.append(f"These dependencies will no longer be needed by anything "
+                         f"({len(impact.orphans)}):")
+            lines.append(f"  {shown(impact.orphans)}")
+        return lines
+
     def run_scan_in_view(self):
         """Run scan and display results in scan view"""
         self.scan_results_text.clear()
@@ -1432,15 +1687,14 @@ class MainWindow(QMainWindow):
 
         # Match with our database
         found_packages = []
-        for category, packages in LIBRARY_CATEGORIES.items():
-            for pkg in packages:
-                pkg_name = pkg['name'].lower().replace('-', '_')
-                if pkg_name in installed_packages or pkg_name.replace('_', '-') in installed_packages:
-                    found_packages.append({
-                        'name': pkg['name'],
-                        'category': category,
-                        'description': pkg['description']
-                    })
+        for category, pkg in self.catalog.iter_packages():
+            pkg_name = pkg['name'].lower().replace('-', '_')
+            if pkg_name in installed_packages or pkg_name.replace('_', '-') in installed_packages:
+                found_packages.append({
+                    'name': pkg['name'],
+                    'category': category,
+                    'description': pkg['description']
+                })
 
         self.scan_results_text.append(f"Matched {len(found_packages)} packages from our database:\n")
         self.scan_results_text.append("-" * 80 + "\n\n")
@@ -1486,19 +1740,18 @@ class MainWindow(QMainWindow):
 
         # Find matching packages from our database
         found_packages = []
-        for category, packages in LIBRARY_CATEGORIES.items():
-            for pkg in packages:
-                pkg_name = pkg["name"].lower().replace("-", "_")
-                # Check various name formats
-                if (pkg_name in installed_packages or
-                    pkg["name"].lower() in installed_packages or
-                    pkg["name"].lower().replace("_", "-") in installed_packages):
-                    found_packages.append({
-                        "name": pkg["name"],
-                        "description": pkg["description"],
-                        "install_cmd": pkg["install_cmd"],
-                        "category": category
-                    })
+        for category, pkg in self.catalog.iter_packages():
+            pkg_name = pkg["name"].lower().replace("-", "_")
+            # Check various name formats
+            if (pkg_name in installed_packages or
+                pkg["name"].lower() in installed_packages or
+                pkg["name"].lower().replace("_", "-") in installed_packages):
+                found_packages.append({
+                    "name": pkg["name"],
+                    "description": pkg["description"],
+                    "install_cmd": pkg["install_cmd"],
+                    "category": category
+                })
 
         if not found_packages:
             self.log("No packages from the library database found on your system.\n")
@@ -1536,8 +1789,24 @@ class MainWindow(QMainWindow):
             self.log_text.verticalScrollBar().maximum()
         )
 
+    def ensure_view(self, index):
+        """Build a lazily constructed view the first time it is needed"""
+        if index not in self.LAZY_VIEWS:
+            return
+        attr, builder = self.LAZY_VIEWS[index]
+        if getattr(self, attr, None) is not None:
+            return
+
+        view = getattr(self, builder)()
+        placeholder = self.stacked_widget.widget(index)
+        self.stacked_widget.removeWidget(placeholder)
+        placeholder.deleteLater()
+        self.stacked_widget.insertWidget(index, view)
+        setattr(self, attr, view)
+
     def switch_view(self, index):
         """Switch between different views"""
+        self.ensure_view(index)
         self.stacked_widget.setCurrentIndex(index)
         self.current_view = ["packages", "scan", "venv", "python", "update", "requirements"][index]
 
@@ -1547,7 +1816,7 @@ class MainWindow(QMainWindow):
         elif index == 3:  # Python view
             self.python_refresh_list()
         elif index == 4:  # Update view
-            self.update_results_text.setPlainText("Click 'Check for Updates' to find outdated packages")
+            self.show_cached_outdated()
         elif index == 5:  # Requirements view
             self.req_info_text.setPlainText("Import: Load packages from requirements.txt\nExport: Save installed packages to requirements.txt")
 
@@ -1688,24 +1957,48 @@ Current: {'Yes' if python.is_current else 'No'}
             f"Successfully selected Python {python.version}\n\nPath: {python.path}\n\nAll package operations will now use this Python version."
         )
 
-    def update_check_outdated(self):
-        """Check for outdated packages"""
-        self.update_list_widget.clear()
-        self.update_results_text.setPlainText("Checking for outdated packages...")
+    def on_outdated_check_failed(self, python_path):
+        """Report a failed outdated check in the Update view"""
+        if python_path == self.current_python() and getattr(self, "update_view", None) is not None:
+            self.update_results_text.setPlainText("Failed to check for updates")
 
-        success, packages = self.update_manager.check_outdated_packages()
+    def show_cached_outdated(self):
+        """Show the last background check result without running pip"""
+        import time
 
-        if not success:
-            self.update_results_text.setPlainText("Failed to check for updates")
+        entry = self.update_scheduler.cache.get(self.current_python()) if self.update_scheduler else None
+        if entry is None:
+            self.update_results_text.setPlainText("Click 'Check for Updates' to find outdated packages")
+            self.update_list_widget.clear()
             return
 
+        minutes = int((time.time() - entry.get("checked_at", 0)) // 60)
+        if minutes < 1:
+            age = "just now"
+        elif minutes < 120:
+            age = f"{minutes} min ago"
+        else:
+            age = f"{minutes // 60} h ago"
+        self.show_outdated_packages(entry.get("packages", []), age)
+
+    def update_check_outdated(self):
+        """Check for outdated packages (in the background)"""
+        self.update_results_text.setPlainText("Checking for outdated packages...")
+        if self.update_scheduler is None:
+            self.start_update_scheduler()
+        self.update_scheduler.request_check()
+
+    def show_outdated_packages(self, packages, age):
+        """Fill the Update view list"""
+        self.update_list_widget.clear()
+
         if not packages:
-            self.update_results_text.setPlainText("All packages are up to date!")
+            self.update_results_text.setPlainText(f"All packages are up to date! (checked {age})")
             item = QListWidgetItem("✓ All packages are up to date")
             self.update_list_widget.addItem(item)
             return
 
-        self.update_results_text.setPlainText(f"Found {len(packages)} outdated package(s)")
+        self.update_results_text.setPlainText(f"Found {len(packages)} outdated package(s) (checked {age})")
 
         for pkg in packages:
             display_text = f"{pkg['name']}: {pkg['version']} → {pkg['latest_version']}"
@@ -1717,13 +2010,56 @@ Current: {'Yes' if python.is_current else 'No'}
         """Update all outdated packages"""
         self.update_results_text.setPlainText("Updating all outdated packages...\n")
 
+        self.update_manager.python_executable = self.current_python()
         success, message = self.update_manager.update_all_outdated()
 
         if success:
             self.update_results_text.append(f"\n✓ {message}")
-            self.update_check_outdated()  # Refresh list
         else:
             self.update_results_text.append(f"\n✗ {message}")
+        # The cached result is stale now
+        if self.update_scheduler:
+            self.update_scheduler.cache.invalidate(self.current_python())
+            self.update_scheduler.request_check()
+
+    def undo_last_update(self):
+        """Roll the current interpreter back to its latest snapshot"""
+        from core.snapshot_manager import SnapshotManager
+
+        manager = SnapshotManager()
+        python = self.current_python()
+        snapshots = manager.list_snapshots(python)
+        if not snapshots:
+            QMessageBox.information(self, "Undo", "No snapshot found for this Python interpreter.")
+            return
+
+        snapshot = snapshots[0]
+        changes = manager.changes_since(snapshot)
+        lines = [f"  {name}: {current} → {old}" for name, old, current in changes['changed']]
+        lines += [f"  {name}: reinstall {old}" for name, old, _ in changes['removed']]
+        lines += [f"  {name}: remove {current}" for name, _, current in changes['added']]
+        if not lines:
+            QMessageBox.information(self, "Undo", "The environment already matches the last snapshot.")
+            return
+
+        shown = lines[:20] + ([f"  ... and {len(lines) - 20} more"] if len(lines) > 20 else [])
+        reply = QMessageBox.question(
+            self, "Undo Last Update",
+            f"Roll back to the snapshot '{snapshot.label}' ({snapshot.id})?\n\n" + "\n".join(shown),
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+
+        self.update_results_text.setPlainText("Rolling back...\n")
+        success, message = manager.rollback(snapshot)
+        if success:
+            self.update_results_text.append(f"\n✓ {message}")
+        else:
+            self.update_results_text.append(f"\n✗ {message}")
+        if self.update_scheduler:
+            self.update_scheduler.cache.invalidate(python)
+            self.update_scheduler.request_check()
 
     def req_import_file(self):
         """Import packages from requirements.txt"""
@@ -1763,11 +2099,19 @@ Current: {'Yes' if python.is_current else 'No'}
 
     def open_venv_manager(self):
         """Open Virtual Environment Manager dialog"""
+        from ui.venv_manager_dialog import VenvManagerDialog
         dialog = VenvManagerDialog(self)
         dialog.exec()
 
+    def open_diagnostics(self):
+        """Open the Diagnostics dialog (slowest operations, cache hit rates)"""
+        from ui.diagnostics_dialog import DiagnosticsDialog
+        dialog = DiagnosticsDialog(self)
+        dialog.exec()
+
     def open_python_selector(self):
         """Open Python Version Selector dialog"""
+        from ui.python_selector_dialog import PythonSelectorDialog
         dialog = PythonSelectorDialog(self.selected_python_path, self)
         dialog.python_selected.connect(self.on_python_version_selected)
         dialog.exec()
@@ -1783,9 +2127,12 @@ Current: {'Yes' if python.is_current else 'No'}
         # Rebuild cache with new Python
         self._build_installed_cache()
 
-        # Reload current category
-        if self.current_category:
-            self.load_category(self.current_category, check_installed=True)
+        # Background update checks follow the selected interpreter
+        if self.update_scheduler:
+            self.update_scheduler.set_interpreters([python_path])
+
+        # Reload current category (or search results)
+        self.refresh_library_list(check_installed=True)
 
         # Update window title
         self.setWindowTitle(f"Library Manager - Using Python {python_version}")
@@ -1805,13 +2152,19 @@ Current: {'Yes' if python.is_current else 'No'}
         self.theme_manager.toggle_theme()
         self.apply_theme()
         # Reload current category to refresh colors
-        if self.current_category:
-            self.load_category(self.current_category, check_installed=True)
+        self.refresh_library_list(check_installed=True)
 
     def apply_theme(self):
         """Apply current theme"""
         self.setStyleSheet(self.theme_manager.get_stylesheet())
 
+    def paintEvent(self, event):
+        """Report the first paint (used for startup timing)"""
+        super().paintEvent(event)
+        if not self._first_paint_done:
+            self._first_paint_done = True
+            self.first_painted.emit()
+
     def closeEvent(self, event):
         """Handle window close event"""
         if self.system_tray and self.system_tray.is_available():
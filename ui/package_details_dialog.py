@@ -7,66 +7,51 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtGui import QFont
-import subprocess
-import json
+from concurrent.futures import ThreadPoolExecutor
+from core.package_details import get_cached_details, get_local_details, get_remote_details
 
 
 class PackageInfoWorker(QThread):
-    """Worker thread to fetch package information"""
-    finished = pyqtSignal(dict)
+    """Worker thread to fetch package information
+
+    Local metadata and index release info are loaded concurrently; each
+    half is emitted as soon as it is available.
+    """
+    local_loaded = pyqtSignal(dict)
+    remote_loaded = pyqtSignal(dict)
     error = pyqtSignal(str)
 
-    def __init__(self, package_name):
+    def __init__(self, package_name, python_executable=None):
         super().__init__()
         self.package_name = package_name
+        self.python_executable = python_executable
 
     def run(self):
         """Fetch package information"""
-        try:
-            # Get package info from pip
-            result = subprocess.run(
-                ["pip", "show", self.package_name, "--verbose"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-
-            info = {}
-            if result.returncode == 0:
-                # Parse pip show output
-                for line in result.stdout.split('\n'):
-                    if ':' in line:
-                        key, value = line.split(':', 1)
-                        info[key.strip()] = value.strip()
-
-            # Try to get PyPI info
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            remote = executor.submit(get_remote_details, self.package_name)
             try:
-                pypi_result = subprocess.run(
-                    ["pip", "index", "versions", self.package_name],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                if pypi_result.returncode == 0:
-                    info['available_versions'] = pypi_result.stdout
-            except:
-                pass
-
-            self.finished.emit(info)
-
-        except Exception as e:
-            self.error.emit(str(e))
+                self.local_loaded.emit(get_local_details(self.package_name, self.python_executable) or {})
+            except Exception as e:
+                self.error.emit(str(e))
+            try:
+                self.remote_loaded.emit(remote.result())
+            except Exception as e:
+                self.remote_loaded.emit({"remote_error": str(e)})
 
 
 class PackageDetailsDialog(QDialog):
     """Dialog to show detailed package information"""
 
-    def __init__(self, package_name, package_description, install_cmd, parent=None):
+    def __init__(self, package_name, package_description, install_cmd, parent=None, python_executable=None):
         super().__init__(parent)
         self.package_name = package_name
         self.package_description = package_description
         self.install_cmd = install_cmd
+        self.python_executable = python_executable
         self.package_info = {}
+        self.remote_info = None
+        self.latest_version_label = None
 
         self.setWindowTitle(f"Package Details - {package_name}")
         self.setMinimumSize(700, 600)
@@ -174,14 +159,38 @@ class PackageDetailsDialog(QDialog):
         self.setLayout(layout)
 
     def load_package_info(self):
-        """Load package information in background thread"""
-        self.worker = PackageInfoWorker(self.package_name)
-        self.worker.finished.connect(self.on_info_loaded)
+        """Show memoized information at once, then refresh it in a background thread"""
+        local, remote = get_cached_details(self.package_name, self.python_executable)
+        if remote is not None:
+            self.remote_info = remote
+        if local is not None:
+            self.on_info_loaded(local)
+
+        self.worker = PackageInfoWorker(self.package_name, self.python_executable)
+        self.worker.local_loaded.connect(self.on_info_loaded)
+        self.worker.remote_loaded.connect(self.on_remote_loaded)
         self.worker.error.connect(self.on_info_error)
         self.worker.start()
 
+    def _latest_version_text(self):
+        if self.remote_info is None:
+            return "Loading…"
+        if self.remote_info.get("Latest Version"):
+            return self.remote_info["Latest Version"]
+        if self.remote_info.get("remote_error"):
+            return f"Unavailable ({self.remote_info['remote_error']})"
+        return "N/A"
+
+    def on_remote_loaded(self, remote):
+        """Fill in the package index fields"""
+        self.remote_info = remote
+        if self.latest_version_label is not None:
+            self.latest_version_label.setText(self._latest_version_text())
+
     def on_info_loaded(self, info):
-        """Handle loaded package information"""
+        """Handle loaded local package information"""
+        if info == self.package_info and not self.info_scroll.isHidden():
+            return  # memoized view already current
         self.package_info = info
         self.loading_label.setVisible(False)
         self.progress_bar.setVisible(False)
@@ -193,27 +202,33 @@ class PackageDetailsDialog(QDialog):
             if child.widget():
                 child.widget().deleteLater()
 
-        if not info:
+        if not info.get("Version"):
             no_info = QLabel("⚠ Package not installed. Install it to see detailed information.")
             no_info.setStyleSheet("color: #e67e22; padding: 20px; font-size: 14px;")
             no_info.setAlignment(Qt.AlignmentFlag.AlignCenter)
             self.info_layout.addWidget(no_info)
+            self.latest_version_label = self.add_info_row("Latest Version", self._latest_version_text())
+            self.info_layout.addStretch()
             return
 
         # Display package information
         info_items = [
-            ("Version", info.get("Version", "N/A")),
-            ("Author", info.get("Author", "N/A")),
-            ("Author Email", info.get("Author-email", "N/A")),
-            ("License", info.get("License", "N/A")),
-            ("Location", info.get("Location", "N/A")),
-            ("Home Page", info.get("Home-page", "N/A")),
-            ("Requires", info.get("Requires", "None")),
-            ("Required By", info.get("Required-by", "None")),
+            ("Version", info.get("Version") or "N/A"),
+            ("Latest Version", self._latest_version_text()),
+            ("Author", info.get("Author") or "N/A"),
+            ("Author Email", info.get("Author-email") or "N/A"),
+            ("License", info.get("License") or "N/A"),
+            ("Requires Python", info.get("Requires-Python") or "Any"),
+            ("Location", info.get("Location") or "N/A"),
+            ("Home Page", info.get("Home-page") or "N/A"),
+            ("Requires", info.get("Requires") or "None"),
+            ("Required By", info.get("Required-by") or "None"),
         ]
 
         for label, value in info_items:
-            self.add_info_row(label, value)
+            value_widget = self.add_info_row(label, value)
+            if label == "Latest Version":
+                self.latest_version_label = value_widget
 
         # Summary section
         summary = info.get("Summary", "")
@@ -229,7 +244,7 @@ class PackageDetailsDialog(QDialog):
         self.info_layout.addStretch()
 
     def add_info_row(self, label, value):
-        """Add an information row"""
+        """Add an information row and return its value label"""
         container = QFrame()
         container.setStyleSheet("border-bottom: 1px solid #e0e0e0;")
 
@@ -253,6 +268,7 @@ class PackageDetailsDialog(QDialog):
 
         container.setLayout(row_layout)
         self.info_layout.addWidget(container)
+        return value_widget
 
     def on_info_error(self, error_msg):
         """Handle error loading package info"""
@@ -137,6 +137,16 @@ class SystemTrayManager(QObject):
         """Show error notification"""
         self.show_notification(title, message, QSystemTrayIcon.MessageIcon.Critical)
 
+    def notify_updates(self, packages):
+        """Announce newly available package updates"""
+        if not packages:
+            return
+        names = ", ".join(pkg['name'] for pkg in packages[:5])
+        if len(packages) > 5:
+            names += f" and {len(packages) - 5} more"
+        title = "1 update available" if len(packages) == 1 else f"{len(packages)} updates available"
+        self.show_notification(title, names, QSystemTrayIcon.MessageIcon.Information, 5000)
+
     def is_available(self):
         """Check if system tray is available"""
         return self.tray_icon is not None and QSystemTrayIcon.isSystemTrayAvailable()
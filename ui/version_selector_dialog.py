@@ -17,9 +17,11 @@ class VersionFetchWorker(QThread):
         super().__init__()
         self.package_name = package_name
         self.version_manager = PackageVersionManager()
+        self.catalog = None
 
     def run(self):
-        versions, error = self.version_manager.get_available_versions(self.package_name)
+        self.catalog, error = self.version_manager.get_version_catalog(self.package_name)
+        versions = self.catalog.versions() if self.catalog is not None else []
         self.finished.emit(versions, error if error else "")
 
 
@@ -49,6 +51,7 @@ class VersionSelectorDialog(QDialog):
         self.package_name = package_name
         self.version_manager = PackageVersionManager()
         self.available_versions = []
+        self.catalog = None
         self.installed_version = None
 
         self.setWindowTitle(f"Version Selector - {package_name}")
@@ -232,10 +235,19 @@ class VersionSelectorDialog(QDialog):
             self.loading_label.setVisible(True)
             return
 
-        # Sort versions (latest first)
-        sorted_versions = self.version_manager.sort_versions(versions)
+        # The catalog lists versions newest first
+        self.catalog = self.fetch_worker.catalog
+        sorted_versions = versions
         self.available_versions = sorted_versions
 
+        if self.installed_version and self.catalog is not None:
+            newer = self.catalog.newer_than(self.installed_version)
+            if newer:
+                self.current_version_label.setText(
+                    f"✓ Currently installed: <b>v{self.installed_version}</b> "
+                    f"({len(newer)} newer release(s), latest v{newer[0]})"
+                )
+
         # Show versions list
         self.versions_list_label.setVisible(True)
         self.versions_list.setVisible(True)
@@ -275,7 +287,7 @@ class VersionSelectorDialog(QDialog):
                 )
             elif self.installed_version:
                 # Compare versions
-                if self.available_versions.index(version_str) < self.available_versions.index(self.installed_version):
+                if self.catalog.compare(version_str, self.installed_version) > 0:
                     self.info_panel.append(
                         f"⬆ Upgrading from {self.installed_version} to {version_str}\n"
                         f"This is a newer version."